@@ -0,0 +1,147 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CubicSpline, PPoly
+from scipy.signal import medfilt
+
+from time_alignment import to_ns
+
+"""
+角速度插值模型：每个角速度列只拟合一次三次样条(剔除3倍标准差以外的值)，平滑后的序列可在任意输出网格上求值
+拟合结果(样条分段多项式系数)按数据内容的哈希与列名缓存：同一进程内复用整个模型，指定 cache_dir 时系数另存为 .npz，
+下次运行同一数据时直接载入；换用 5ms、10ms、20ms 等不同网格时只需重新求值
+"""
+
+# 进程内保留的模型数
+MODEL_CACHE_SIZE = 4
+
+_MODELS = OrderedDict()
+
+
+def column_keys(times, values, columns):
+    """
+    每列的缓存键(时间戳、列名与该列数值的哈希)及整个模型的键
+    :return: (各列的键, 模型的键)
+    """
+    times_digest = hashlib.sha1(np.ascontiguousarray(times, dtype=np.int64).tobytes()).hexdigest()
+    keys = []
+    for j, column in enumerate(columns):
+        h = hashlib.sha1(times_digest.encode('ascii'))
+        h.update(str(column).encode('utf-8'))
+        h.update(np.ascontiguousarray(values[:, j], dtype=np.float64).tobytes())
+        keys.append(h.hexdigest())
+    return keys, hashlib.sha1(''.join(keys).encode('ascii')).hexdigest()
+
+
+def fit_column(values):
+    """
+    按原有做法拟合一列：剔除与均值相差超过3倍标准差的值后，对剩余值按序号拟合自然边界三次样条
+    有效值少于4个或拟合失败时返回None，表示该列改用线性插值
+    """
+    series = pd.Series(values)
+    mask = (series - series.mean()).abs() <= 3 * series.std()
+    valid = series[mask].dropna()
+    if len(valid) < 4:
+        return None
+    try:
+        return CubicSpline(np.arange(len(valid)), valid.values, bc_type='natural')
+    except Exception:
+        return None
+
+
+def _load_fit(path):
+    with np.load(path) as cached:
+        if len(cached['x']) == 0:
+            return None
+        return PPoly(cached['c'], cached['x'])
+
+
+def _save_fit(path, fit):
+    c, x = (np.empty((4, 0)), np.empty(0)) if fit is None else (fit.c, fit.x)
+    # 先写临时文件再替换，并行处理多个会话时不会读到写了一半的缓存
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, c=c, x=x)
+    os.replace(tmp_path, path)
+
+
+class AngularVelocityModel:
+    """
+    一个会话的角速度模型
+    :param data: 以时间为索引、只含角速度列的DataFrame
+    :param cache_dir: 拟合系数的缓存目录，None为不写缓存文件
+    :param keys: 调用方已算出的 column_keys 结果 (各列的键, 模型的键)，None时在此计算
+    """
+
+    def __init__(self, data, cache_dir=None, keys=None):
+        self.columns = list(data.columns)
+        self.times = to_ns(data.index)
+        self.values = data.to_numpy(dtype=np.float64)
+        if keys is None:
+            keys = column_keys(self.times, self.values, self.columns)
+        self.keys, self.digest = keys
+        self.fits = [self._fit(j, key, cache_dir) for j, key in enumerate(self.keys)]
+        self._smoothed = None
+
+    def _fit(self, j, key, cache_dir):
+        if cache_dir is None:
+            return fit_column(self.values[:, j])
+        path = os.path.join(cache_dir, key + '.npz')
+        if os.path.exists(path):
+            return _load_fit(path)
+        fit = fit_column(self.values[:, j])
+        os.makedirs(cache_dir, exist_ok=True)
+        _save_fit(path, fit)
+        return fit
+
+    def smoothed(self):
+        """
+        每个源数据时刻的平滑值：样条在 [0, 有效值数-1] 上等间隔取与源数据行数相同的点，再做3点中值滤波；
+        线性插值的列按行序号填补空值
+        """
+        if self._smoothed is None:
+            n = len(self.times)
+            out = np.empty((n, len(self.columns)))
+            for j, fit in enumerate(self.fits):
+                if fit is None:
+                    out[:, j] = pd.Series(self.values[:, j]).interpolate(method='linear').to_numpy()
+                else:
+                    out[:, j] = medfilt(fit(np.linspace(0, fit.x[-1], n)), kernel_size=3)
+            self._smoothed = out
+        return self._smoothed
+
+    def evaluate(self, target_index):
+        """
+        在 target_index 上求值：与源数据时刻重合的网格点取平滑值，其余网格点在前后两个取到值的网格点之间线性插值，
+        最后一个取到值的点之后保持该值，第一个之前为NaN(与 reindex + interpolate(method='linear') 相同)
+        """
+        smoothed = self.smoothed()
+        grid = to_ns(target_index)
+        pos = np.minimum(np.searchsorted(self.times, grid), len(self.times) - 1)
+        hit = np.flatnonzero(self.times[pos] == grid) if len(self.times) else np.empty(0, dtype=np.intp)
+        out = np.full((len(grid), len(self.columns)), np.nan)
+        steps = np.arange(len(grid), dtype=np.float64)
+        for j in range(len(self.columns)):
+            values = smoothed[pos[hit], j]
+            ok = ~np.isnan(values)
+            if not ok.any():
+                continue
+            known, values = hit[ok], values[ok]
+            out[known[0]:, j] = np.interp(steps[known[0]:], known, values)
+        return pd.DataFrame(out, index=target_index, columns=self.columns)
+
+
+def angular_model(data, cache_dir=None):
+    """返回 data 对应的模型，同一进程内相同数据复用已拟合的模型"""
+    keys = column_keys(to_ns(data.index), data.to_numpy(dtype=np.float64), data.columns)
+    digest = keys[1]
+    if digest in _MODELS:
+        _MODELS.move_to_end(digest)
+        return _MODELS[digest]
+    model = AngularVelocityModel(data, cache_dir, keys)
+    _MODELS[digest] = model
+    while len(_MODELS) > MODEL_CACHE_SIZE:
+        _MODELS.popitem(last=False)
+    return model
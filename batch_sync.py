@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from session_archive import find_time_column, load_session
+from sync_sensor_data_3 import synchronize_and_merge
+
+"""
+批量同步：按时间范围的重叠将 ins_data 中的INS会话与 mag_data/processed 中的磁力计会话配对，
+在多个进程中分别运行 sync_sensor_data_3.synchronize_and_merge，输出已比两个输入文件都新的会话跳过；
+各会话的时间范围按文件的修改时间与大小缓存在 <out-dir>/.session_ranges.json，未改动的文件不再读取
+
+用法: python batch_sync.py [--ins-dir ins_data] [--mag-dir mag_data/processed] [--out-dir merged_data]
+                           [--jobs N] [--freq 10ms] [--force]
+每个INS会话与重叠时间最长的磁力计会话配对，输出为 <out-dir>/merged_<INS文件时间>.csv
+"""
+
+INS_PATTERN = re.compile(r'^ins_data_(\d{14}\.\d{3})\.csv$')
+MAG_PATTERN = re.compile(r'^mag_data_(\d{8}_\d{6})_processed\.csv$')
+
+# synchronize_and_merge 要求的最短重叠时长(秒)
+MIN_OVERLAP_S = 1.0
+
+# 会话时间范围缓存的文件名，位于输出目录
+RANGE_CACHE = '.session_ranges.json'
+
+
+def session_files(directory, pattern):
+    """目录中文件名符合 pattern 的会话，按文件名中的时间排序"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted((str(path) for path in directory.iterdir() if pattern.match(path.name)),
+                  key=lambda path: pattern.match(os.path.basename(path)).group(1))
+
+
+def session_range(path):
+    """会话时间列的最小、最大值(int64纳秒)，没有时间列或没有有效数据时返回None"""
+    if os.path.getsize(path) == 0:
+        return None
+    header = pd.read_csv(path, nrows=0).columns
+    time_col = find_time_column(header)
+    if time_col is None:
+        return None
+    times = load_session(path, columns=[time_col])[time_col].dropna()
+    if times.empty:
+        return None
+    return times.min().value, times.max().value
+
+
+def cached_ranges(paths, cache_path=None):
+    """
+    各会话的时间范围(见 session_range)，文件的修改时间与大小与缓存中的相同时直接使用缓存，不读取文件内容
+    cache_path 为None时不使用缓存
+    返回 {路径: 时间范围或None}
+    """
+    cache = {}
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+    ranges, changed = {}, False
+    for path in paths:
+        stat = os.stat(path)
+        key, stamp = os.path.abspath(path), [stat.st_mtime_ns, stat.st_size]
+        entry = cache.get(key)
+        if entry is None or entry[:2] != stamp:
+            entry = stamp + [session_range(path)]
+            cache[key] = entry
+            changed = True
+        ranges[path] = None if entry[2] is None else tuple(entry[2])
+    if changed and cache_path is not None:
+        # 先写临时文件再替换，中途退出不会留下不完整的缓存
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    return ranges
+
+
+def pair_sessions(ins_files, mag_files, min_overlap_s=MIN_OVERLAP_S, cache_path=None):
+    """
+    每个INS会话与时间范围重叠最长的磁力计会话配对，cache_path 为时间范围缓存文件，见 cached_ranges
+    返回 [(INS路径, 磁力计路径, 重叠秒数)]，以及没有可配对磁力计会话的INS路径
+    """
+    ins_ranges = cached_ranges(ins_files, cache_path)
+    mag_ranges = list(cached_ranges(mag_files, cache_path).items())
+    mag_ranges = [(path, r) for path, r in mag_ranges if r is not None]
+    mag_paths = [path for path, _ in mag_ranges]
+    mag_start = np.array([r[0] for _, r in mag_ranges], dtype=np.int64)
+    mag_end = np.array([r[1] for _, r in mag_ranges], dtype=np.int64)
+
+    pairs, unmatched = [], []
+    for path, r in ins_ranges.items():
+        if r is None or not mag_paths:
+            unmatched.append(path)
+            continue
+        overlap = np.minimum(mag_end, r[1]) - np.maximum(mag_start, r[0])
+        best = int(np.argmax(overlap))
+        if overlap[best] < min_overlap_s * 1e9:
+            unmatched.append(path)
+            continue
+        pairs.append((path, mag_paths[best], overlap[best] / 1e9))
+    return pairs, unmatched
+
+
+def output_path(out_dir, ins_path):
+    """INS会话对应的合并文件路径"""
+    stamp = INS_PATTERN.match(os.path.basename(ins_path)).group(1)
+    return os.path.join(out_dir, f"merged_{stamp}.csv")
+
+
+def is_up_to_date(output, *inputs):
+    """输出文件存在且比所有输入文件都新"""
+    if not os.path.exists(output):
+        return False
+    mtime = os.path.getmtime(output)
+    return all(mtime > os.path.getmtime(path) for path in inputs)
+
+
+def sync_pair(ins_path, mag_path, output, freq='10ms', method='nearest', tolerance=None, cache_dir=None):
+    """在工作进程中同步一对会话，返回 (输出行数, 耗时秒数, 错误信息)，任何异常都记为该会话失败，不中断批量同步"""
+    start = time.perf_counter()
+    try:
+        merged = synchronize_and_merge(ins_path, mag_path, output, method=method, tolerance=tolerance,
+                                       freq=freq, cache_dir=cache_dir)
+    except Exception as e:
+        return 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return len(merged), time.perf_counter() - start, None
+
+
+def run_batch(ins_dir='ins_data', mag_dir='mag_data/processed', out_dir='merged_data', jobs=None, freq='10ms',
+              method='nearest', tolerance=None, cache_dir=None, force=False):
+    """
+    配对并同步所有会话
+    返回每个会话一行的结果表(INS、磁力计、输出路径、重叠秒数、状态、行数、耗时)与总耗时秒数
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    pairs, unmatched = pair_sessions(session_files(ins_dir, INS_PATTERN), session_files(mag_dir, MAG_PATTERN),
+                                     cache_path=os.path.join(out_dir, RANGE_CACHE))
+
+    results = [{'ins': path, 'mag': None, 'output': None, 'overlap_s': np.nan, 'status': 'unmatched',
+                'rows': 0, 'seconds': np.nan} for path in unmatched]
+    pending = []
+    for ins_path, mag_path, overlap in pairs:
+        output = output_path(out_dir, ins_path)
+        row = {'ins': ins_path, 'mag': mag_path, 'output': output, 'overlap_s': overlap, 'status': 'skipped',
+               'rows': 0, 'seconds': np.nan}
+        results.append(row)
+        if force or not is_up_to_date(output, ins_path, mag_path):
+            pending.append(row)
+
+    start = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(sync_pair, row['ins'], row['mag'], row['output'], freq, method, tolerance,
+                                       cache_dir): row for row in pending}
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    rows, seconds, error = future.result()
+                except Exception as e:
+                    # 工作进程异常退出等，sync_pair 没能返回结果
+                    rows, seconds, error = 0, np.nan, f"{type(e).__name__}: {e}"
+                row.update(rows=rows, seconds=seconds, status='failed: ' + error if error else 'synced')
+    elapsed = time.perf_counter() - start
+    return pd.DataFrame(results).sort_values('ins', ignore_index=True), elapsed
+
+
+def print_report(results, elapsed):
+    """每个会话的耗时与行数/秒，以及整体吞吐量"""
+    for row in results.itertuples():
+        name = os.path.basename(row.ins)
+        if row.status == 'synced':
+            print(f"{name} + {os.path.basename(row.mag)}: {row.rows} 行, {row.seconds:.2f}s, "
+                  f"{row.rows / row.seconds:,.0f} 行/秒")
+        elif row.status == 'unmatched':
+            print(f"{name}: 没有时间范围重叠的磁力计会话")
+        else:
+            print(f"{name} + {os.path.basename(row.mag)}: {row.status}")
+    synced = results[results['status'] == 'synced']
+    total_rows = int(synced['rows'].sum())
+    print(f"同步 {len(synced)} 个会话, 跳过 {int((results['status'] == 'skipped').sum())} 个, "
+          f"失败 {int(results['status'].str.startswith('failed').sum())} 个, "
+          f"未配对 {int((results['status'] == 'unmatched').sum())} 个")
+    if total_rows:
+        print(f"共 {total_rows} 行, 总耗时 {elapsed:.2f}s, 吞吐量 {total_rows / elapsed:,.0f} 行/秒")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="批量同步所有已记录的INS与磁力计会话")
+    parser.add_argument("--ins-dir", default="ins_data", help="INS记录文件目录")
+    parser.add_argument("--mag-dir", default="mag_data/processed", help="处理后的磁力计数据目录")
+    parser.add_argument("--out-dir", default="merged_data", help="合并文件输出目录")
+    parser.add_argument("--jobs", type=int, default=None, help="工作进程数，默认为CPU核数")
+    parser.add_argument("--freq", default="10ms", help="输出网格间隔")
+    parser.add_argument("--method", default="nearest", choices=["nearest", "previous", "linear"],
+                        help="磁力计数据对齐方式")
+    parser.add_argument("--tolerance", default=None, help="磁力计数据与网格点的最大时间差，如 20ms")
+    parser.add_argument("--cache-dir", default=None, help="角速度拟合系数的缓存目录")
+    parser.add_argument("--force", action="store_true", help="输出已是最新时也重新同步")
+    args = parser.parse_args()
+    results, elapsed = run_batch(args.ins_dir, args.mag_dir, args.out_dir, args.jobs, args.freq, args.method,
+                                 args.tolerance, args.cache_dir, args.force)
+    print_report(results, elapsed)
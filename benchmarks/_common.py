@@ -0,0 +1,34 @@
+"""基准测试公共工具：路径设置、计时与结果表格输出"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAG_GA = os.path.join(ROOT, 'mag_ga')
+
+# 采集端模块以 mag_ga 为根导入 lib.*，分析脚本位于仓库根目录
+for path in (MAG_GA, ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def best_time(fn, *args, repeat=3, **kwargs):
+    """多次运行取最短耗时，返回 (秒, 最后一次的返回值)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def print_table(header, rows):
+    """按列宽对齐打印结果表"""
+    rows = [[str(c) for c in row] for row in rows]
+    widths = [max(len(str(h)), *(len(r[i]) for r in rows)) if rows else len(str(h))
+              for i, h in enumerate(header)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(header, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(c.ljust(w) for c, w in zip(row, widths)))
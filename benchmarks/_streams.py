@@ -0,0 +1,109 @@
+"""由已记录的INS会话(ins_data/*.csv)重建传感器原始字节流，供协议解析基准使用"""
+import glob
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from _common import ROOT
+from lib.utils.crc16 import crc16
+
+
+def load_recorded_ins(max_rows=None):
+    """读取仓库中所有已记录的INS会话"""
+    files = sorted(glob.glob(os.path.join(ROOT, 'ins_data', '*.csv')))
+    df = pd.concat([pd.read_csv(f) for f in files if os.path.getsize(f) > 0], ignore_index=True)
+    numeric = [c for c in df.columns if c not in ('Chiptime', 'Record Time', 'Corrected Time')]
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors='coerce')
+    df = df.dropna(subset=numeric).reset_index(drop=True)
+    return df if max_rows is None else df.iloc[:max_rows]
+
+
+def _int16(values, full_range):
+    raw = np.round(np.asarray(values, dtype=float) / full_range * 32768.0)
+    return np.clip(raw, -32768, 32767).astype(np.int64)
+
+
+def _degree_minute(values):
+    """十进制度 -> 维特经纬度格式(度*1e7 + 分*1e5)"""
+    values = np.asarray(values, dtype=float)
+    degrees = np.floor(values)
+    return (degrees * 1e7 + np.round((values - degrees) * 60 * 1e5)).astype(np.int64)
+
+
+def wit_pack(pack_type, payload):
+    """组装一包维特协议数据(0x55 + 类型 + 8字节数据 + 校验和)"""
+    body = bytes([0x55, pack_type]) + payload
+    return body + bytes([sum(body) & 0xff])
+
+
+def wit_stream(df, include_quaternion=False):
+    """按INS会话每行生成 时间/加速度/角速度/角度/磁场/经纬度(/四元数) 数据包"""
+    acc = _int16(df[['Acceleration X (g)', 'Acceleration Y (g)', 'Acceleration Z (g)']].values, 16.0)
+    gyro = _int16(df[['Angular_velocity_X (dps)', 'Angular_velocity_Y (dps)', 'Angular_velocity_Z (dps)']].values, 2000.0)
+    temp = np.round(df['Temperature (°C)'].values * 100).astype(np.int64)
+    lon = _degree_minute(df['Longitude'].values)
+    lat = _degree_minute(df['Latitude'].values)
+    rng = np.random.default_rng(0)
+    angle = rng.integers(-32768, 32767, size=(len(df), 3))
+    mag = rng.integers(-32768, 32767, size=(len(df), 3))
+    quat = rng.integers(-32768, 32767, size=(len(df), 4))
+
+    out = bytearray()
+    for i in range(len(df)):
+        ms = (i * 10) % 1000
+        out += wit_pack(0x50, struct.pack('<BBBBBBH', 25, 2, 5, 3, 37, (i // 100) % 60, ms))
+        out += wit_pack(0x51, struct.pack('<hhhH', *acc[i], temp[i] & 0xffff))
+        out += wit_pack(0x52, struct.pack('<hhhH', *gyro[i], 0))
+        out += wit_pack(0x53, struct.pack('<hhhH', *angle[i], 0))
+        out += wit_pack(0x54, struct.pack('<hhhH', *mag[i], 0))
+        out += wit_pack(0x57, struct.pack('<II', lon[i], lat[i]))
+        if include_quaternion:
+            out += wit_pack(0x59, struct.pack('<hhhh', *quat[i]))
+    return bytes(out)
+
+
+def modbus_stream(df, addr=0x50):
+    """按INS会话每行生成一包WT901C485读取应答(寄存器0x30~0x58共41个，87字节)"""
+    acc = _int16(df[['Acceleration X (g)', 'Acceleration Y (g)', 'Acceleration Z (g)']].values, 16.0)
+    gyro = _int16(df[['Angular_velocity_X (dps)', 'Angular_velocity_Y (dps)', 'Angular_velocity_Z (dps)']].values, 2000.0)
+    temp = np.round(df['Temperature (°C)'].values * 100).astype(np.int64)
+    rng = np.random.default_rng(0)
+    mag = rng.integers(-32768, 32767, size=(len(df), 3))
+    angle = rng.integers(-32768, 32767, size=(len(df), 3))
+
+    out = bytearray()
+    for i in range(len(df)):
+        ms = (i * 10) % 1000
+        regs = [25 | 2 << 8, 5 | 3 << 8, 37 | ((i // 100) % 60) << 8, ms,
+                *acc[i], *gyro[i], *mag[i], *angle[i], temp[i]] + [0] * 24
+        body = bytes([addr, 0x03, len(regs) * 2]) + struct.pack('>41H', *[int(r) & 0xffff for r in regs])
+        crc = crc16(body)
+        out += body + bytes([crc >> 8, crc & 0xff])
+    return bytes(out)
+
+
+def add_noise(stream, ratio=0.01, seed=0, pack_size=11, head=0x55):
+    """在包之间随机插入干扰字节(含伪包头)，用于检验重新同步"""
+    rng = np.random.default_rng(seed)
+    out = bytearray()
+    for start in range(0, len(stream), pack_size):
+        out += stream[start:start + pack_size]
+        if rng.random() < ratio:
+            out += bytes([head]) + rng.integers(0, 256, rng.integers(1, 12), dtype=np.uint8).tobytes()
+    return bytes(out)
+
+
+def chunks(stream, size):
+    """按串口单次读取的块大小切分字节流"""
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+
+def load_stream(paths):
+    """读取录制的原始串口字节流文件"""
+    out = bytearray()
+    for path in paths:
+        with open(path, 'rb') as f:
+            out += f.read()
+    return bytes(out)
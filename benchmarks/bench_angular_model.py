@@ -0,0 +1,111 @@
+"""
+角速度插值基准：以 10ms、5ms、20ms 三种网格依次同步同一会话时，
+对比原来每次都重新拟合样条并 reindex + interpolate 的实现与 angular_model 的拟合一次、按网格求值
+
+用法: python benchmarks/bench_angular_model.py [--minutes 60] [--rate 200]
+源数据为约 rate Hz 的三列角速度(间隔随机、与网格不对齐，含少量空值与离群值)；
+"disk cache" 为新进程中从 .npz 缓存载入拟合系数后的耗时(清空进程内缓存模拟)
+"""
+import argparse
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CubicSpline
+from scipy.signal import medfilt
+
+from _common import best_time, print_table
+import angular_model
+from sync_sensor_data_3 import interpolate_angular_velocity
+
+COLUMNS = ['angular_velocity_x (dps)', 'angular_velocity_y (dps)', 'angular_velocity_z (dps)']
+GRIDS = ['10ms', '5ms', '20ms']
+
+
+def legacy_interpolate_angular_velocity(data, target_index):
+    """原实现"""
+    angular_cols = [col for col in data.columns if 'angular_velocity' in col.lower()]
+    if not angular_cols:
+        return data
+    angular_data = data[angular_cols].copy()
+    for col in angular_cols:
+        mean_val = angular_data[col].mean()
+        std_val = angular_data[col].std()
+        mask = (angular_data[col] - mean_val).abs() <= 3 * std_val
+        clean_data = angular_data[col][mask]
+        if len(clean_data) < 2:
+            angular_data[col] = angular_data[col].interpolate(method='linear')
+            continue
+        try:
+            valid_data = clean_data.dropna()
+            if len(valid_data) >= 4:
+                t_valid = np.arange(len(valid_data))
+                spline = CubicSpline(t_valid, valid_data.values, bc_type='natural')
+                t_all = np.linspace(0, len(valid_data)-1, len(angular_data))
+                interpolated = spline(t_all)
+                interpolated = medfilt(interpolated, kernel_size=3)
+                angular_data[col] = interpolated
+            else:
+                angular_data[col] = angular_data[col].interpolate(method='linear')
+        except:
+            angular_data[col] = angular_data[col].interpolate(method='linear')
+    resampled = angular_data.reindex(target_index)
+    resampled = resampled.interpolate(method='linear')
+    return resampled
+
+
+def make_data(n, rate, rng):
+    start = pd.Timestamp('2025-02-05 05:00:00').value
+    mean_step = 1e9 / rate
+    times = start + np.cumsum(rng.integers(int(mean_step * 0.5), int(mean_step * 1.5), n))
+    # 时间戳截断到毫秒，与落盘数据相同，部分时刻与网格重合
+    times = times // 1_000_000 * 1_000_000
+    times = np.unique(times)
+    values = rng.normal(size=(len(times), len(COLUMNS)))
+    values[rng.random(values.shape) < 0.001] = np.nan
+    values[rng.integers(0, len(times), 50), 0] = 40.0
+    return pd.DataFrame(values, index=pd.DatetimeIndex(times), columns=COLUMNS)
+
+
+def run_grids(fn, data, grids, *args):
+    return [fn(data, grid, *args) for grid in grids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="角速度插值基准")
+    parser.add_argument('--minutes', type=float, default=60, help="会话时长(分钟)")
+    parser.add_argument('--rate', type=float, default=200, help="源数据采样率(Hz)")
+    args = parser.parse_args()
+
+    data = make_data(int(args.minutes * 60 * args.rate), args.rate, np.random.default_rng(0))
+    grids = [pd.date_range(data.index.min(), data.index.max(), freq=freq) for freq in GRIDS]
+    cache_dir = tempfile.mkdtemp()
+    rows = []
+    try:
+        old_t, old = best_time(run_grids, legacy_interpolate_angular_velocity, data, grids, repeat=1)
+
+        def cold():
+            angular_model._MODELS.clear()
+            return run_grids(interpolate_angular_velocity, data, grids)
+
+        def from_disk():
+            angular_model._MODELS.clear()
+            return run_grids(interpolate_angular_velocity, data, grids, cache_dir)
+
+        new_t, new = best_time(cold)
+        run_grids(interpolate_angular_velocity, data, grids[:1], cache_dir)      # 写入缓存文件
+        disk_t, _ = best_time(from_disk)
+        warm_t, _ = best_time(run_grids, interpolate_angular_velocity, data, grids)
+    finally:
+        shutil.rmtree(cache_dir)
+
+    same = all(a.equals(b) for a, b in zip(old, new))
+    for label, t in [('fit once, 3 grids', new_t), ('disk cache, 3 grids', disk_t), ('in-process cache, 3 grids', warm_t)]:
+        rows.append([len(data), label, f"{old_t * 1e3:.0f}", f"{t * 1e3:.0f}", f"{old_t / t:.1f}x",
+                     'yes' if same else 'NO'])
+    print_table(['source rows', 'new', 'legacy ms', 'new ms', 'speedup', 'identical'], rows)
+
+
+if __name__ == '__main__':
+    main()
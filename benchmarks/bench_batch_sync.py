@@ -0,0 +1,90 @@
+"""
+批量同步基准：batch_sync.run_batch 在不同工作进程数下同步所有会话的总耗时与吞吐量(行/秒)，以及输出均为最新时的跳过耗时
+
+用法: python benchmarks/bench_batch_sync.py [--days 8] [--jobs 1 4] [--dir /tmp/batch_sync_bench]
+仓库中 ins_data 与 mag_data/processed 的会话按天平移复制 --days 份(文件名与时间列一起平移)，模拟多天累积的会话；
+每种进程数都从空的输出目录开始，并核对输出与单进程的结果逐字节相同
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from _common import ROOT, best_time, print_table
+from batch_sync import INS_PATTERN, MAG_PATTERN, run_batch, session_files
+from session_archive import find_time_column
+
+
+def shift_session(path, out_dir, pattern, days, stamp_format):
+    """会话复制到 out_dir，时间列与文件名中的时间平移 days 天"""
+    name = os.path.basename(path)
+    stamp = pattern.match(name).group(1)
+    shift = pd.Timedelta(days=days)
+    new_stamp = (pd.to_datetime(stamp, format=stamp_format) + shift).strftime(stamp_format)
+    if '%f' in stamp_format:
+        new_stamp = new_stamp[:-3]
+    target = os.path.join(out_dir, name.replace(stamp, new_stamp))
+    if os.path.getsize(path) == 0:
+        open(target, 'w').close()
+        return
+    df = pd.read_csv(path)
+    time_col = find_time_column(df.columns)
+    if time_col is not None:
+        for col in [c for c in df.columns if c == time_col or c.startswith(time_col + '.')]:
+            times = pd.to_datetime(df[col], errors='coerce') + shift
+            df[col] = times.dt.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3]
+    # 重复的时间列(如处理后数据的两列 Timestamp)写回原列名
+    df.columns = pd.read_csv(path, nrows=0).columns.str.replace(r'\.\d+$', '', regex=True)
+    df.to_csv(target, index=False)
+
+
+def make_sessions(base_dir, days):
+    ins_dir = os.path.join(base_dir, 'ins_data')
+    mag_dir = os.path.join(base_dir, 'mag_data')
+    os.makedirs(ins_dir, exist_ok=True)
+    os.makedirs(mag_dir, exist_ok=True)
+    for day in range(days):
+        for path in session_files(os.path.join(ROOT, 'ins_data'), INS_PATTERN):
+            shift_session(path, ins_dir, INS_PATTERN, day, '%Y%m%d%H%M%S.%f')
+        for path in session_files(os.path.join(ROOT, 'mag_data', 'processed'), MAG_PATTERN):
+            shift_session(path, mag_dir, MAG_PATTERN, day, '%Y%m%d_%H%M%S')
+    return ins_dir, mag_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量同步基准")
+    parser.add_argument('--days', type=int, default=8, help="会话按天复制的份数")
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, os.cpu_count() or 1], help="工作进程数")
+    parser.add_argument('--dir', default=None, help="数据与输出目录，默认临时目录")
+    args = parser.parse_args()
+
+    base_dir = args.dir or tempfile.mkdtemp(prefix='batch_sync_bench_')
+    ins_dir, mag_dir = make_sessions(base_dir, args.days)
+
+    rows = []
+    reference = None
+    for jobs in dict.fromkeys(args.jobs):
+        out_dir = os.path.join(base_dir, f'merged_{jobs}')
+        shutil.rmtree(out_dir, ignore_errors=True)
+        results, elapsed = run_batch(ins_dir, mag_dir, out_dir, jobs=jobs)
+        synced = results[results['status'] == 'synced']
+        total_rows = int(synced['rows'].sum())
+        outputs = sorted(os.listdir(out_dir))
+        if reference is None:
+            reference = out_dir
+        same = all(filecmp.cmp(os.path.join(reference, name), os.path.join(out_dir, name), shallow=False)
+                   for name in outputs)
+        # 整个调用的耗时，含读取时间范围、配对与比较修改时间
+        skip_elapsed, _ = best_time(run_batch, ins_dir, mag_dir, out_dir, jobs=jobs)
+        rows.append([jobs, len(synced), total_rows, f"{elapsed:.2f}", f"{total_rows / elapsed:,.0f}",
+                     f"{synced['seconds'].sum():.2f}", f"{skip_elapsed * 1e3:.1f}", 'yes' if same else 'NO'])
+
+    print_table(['jobs', 'sessions', 'rows', 'wall s', 'rows/s', 'sum of session s', 'rerun (all skipped) ms',
+                 'same output'], rows)
+
+
+if __name__ == '__main__':
+    main()
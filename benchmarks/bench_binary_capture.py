@@ -0,0 +1,91 @@
+"""
+二进制采集文件基准：对比磁力计原始数据的CSV与二进制采集文件的写入耗时、文件大小、打开耗时与取一列的耗时，
+以及二进制文件导出CSV的耗时
+
+用法: python benchmarks/bench_binary_capture.py [--rows 3600000] [--dir /tmp/capture_bench]
+默认行数为100Hz采集10小时；写入时样本按采集线程的方式逐个投递给写入器，二进制导出的CSV与直接写出的CSV逐字节比较
+"""
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from lib.utils.acquisition_clock import AcquisitionClock
+from lib.utils.binary_capture import CaptureReader
+import mag_aq
+
+
+def make_rows(count, clock):
+    rng = np.random.default_rng(0)
+    t = np.arange(count) / 100.0
+    x = 20001.0 + rng.normal(0, 5, count).round(3)
+    y = -3000.0 + rng.normal(0, 5, count).round(3)
+    z = 41000.0 + rng.normal(0, 5, count).round(3)
+    magnitude = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+    mono = clock.anchor_mono_ns + (t * 1e9).astype(np.int64) // 10_000_000 * 10_000_000
+    return list(zip(t.tolist(), x.tolist(), y.tolist(), z.tolist(), magnitude.tolist(), magnitude.tolist(),
+                    mono.tolist(), mono.tolist()))
+
+
+def write(rows, directory, clock, capture):
+    path, writer = mag_aq.create_mag_writer(os.path.join(directory, "bench.csv"), clock, capture=capture)
+    start = time.perf_counter()
+    writer.start()
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    return path, time.perf_counter() - start
+
+
+def open_csv(path):
+    return pd.read_csv(path)
+
+
+def open_capture(path):
+    return CaptureReader(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="二进制采集文件基准")
+    parser.add_argument('--rows', type=int, default=3600000, help="样本数")
+    parser.add_argument('--dir', default=None, help="临时文件目录，默认使用系统临时目录")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    mag_aq.UNPROCESSED_DATA_DIR = directory
+    clock = AcquisitionClock()
+    rows = make_rows(args.rows, clock)
+
+    csv_path, csv_write = write(rows, directory, clock, "csv")
+    cap_path, cap_write = write(rows, directory, clock, "binary")
+    del rows
+
+    csv_open, df = best_time(open_csv, csv_path, repeat=1)
+    cap_open, reader = best_time(open_capture, cap_path)
+    csv_column, _ = best_time(lambda: df['Magnitude'].to_numpy().mean())
+    cap_column, _ = best_time(lambda: reader.column('Magnitude').mean())
+    del df
+
+    export_path = os.path.join(directory, "export.csv")
+    export, count = best_time(reader.to_csv, export_path, repeat=1)
+    identical = filecmp.cmp(csv_path, export_path, shallow=False)
+
+    print_table(['format', 'write s', 'size MB', 'open s', 'first column s'], [
+        ['csv', f"{csv_write:.2f}", f"{os.path.getsize(csv_path) / 1e6:.1f}", f"{csv_open:.3f}", f"{csv_column:.4f}"],
+        ['binary', f"{cap_write:.2f}", f"{os.path.getsize(cap_path) / 1e6:.1f}", f"{cap_open:.5f}", f"{cap_column:.4f}"],
+    ])
+    print()
+    print(f"导出 {count} 条记录为CSV: {export:.2f}秒，与直接写出的CSV{'相同' if identical else '不同'}")
+
+    for path in (csv_path, cap_path, export_path):
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
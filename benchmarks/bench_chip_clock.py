@@ -0,0 +1,86 @@
+"""
+芯片时钟对时基准：ChipClockEstimator 每个数据更新事件的CPU耗时，以及在给定漂移和串口接收抖动下校正后时刻的误差
+
+用法: python benchmarks/bench_chip_clock.py [--minutes 60] [--drift-ppm -200 0 50] [--window 12000]
+模拟100Hz芯片时间，每个芯片时间触发4个数据更新事件(磁场、经纬度、gps、四元素)；
+数据按随机大小的块到达，同一块共用到达时刻，另加指数分布的接收延迟。
+误差为校正后时刻与真实时刻之差，偏差(bias)为接收延迟的均值，只由芯片时间无法区分；
+另在若干时刻用 np.polyfit 对同一窗口重新拟合，核对增量累加和的结果
+"""
+import argparse
+
+import numpy as np
+
+from _common import best_time, print_table
+from lib.utils.chip_clock import NS_PER_MS, ChipClockEstimator, chiptime_ms
+
+
+def make_session(minutes, drift_ppm, rng, events_per_sample=4, latency_ms=1.0):
+    """返回 (芯片毫秒计数, 到达时刻, 真实时刻)，每个数据更新事件一项"""
+    samples = minutes * 60 * 100
+    start = chiptime_ms(2025, 2, 5, 5, 0, 28, 700)
+    chip = np.repeat(start + np.arange(samples) * 10, events_per_sample)
+    true_ns = 10 ** 12 + ((chip - start) * NS_PER_MS * (1 + drift_ppm * 1e-6)).astype(np.int64)
+    # 每次串口读取取走1~8个事件，到达时刻为该块最后一个事件的时刻加接收延迟
+    sizes = rng.integers(1, 9, len(chip))
+    ends = np.minimum(np.cumsum(sizes), len(chip))
+    ends = np.unique(ends)
+    block = np.searchsorted(ends, np.arange(len(chip)), side='right')
+    last = ends - 1
+    latency = (rng.exponential(latency_ms, len(ends)) * NS_PER_MS).astype(np.int64)
+    arrival = (true_ns[last] + latency)[np.minimum(block, len(ends) - 1)]
+    return chip, arrival, true_ns
+
+
+def run(estimator, chip, arrival):
+    update = estimator.update
+    return [update(c, m) for c, m in zip(chip, arrival)]
+
+
+def check_fit(chip, arrival, window, checkpoints):
+    """在若干样本处比较增量拟合与 np.polyfit 的预测值(纳秒)"""
+    estimator = ChipClockEstimator(window=window)
+    worst = 0.0
+    marks = set(checkpoints)
+    for i, (c, m) in enumerate(zip(chip.tolist(), arrival.tolist())):
+        value = estimator.update(c, m)
+        if i in marks:
+            lo = max(0, i + 1 - window)
+            x = (chip[lo:i + 1] - chip[0]).astype(float)
+            y = (arrival[lo:i + 1] - arrival[0]).astype(float) - x * NS_PER_MS
+            slope, intercept = np.polyfit(x, y, 1)
+            reference = arrival[0] + x[-1] * NS_PER_MS + intercept + slope * x[-1]
+            worst = max(worst, abs(value - reference))
+    return worst, estimator.drift_ppm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="芯片时钟对时基准")
+    parser.add_argument('--minutes', type=int, default=60, help="模拟的采集时长(分钟)")
+    parser.add_argument('--drift-ppm', type=float, nargs='+', default=[-200.0, 0.0, 50.0], help="主机时钟相对芯片时钟的漂移")
+    parser.add_argument('--window', type=int, default=12000, help="拟合窗口的样本数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for drift in args.drift_ppm:
+        chip, arrival, true_ns = make_session(args.minutes, drift, rng)
+        chip_list, arrival_list = chip.tolist(), arrival.tolist()
+        seconds, corrected = best_time(lambda: run(ChipClockEstimator(window=args.window), chip_list, arrival_list))
+        # 跳过首个窗口(估计尚未收敛)
+        skip = args.window
+        raw_err = (arrival - true_ns)[skip:] / 1e3
+        err = (np.asarray(corrected, dtype=np.int64) - true_ns)[skip:] / 1e3
+        checkpoints = np.linspace(skip, len(chip) - 1, 20).astype(int).tolist()
+        fit_diff, estimated = check_fit(chip, arrival, args.window, checkpoints)
+        rows.append([f"{drift:g}", len(chip), f"{seconds / len(chip) * 1e6:.2f}",
+                     f"{raw_err.mean():.0f} / {raw_err.std():.0f} / {np.abs(raw_err - raw_err.mean()).max():.0f}",
+                     f"{err.mean():.0f} / {err.std():.0f} / {np.abs(err - err.mean()).max():.0f}",
+                     f"{estimated:.2f}", f"{fit_diff:.1f}"])
+
+    print_table(['drift ppm', 'events', 'us/event', 'raw bias/std/max us', 'corrected bias/std/max us',
+                 'est. drift ppm', 'vs polyfit ns'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+485协议CRC16与解析吞吐基准：对比双表逐字节CRC+列表缓冲解析 与 双字节查表+增量CRC解析(包/秒)
+
+用法: python benchmarks/bench_crc16.py [--stream capture.bin ...] [--chunks 8 87 1024] [--rows N]
+未指定 --stream 时由 ins_data 中已记录的会话重建WT901C485应答字节流
+"""
+import argparse
+
+import numpy as np
+
+from _common import best_time, print_table
+from _streams import add_noise, chunks, load_recorded_ins, load_stream, modbus_stream
+from bench_wit_parser import RecordingDevice
+from lib.protocol_resolver.roles.protocol_485_resolver import Protocol485Resolver
+from lib.utils.crc16 import CRC16_TABLE, crc16, crc16_packets
+
+# 原 auchCRCHi / auchCRCLo 两张查表
+AUCH_CRC_HI = [v & 0xff for v in CRC16_TABLE]
+AUCH_CRC_LO = [v >> 8 for v in CRC16_TABLE]
+
+
+def legacy_get_crc(datas, dlen):
+    """原双表逐字节实现"""
+    tempH = 0xff
+    tempL = 0xff
+    for i in range(0, dlen):
+        tempIndex = (tempH ^ datas[i]) & 0xff
+        tempH = (tempL ^ AUCH_CRC_HI[tempIndex]) & 0xff
+        tempL = AUCH_CRC_LO[tempIndex]
+    return (tempH << 8) | tempL
+
+
+class LegacyProtocol485Resolver(Protocol485Resolver):
+    """原逐字节列表缓冲实现，作为结果与耗时的对照"""
+
+    def __init__(self):
+        super().__init__()
+        self.TempBytes = []
+
+    def get_crc(self, datas, dlen):
+        return legacy_get_crc(datas, dlen)
+
+    def passiveReceiveData(self, data, deviceModel):
+        for val in data:
+            self.TempBytes.append(val)
+            if (self.TempBytes[0]!=deviceModel.ADDR):
+                del self.TempBytes[0]
+                continue
+            if (len(self.TempBytes)>2):
+                if ((self.TempBytes[1]==0x03)==False):
+                    del self.TempBytes[0]
+                    continue
+                tlen = len(self.TempBytes)
+                if (tlen==self.TempBytes[2] + 5):
+                    tempCrc = self.get_crc(self.TempBytes,tlen-2)
+                    if ((tempCrc>>8) == self.TempBytes[tlen-2] and (tempCrc & 0xff) == self.TempBytes[tlen-1]):
+                        if (self.PackSize==tlen):
+                            self.get_data(self.TempBytes, deviceModel)
+                            deviceModel.dataProcessor.onUpdate(deviceModel)
+                        self.get_find(self.TempBytes,deviceModel)
+                        self.TempBytes=[]
+                    else:
+                        del self.TempBytes[0]
+
+
+def parse(resolver_cls, data_chunks):
+    resolver = resolver_cls()
+    device = RecordingDevice()
+    for chunk in data_chunks:
+        resolver.passiveReceiveData(chunk, device)
+    device.frames = device.dataProcessor.updates
+    device.found = resolver.TempFindValues
+    return device
+
+
+def crc_only(stream, pack_size):
+    """只计算CRC：原双表、合并查表、NumPy批量三种方式"""
+    count = len(stream) // pack_size
+    packets = [stream[i * pack_size:(i + 1) * pack_size] for i in range(count)]
+    matrix = np.frombuffer(stream[:count * pack_size], dtype=np.uint8).reshape(count, pack_size)
+    legacy_t, legacy = best_time(lambda: [legacy_get_crc(p, pack_size - 2) for p in packets])
+    table_t, table = best_time(lambda: [crc16(p[:-2]) for p in packets])
+    numpy_t, batch = best_time(crc16_packets, matrix[:, :-2])
+    expected = [p[-2] << 8 | p[-1] for p in packets]
+    return count, legacy_t, table_t, numpy_t, legacy == table == batch.tolist() == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Protocol485Resolver CRC16 基准")
+    parser.add_argument('--stream', nargs='*', help="录制的原始485应答字节流文件")
+    parser.add_argument('--chunks', type=int, nargs='+', default=[8, 87, 1024],
+                        help="单次 serial.read() 的字节数")
+    parser.add_argument('--rows', type=int, default=20000, help="重建字节流使用的INS记录行数")
+    args = parser.parse_args()
+
+    if args.stream:
+        streams = {'recorded': load_stream(args.stream)}
+    else:
+        clean = modbus_stream(load_recorded_ins(args.rows))
+        streams = {'recorded-clean': clean, 'recorded+1%noise': add_noise(clean, pack_size=Protocol485Resolver.PackSize, head=0x50)}
+
+        count, legacy_t, table_t, numpy_t, same = crc_only(clean, Protocol485Resolver.PackSize)
+        print_table(['packets', 'two-table/s', 'word-table/s', 'numpy batch/s', 'identical'],
+                    [[count, f"{count / legacy_t:,.0f}", f"{count / table_t:,.0f}",
+                      f"{count / numpy_t:,.0f}", same]])
+        print()
+
+    rows = []
+    for name, stream in streams.items():
+        for chunk in args.chunks:
+            data_chunks = chunks(stream, chunk)
+            old_t, old_dev = best_time(parse, LegacyProtocol485Resolver, data_chunks, repeat=1)
+            new_t, new_dev = best_time(parse, Protocol485Resolver, data_chunks)
+            rows.append([name, chunk, new_dev.frames,
+                         f"{old_dev.frames / old_t:,.0f}", f"{new_dev.frames / new_t:,.0f}",
+                         f"{old_t / new_t:.1f}x",
+                         old_dev.frames == new_dev.frames and old_dev.values == new_dev.values
+                         and old_dev.found == new_dev.found])
+
+    print_table(['stream', 'chunk', 'packets', 'legacy packets/s', 'incremental packets/s', 'speedup', 'identical'], rows)
+
+
+if __name__ == '__main__':
+    main()
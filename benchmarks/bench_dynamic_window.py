@@ -0,0 +1,77 @@
+"""
+动态窗口插值基准：dynamic_window_interpolation 中非角速度列的网格填充，
+对比原来逐个10ms网格点掩码整列、逐点计算反距离权重的实现与 searchsorted + 二维权重的实现
+
+用法: python benchmarks/bench_dynamic_window.py [--sizes 1000 4000 1000000] [--legacy-max 4000]
+源数据约200Hz(间隔2~8ms，与网格不对齐)，7个数值列；原实现为O(N·M)，超过 --legacy-max 的规模只运行新实现
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from sync_sensor_data_3 import dynamic_window_interpolation
+
+COLUMNS = ['acceleration x (g)', 'acceleration y (g)', 'acceleration z (g)', 'temperature (°c)',
+           'longitude', 'latitude', 'time']
+
+
+def legacy_fill(data, window_size=5):
+    """原实现中非角速度列的处理"""
+    target_index = pd.date_range(start=data.index.min(), end=data.index.max(), freq='10ms')
+    other_data = pd.DataFrame(index=target_index)
+    for col in data.columns:
+        series = data[col]
+        resampled = series.reindex(target_index)
+        for i in range(len(resampled)):
+            if pd.isna(resampled.iloc[i]):
+                current_time = resampled.index[i]
+                window_data = series[
+                    (series.index >= current_time - pd.Timedelta(milliseconds=10*window_size)) &
+                    (series.index <= current_time + pd.Timedelta(milliseconds=10*window_size))
+                ]
+                if not window_data.empty:
+                    time_diff = abs((window_data.index - current_time).total_seconds())
+                    weights = 1 / (time_diff + 1e-6)
+                    resampled.iloc[i] = np.average(window_data, weights=weights)
+                else:
+                    resampled.iloc[i] = np.nan
+        other_data[col] = resampled.interpolate(method='linear')
+    return other_data
+
+
+def make_data(n, rng):
+    start = pd.Timestamp('2025-02-05 05:00:00.001').value
+    times = start + np.cumsum(rng.integers(2_000_000, 8_000_000, n))
+    data = pd.DataFrame(rng.normal(size=(n, len(COLUMNS))), index=pd.DatetimeIndex(times), columns=COLUMNS)
+    data.iloc[::97, 0] = np.nan
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="动态窗口插值基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 4000, 1000000], help="源数据行数")
+    parser.add_argument('--legacy-max', type=int, default=4000, help="运行原实现的最大行数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in args.sizes:
+        data = make_data(n, rng)
+        new_t, new = best_time(dynamic_window_interpolation, data, repeat=1 if n > 100000 else 3)
+        if n <= args.legacy_max:
+            old_t, old = best_time(legacy_fill, data, repeat=1)
+            x, y = old.to_numpy(), new.to_numpy()
+            diff = np.nanmax(np.abs(x - y))
+            same_nan = np.array_equal(np.isnan(x), np.isnan(y))
+            rows.append([n, len(new), f"{old_t:.2f}", f"{new_t * 1e3:.1f}", f"{old_t / new_t:.0f}x",
+                         f"{diff:.1e}{'' if same_nan else ' (NaN differs)'}"])
+        else:
+            rows.append([n, len(new), '', f"{new_t * 1e3:.1f}", '', ''])
+
+    print_table(['source rows', 'grid slots', 'legacy s', 'new ms', 'speedup', 'max abs diff'], rows)
+
+
+if __name__ == '__main__':
+    main()
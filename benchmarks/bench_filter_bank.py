@@ -0,0 +1,75 @@
+"""
+实时滤波器组基准：各滤波器及整组的逐点耗时，以及采集路径(handle_serial_data)在1kHz输入下的负载
+
+用法: python benchmarks/bench_filter_bank.py [--samples 100000] [--rate 1000] [--filters SPEC]
+负载 = 每秒输入样本的处理耗时 / 1秒，须远小于100%才能跟上输入
+"""
+import argparse
+
+import numpy as np
+
+from _common import best_time, print_table
+from mag_aq import handle_serial_data
+from lib.utils.filters import FilterBank, MovingAverage
+
+DEFAULT_SPEC = "median:5,ema:0.1,savgol:11:2,butter:2:5:100"
+
+
+class CountingWriter:
+    def __init__(self):
+        self.rows = 0
+
+    def write(self, row):
+        self.rows += 1
+
+
+def run_bank(bank, values):
+    bank.reset()
+    update = bank.update
+    for v in values:
+        update(v)
+
+
+def run_reader(blocks, bank):
+    """按每次读取10行模拟采集线程"""
+    writer = CountingWriter()
+    window = MovingAverage(10)
+    pending = b''
+    for i, block in enumerate(blocks):
+        pending = handle_serial_data(pending, block, i, window, writer, bank)
+    return writer.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实时滤波器组基准")
+    parser.add_argument('--samples', type=int, default=100000, help="样本数")
+    parser.add_argument('--rate', type=int, default=1000, help="输入频率(Hz)")
+    parser.add_argument('--filters', default=DEFAULT_SPEC, help="滤波器组配置")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    values = (45700.0 + np.cumsum(rng.normal(0, 0.5, args.samples)) + rng.normal(0, 20, args.samples)).tolist()
+
+    rows = []
+    for item in args.filters.split(",") + [args.filters]:
+        bank = FilterBank.fromSpec(item)
+        secs, _ = best_time(run_bank, bank, values)
+        per_sample = secs / args.samples
+        rows.append([item if item != args.filters else "whole bank", f"{per_sample * 1e6:.2f}",
+                     f"{per_sample * args.rate * 100:.2f}"])
+    print_table(['filter', 'us/sample', f'load at {args.rate} Hz %'], rows)
+    print()
+
+    lines = [f"RD {i / args.rate:.3f},20001.123,-3000.456,41000.789\r\n".encode() for i in range(args.samples)]
+    blocks = [b"".join(lines[i:i + 10]) for i in range(0, len(lines), 10)]
+    rows = []
+    for name, spec in (("no filter bank", ""), ("with filter bank", args.filters)):
+        bank = FilterBank.fromSpec(spec) if spec else None
+        secs, count = best_time(run_reader, blocks, bank)
+        per_sample = secs / count
+        rows.append([name, f"{per_sample * 1e6:.2f}", f"{per_sample * args.rate * 100:.2f}"])
+    print_table(['reader path', 'us/sample', f'load at {args.rate} Hz %'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+磁力计RD行解析基准：对比逐行 datetime.now()+pd.to_datetime 往返 与 单调时钟整数时间戳+落盘时批量格式化(微秒/行)
+
+用法: python benchmarks/bench_mag_parse.py [--lines 20000] [--blob 10]
+使用合成的100Hz RD数据流，时钟由合成序列注入，两种实现的输出逐项核对
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from mag_aq import CSV_FLUSH_ROWS, parse_received_data
+from lib.utils.acquisition_clock import AcquisitionClock
+from lib.utils.timestamp_utils import NS_PER_MS, format_timestamps_ms
+
+_clock = None    # 原实现使用的注入时钟
+
+
+def legacy_parse_received_data(received_data):
+    """原实现，datetime.now() 替换为可注入的时钟"""
+    x_values = []
+    y_values = []
+    z_values = []
+    t_values = []
+    timestamps = []
+
+    lines = received_data.splitlines()
+    last_different_timestamp = None
+    same_timestamp_count = 0
+    temp_data_points = []
+
+    for line in lines:
+        line = line.strip()
+        parts = line.split()
+        for i, part in enumerate(parts):
+            if part.startswith("RD"):
+                if i + 1 < len(parts):
+                    xyz_parts = parts[i + 1].split(",")
+                    if len(xyz_parts) == 4:
+                        t = float(xyz_parts[0].strip())
+                        x = float(xyz_parts[1].strip())
+                        y = float(xyz_parts[2].strip())
+                        z = float(xyz_parts[3].strip())
+                        current_time = _clock().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                        if not timestamps:
+                            last_different_timestamp = current_time
+                            timestamps.append(current_time)
+                            t_values.append(t)
+                            x_values.append(x)
+                            y_values.append(y)
+                            z_values.append(z)
+                            continue
+                        prev_timestamp = pd.to_datetime(timestamps[-1])
+                        curr_timestamp = pd.to_datetime(current_time)
+                        time_diff = (curr_timestamp - prev_timestamp).total_seconds() * 1000
+                        if time_diff < 2:
+                            same_timestamp_count += 1
+                            temp_data_points.append({'t': t, 'x': x, 'y': y, 'z': z, 'timestamp': current_time})
+                        else:
+                            if temp_data_points:
+                                temp_data_points.append({'t': t, 'x': x, 'y': y, 'z': z, 'timestamp': current_time})
+                                first_timestamp = pd.to_datetime(last_different_timestamp)
+                                last_timestamp = pd.to_datetime(current_time)
+                                total_interval = (last_timestamp - first_timestamp).total_seconds() * 1000
+                                interval = total_interval / (len(temp_data_points))
+                                for idx, point in enumerate(temp_data_points):
+                                    new_timestamp = first_timestamp + pd.Timedelta(milliseconds=int(interval * (idx + 1)))
+                                    timestamps.append(new_timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
+                                    t_values.append(point['t'])
+                                    x_values.append(point['x'])
+                                    y_values.append(point['y'])
+                                    z_values.append(point['z'])
+                                temp_data_points = []
+                                same_timestamp_count = 0
+                                last_different_timestamp = current_time
+                            else:
+                                timestamps.append(current_time)
+                                t_values.append(t)
+                                x_values.append(x)
+                                y_values.append(y)
+                                z_values.append(z)
+                                last_different_timestamp = current_time
+
+    if temp_data_points:
+        first_timestamp = pd.to_datetime(last_different_timestamp)
+        last_timestamp = pd.to_datetime(temp_data_points[-1]['timestamp'])
+        total_interval = (last_timestamp - first_timestamp).total_seconds() * 1000
+        interval = total_interval / (len(temp_data_points))
+        for idx, point in enumerate(temp_data_points):
+            new_timestamp = first_timestamp + pd.Timedelta(milliseconds=int(interval * (idx + 1)))
+            timestamps.append(new_timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
+            t_values.append(point['t'])
+            x_values.append(point['x'])
+            y_values.append(point['y'])
+            z_values.append(point['z'])
+
+    return x_values, y_values, z_values, t_values, timestamps
+
+
+def synthetic_rd_stream(n, seed=0):
+    """100Hz RD数据行及每行的接收时间(本地时间，毫秒)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 0.01
+    xyz = rng.normal([20000.0, -3000.0, 41000.0], 50.0, size=(n, 3))
+    lines = [f"RD {ti:.3f},{x:.3f},{y:.3f},{z:.3f}" for ti, (x, y, z) in zip(t, xyz)]
+    recv_ms = 1738726635040 + np.maximum.accumulate(np.arange(n) * 10 + rng.integers(0, 3, n))
+    return lines, recv_ms.tolist()
+
+
+def run_legacy(blocks, inject_clock=True):
+    """inject_clock=False 时使用真实的 datetime.now()，用于计时"""
+    global _clock
+    out = []
+    for text, recv_ms in blocks:
+        if inject_clock:
+            stamp = datetime(1970, 1, 1) + timedelta(milliseconds=recv_ms)
+            _clock = lambda: stamp
+        else:
+            _clock = datetime.now
+        out.append(legacy_parse_received_data(text))
+    return out
+
+
+def run_vectorized(blocks):
+    """解析后将时间戳格式化为字符串，用于与原实现核对"""
+    out = []
+    for text, recv_ms in blocks:
+        x, y, z, t, ts = parse_received_data(text, recv_ms * NS_PER_MS)
+        out.append((x, y, z, t, format_timestamps_ms(np.asarray(ts, dtype=np.int64)).tolist()))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parse_received_data 解析基准")
+    parser.add_argument('--lines', type=int, default=20000, help="合成RD行数(100Hz)")
+    parser.add_argument('--blob', type=int, default=10, help="整块模式下单次传入的行数")
+    args = parser.parse_args()
+
+    lines, recv_ms = synthetic_rd_stream(args.lines)
+    modes = {
+        'single line': [(line, ms) for line, ms in zip(lines, recv_ms)],
+        f'{args.blob}-line blob': [("\n".join(lines[i:i + args.blob]), recv_ms[i])
+                                   for i in range(0, len(lines), args.blob)],
+    }
+
+    rows = []
+    for name, blocks in modes.items():
+        old_t, _ = best_time(run_legacy, blocks, False, repeat=1)
+        old = run_legacy(blocks)
+        # 采集线程读取时钟并解析；写入线程按 CSV_FLUSH_ROWS 分块格式化时间戳
+        clock = AcquisitionClock()
+        new_t, _ = best_time(lambda: [parse_received_data(text, clock.now()) for text, ms in blocks])
+        fmt_t, _ = best_time(lambda: [format_timestamps_ms(clock.to_local_ns(np.asarray(recv_ms[i:i + CSV_FLUSH_ROWS], dtype=np.int64) * NS_PER_MS))
+                                      for i in range(0, len(recv_ms), CSV_FLUSH_ROWS)])
+        new = run_vectorized(blocks)
+        rows.append([name, len(lines), f"{old_t / len(lines) * 1e6:.1f}",
+                     f"{new_t / len(lines) * 1e6:.2f}", f"{fmt_t / len(lines) * 1e6:.2f}",
+                     f"{old_t / (new_t + fmt_t):.0f}x", old == new])
+
+    print_table(['mode', 'lines', 'legacy us/line', 'parse us/line', 'format us/line', 'speedup', 'identical'], rows)
+
+
+if __name__ == '__main__':
+    main()
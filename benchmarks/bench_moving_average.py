@@ -0,0 +1,67 @@
+"""
+均值滤波基准：对比逐点切片+np.mean 与累计和实现(整列)，以及 deque+sum 与增量滤波器(逐点)
+
+用法: python benchmarks/bench_moving_average.py [--sizes 10000 100000 360000] [--window 10]
+使用合成的磁场模值序列，报告与原实现的最大绝对误差
+"""
+import argparse
+from collections import deque
+
+import numpy as np
+
+from _common import best_time, print_table
+from lib.utils.filters import MovingAverage, moving_average
+
+
+def legacy_moving_average_filter(data, window_size=10):
+    """原实现"""
+    filtered_data = []
+    for i in range(len(data)):
+        start_index = max(0, i - window_size + 1)
+        window = data[start_index:i+1]
+        filtered_data.append(np.mean(window))
+    return filtered_data
+
+
+def legacy_streaming(values, window_size):
+    """原采集线程：deque 保存最近的模值，每个点 sum/len"""
+    window = deque(maxlen=window_size)
+    out = []
+    for v in values:
+        window.append(v)
+        out.append(sum(window) / len(window))
+    return out
+
+
+def streaming(values, window_size):
+    window = MovingAverage(window_size)
+    return [window.update(v) for v in values]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="均值滤波基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 360000], help="数据点数")
+    parser.add_argument('--window', type=int, default=10, help="窗口大小")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in args.sizes:
+        data = 45700.0 + np.cumsum(rng.normal(0, 0.5, n)) + rng.normal(0, 20, n)
+        values = data.tolist()
+
+        old_t, old = best_time(legacy_moving_average_filter, data, args.window, repeat=1)
+        new_t, new = best_time(moving_average, data, args.window)
+        rows.append(['batch', n, f"{old_t * 1e3:.1f}", f"{new_t * 1e3:.2f}", f"{old_t / new_t:.0f}x",
+                     f"{np.abs(np.asarray(old) - new).max():.1e}"])
+
+        old_t, old = best_time(legacy_streaming, values, args.window)
+        new_t, new = best_time(streaming, values, args.window)
+        rows.append(['streaming', n, f"{old_t * 1e3:.1f}", f"{new_t * 1e3:.2f}", f"{old_t / new_t:.1f}x",
+                     f"{np.abs(np.asarray(old) - new).max():.1e}"])
+
+    print_table(['mode', 'points', 'legacy ms', 'new ms', 'speedup', 'max abs diff'], rows)
+
+
+if __name__ == '__main__':
+    main()
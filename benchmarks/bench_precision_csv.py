@@ -0,0 +1,108 @@
+"""
+合并数据导出基准：synchronize_and_merge 的最后一步，对比原来逐单元格 apply(format_with_precision) 后 to_csv
+与 csv_export.write_precision_csv 按块逐行 %-格式化，并对比末尾空行的去除
+
+用法: python benchmarks/bench_precision_csv.py [--rows 1000000] [--dir /tmp]
+合成数据与 merged_sensor_data.csv 的列相同(10ms网格)，部分磁力计列为空、末尾有全空的行，核对两种实现写出的文件
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from csv_export import write_precision_csv
+from sync_sensor_data_3 import remove_trailing_nulls
+
+INS_COLUMNS = ['acceleration x (g)', 'acceleration y (g)', 'acceleration z (g)', 'angular_velocity_x (dps)',
+               'angular_velocity_y (dps)', 'angular_velocity_z (dps)', 'temperature (°c)', 'longitude', 'latitude',
+               'time']
+MAG_COLUMNS = ['x', 'y', 'z', 'magnitude', 'filtered magnitude']
+
+
+def format_with_precision(value, precision=8, pad_zeros=False):
+    """原实现"""
+    try:
+        if pd.isna(value):
+            return ''
+        rounded = round(float(value), precision)
+        format_str = '{:0.%df}' % precision if pad_zeros else '{:.%df}' % precision
+        return format_str.format(rounded)
+    except:
+        return ''
+
+
+def legacy_remove_trailing_nulls(df):
+    last_valid_idx = -1
+    for idx in range(len(df) - 1, -1, -1):
+        if not df.iloc[idx].isna().all():
+            last_valid_idx = idx
+            break
+    return df.iloc[:last_valid_idx + 1] if last_valid_idx >= 0 else df.iloc[0:0]
+
+
+def legacy_export(merged, output_path):
+    formatted_data = merged.reset_index()
+    formatted_data.index = formatted_data['index'].apply(
+        lambda x: x.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    )
+    for col in formatted_data.columns:
+        if col == 'index':
+            continue
+        col_lower = col.lower()
+        if col_lower in ['longitude', 'latitude']:
+            formatted_data[col] = formatted_data[col].apply(lambda x: format_with_precision(x, 8, pad_zeros=True))
+        elif col_lower in ['x', 'y', 'z', 'magnitude', 'filtered magnitude']:
+            formatted_data[col] = formatted_data[col].apply(lambda x: format_with_precision(x, 6))
+        elif col_lower != 'timestamp':
+            formatted_data[col] = formatted_data[col].apply(lambda x: format_with_precision(x, 4))
+    formatted_data = formatted_data.rename(columns={'index': 'timestamp'})
+    formatted_data.to_csv(output_path, index=False)
+
+
+def make_merged(n, rng):
+    start = pd.Timestamp('2025-02-05 05:00:28.790').value
+    index = pd.DatetimeIndex(start + np.arange(n, dtype=np.int64) * 10_000_000)
+    scale = [0.03, 0.03, 1.0, 5.0, 5.0, 5.0, 30.0, 106.0, 35.0, 1e4, 0.4, 0.4, 0.3, 0.7, 0.7]
+    values = rng.normal(size=(n, len(scale))) * scale
+    values[:, 7:9] = np.round(values[:, 7:9], 8)       # 与 synchronize_and_merge 中经纬度的处理相同
+    merged = pd.DataFrame(values, index=index, columns=INS_COLUMNS + MAG_COLUMNS)
+    merged.iloc[::53, 10:] = np.nan
+    merged.iloc[-100:] = np.nan
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合并数据导出基准")
+    parser.add_argument('--rows', type=int, default=1000000, help="合并数据行数")
+    parser.add_argument('--dir', default=None, help="临时文件目录，默认使用系统临时目录")
+    args = parser.parse_args()
+
+    merged = make_merged(args.rows, np.random.default_rng(0))
+    directory = tempfile.mkdtemp(dir=args.dir)
+    try:
+        old_path = os.path.join(directory, 'legacy.csv')
+        new_path = os.path.join(directory, 'new.csv')
+        old_trim_t, old_trimmed = best_time(legacy_remove_trailing_nulls, merged)
+        new_trim_t, new_trimmed = best_time(remove_trailing_nulls, merged)
+        old_t, _ = best_time(legacy_export, old_trimmed, old_path, repeat=1)
+        new_t, _ = best_time(write_precision_csv, new_trimmed, new_path)
+        same = filecmp.cmp(old_path, new_path, shallow=False)
+        size = os.path.getsize(new_path) / 1e6
+    finally:
+        shutil.rmtree(directory)
+
+    print_table(['step', 'rows', 'legacy ms', 'new ms', 'speedup', 'identical'], [
+        ['trim trailing nulls', len(merged), f"{old_trim_t * 1e3:.1f}", f"{new_trim_t * 1e3:.1f}",
+         f"{old_trim_t / new_trim_t:.0f}x", 'yes' if len(old_trimmed) == len(new_trimmed) else 'NO'],
+        [f'export ({size:.0f} MB)', len(new_trimmed), f"{old_t * 1e3:.0f}", f"{new_t * 1e3:.0f}",
+         f"{old_t / new_t:.0f}x", 'yes' if same else 'NO'],
+    ])
+
+
+if __name__ == '__main__':
+    main()
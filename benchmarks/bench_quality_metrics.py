@@ -0,0 +1,103 @@
+"""
+数据质量指标基准：对比原来逐个窗口调用 calculate_quality_metrics、用 pandas rolling 检测采样间隔异常，
+与 quality_metrics 由分块累加和计算所有窗口
+
+用法: python benchmarks/bench_quality_metrics.py [--hours 1 10] [--window 100] [--hop 50]
+100Hz 数据，含5%随机缺失；峰值内存为 tracemalloc 统计的计算过程中新分配的内存
+计时为 skipna=True(原实现窗口为 Series)；另核对 skipna=False 与原实现作用于数组的结果(含NaN的窗口为NaN)
+累加和相减与逐窗口求和的舍入不同，方差与信噪比按相对误差 1e-9 核对，NaN与0的位置须完全一致
+"""
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from quality_metrics import interval_drift, window_metrics
+
+
+def legacy_quality_metrics(window_data):
+    """原 SensorDataSynchronizer.calculate_quality_metrics"""
+    metrics = {
+        'variance': np.var(window_data),
+        'missing_data': np.sum(np.isnan(window_data)),
+        'signal_noise_ratio': np.mean(window_data) / np.std(window_data) if np.std(window_data) != 0 else 0
+    }
+    return metrics
+
+
+def legacy_windows(values, window, hop, as_series=True):
+    """原 sync_with_sliding_window 的逐窗口循环，窗口为 Series 时 NaN 不参与统计，为数组时结果为NaN"""
+    data = pd.Series(values).iloc if as_series else values
+    results = [legacy_quality_metrics(data[i:i + window]) for i in range(0, len(values) - window + 1, hop)]
+    return {name: np.array([r[name] for r in results], dtype=float) for name in results[0]}
+
+
+def legacy_drift(times, window_size=50):
+    """原 SensorDataSynchronizer.detect_time_drift"""
+    timestamps = pd.to_datetime(times)
+    time_diffs = timestamps.diff().dt.total_seconds()
+    rolling_mean = time_diffs.rolling(window=window_size).mean()
+    rolling_std = time_diffs.rolling(window=window_size).std()
+    drift_points = np.where(np.abs(time_diffs - rolling_mean) > 3 * rolling_std)[0]
+    return drift_points, rolling_mean, rolling_std
+
+
+def make_session(hours, rng):
+    n = int(hours * 3600 * 100)
+    values = 0.67 + rng.normal(0, 0.01, n)
+    values[rng.random(n) < 0.05] = np.nan
+    ms = 1_738_731_628_790 + np.cumsum(rng.integers(6, 15, n))
+    return values, pd.Series(ms.astype('datetime64[ms]'))
+
+
+def same_metrics(old, new):
+    return all(np.array_equal(np.isnan(old[name]), np.isnan(new[name]))
+               and np.array_equal(old[name] == 0, new[name] == 0)
+               and np.allclose(old[name], new[name], rtol=1e-9, atol=0, equal_nan=True) for name in old)
+
+
+def peak_memory(fn, *args, **kwargs):
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据质量指标基准")
+    parser.add_argument('--hours', type=float, nargs='+', default=[1.0, 10.0], help="数据时长(小时)")
+    parser.add_argument('--window', type=int, default=100, help="窗口长度")
+    parser.add_argument('--hop', type=int, default=50, help="窗口步长")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for hours in args.hours:
+        values, times = make_session(hours, rng)
+        new_t, new = best_time(window_metrics, values, args.window, args.hop, skipna=True)
+        drift_t, drift = best_time(interval_drift, times)
+        peak = peak_memory(window_metrics, values, args.window, args.hop, skipna=True) / values.nbytes
+        if hours <= 1:
+            old_t, old = best_time(legacy_windows, values, args.window, args.hop, repeat=1)
+            old_array = legacy_windows(values, args.window, args.hop, as_series=False)
+            new_array = window_metrics(values, args.window, args.hop)
+            same = same_metrics(old, new) and same_metrics(old_array, new_array)
+            old_drift_t, old_drift = best_time(legacy_drift, times, repeat=1)
+            same_drift = (np.array_equal(old_drift[0], drift[0])
+                          and np.allclose(old_drift[2], drift[2], rtol=1e-9, atol=1e-15, equal_nan=True))
+            rows.append([f"{hours:g}", len(values), f"{old_t:.1f}", f"{new_t * 1e3:.0f}", f"{old_t / new_t:.0f}x",
+                         'yes' if same else 'NO', f"{old_drift_t * 1e3:.0f}", f"{drift_t * 1e3:.0f}",
+                         'yes' if same_drift else 'NO', f"{peak:.2f}"])
+        else:
+            rows.append([f"{hours:g}", len(values), '', f"{new_t * 1e3:.0f}", '', '', '', f"{drift_t * 1e3:.0f}", '',
+                         f"{peak:.2f}"])
+
+    print_table(['hours', 'samples', 'legacy windows s', 'new ms', 'speedup', 'equal',
+                 'legacy drift ms', 'new drift ms', 'same drift points', 'peak mem / input'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+样本缓存内存基准：对比 ins_aq 原来的10个全局列表与列式 SampleBuffer 的每样本内存(tracemalloc)及写入耗时
+
+用法: python benchmarks/bench_sample_buffer.py [--samples 720000] [--chunk 64]
+模拟批量解码路径：每次读取产生 chunk 个样本的记录(与 build_update_records 输出相同的列)，
+芯片时间为每个样本新建的字符串，浮点数由数组 tolist() 产生
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import types
+import sys
+
+import numpy as np
+
+from _common import print_table
+
+sys.modules.setdefault('mpl_toolkits.basemap', types.SimpleNamespace(Basemap=None))
+from ins_aq import RECORD_FIELDS, SAMPLE_COLUMNS
+from lib.utils.sample_buffer import SampleBuffer
+
+LIST_FIELDS = ("Chiptime", "temperature", "accX", "accY", "accZ", "lon", "lat", "gyroX", "gyroY", "gyroZ")
+
+
+def make_records(start, count, rng):
+    records = {name: rng.normal(0, 1, count).round(3) for name in RECORD_FIELDS if name != "Chiptime"}
+    records["lon"] = 120.0 + rng.normal(0, 1e-4, count)
+    records["lat"] = 30.0 + rng.normal(0, 1e-4, count)
+    records["Chiptime"] = np.array([f"2025-2-5 3:{(start + i) // 60000 % 60}:{(start + i) // 1000 % 60}.{(start + i) % 1000}"
+                                    for i in range(count)], dtype=object)
+    return records
+
+
+class ListStore:
+    """原 ins_aq：每列一个Python列表"""
+
+    def __init__(self):
+        self.lists = {name: [] for name in LIST_FIELDS}
+
+    def extend(self, records):
+        for name in LIST_FIELDS:
+            self.lists[name].extend(records[name].tolist())
+
+    def append(self, row):
+        for name, value in zip(LIST_FIELDS, row):
+            self.lists[name].append(value)
+
+
+def fill(store, samples, chunk, per_sample):
+    rng = np.random.default_rng(0)
+    elapsed = 0.0
+    for start in range(0, samples, chunk):
+        records = make_records(start, min(chunk, samples - start), rng)
+        if per_sample:
+            rows = list(zip(*(records[name].tolist() for name in LIST_FIELDS)))
+            begin = time.perf_counter()
+            for row in rows:
+                store.append(row)
+        else:
+            begin = time.perf_counter()
+            store.extend(records)
+        elapsed += time.perf_counter() - begin
+    return elapsed
+
+
+def measure(factory, samples, chunk, per_sample):
+    """内存在 tracemalloc 下测量，耗时另外在不跟踪内存时测量"""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    store = factory()
+    fill(store, samples, chunk, per_sample)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del store
+    gc.collect()
+    store = factory()
+    elapsed = fill(store, samples, chunk, per_sample)
+    return used, elapsed, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="样本缓存内存基准")
+    parser.add_argument('--samples', type=int, default=720000, help="样本数(默认200Hz采集1小时)")
+    parser.add_argument('--chunk', type=int, default=64, help="每次读取的样本数")
+    args = parser.parse_args()
+
+    rows = []
+    for mode, per_sample in (("bulk extend", False), ("per-sample append", True)):
+        for name, factory in (("lists", ListStore), ("SampleBuffer", lambda: SampleBuffer(SAMPLE_COLUMNS, capacity=4096))):
+            used, elapsed, store = measure(factory, args.samples, args.chunk, per_sample)
+            filled = ""
+            if isinstance(store, SampleBuffer):
+                filled = f"{store.nbytes / store.capacity:.0f}"
+            rows.append([mode, name, f"{used / args.samples:.1f}", filled, f"{elapsed / args.samples * 1e6:.2f}"])
+            del store
+
+    print_table(['mode', 'store', 'bytes/sample (traced)', 'bytes/sample (at capacity)', 'us/sample'], rows)
+
+
+if __name__ == '__main__':
+    main()
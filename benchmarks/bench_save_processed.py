@@ -0,0 +1,99 @@
+"""
+处理后磁力计数据保存基准：对比逐行 iterrows 生成 Base_Time 与整列计算+一次格式化
+
+用法: python benchmarks/bench_save_processed.py [--minutes 60] [--rate 100]
+使用合成的原始数据(与 mag_data/unprocessed 格式一致)，核对两种实现写出的文件
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from mag_aq import MAG_CSV_HEADER, PROCESSED_DATA_DIR, process_mag_data, save_processed_csv
+from lib.utils.timestamp_utils import NS_PER_S, format_timestamps_ms
+
+
+def legacy_save_processed_csv(df, file_path, duration):
+    """原实现"""
+    base_name = os.path.basename(file_path)
+    df_processed, _ = process_mag_data(df.copy())
+    for col in ['Time', 'X', 'Y', 'Z', 'Magnitude', 'Filtered Magnitude']:
+        df_processed[col] = df_processed[col].round(6)
+    for col in ['Timestamp', 'Monotonic_ns']:
+        if 'Processed_' + col in df_processed.columns:
+            if col in df_processed.columns:
+                df_processed = df_processed.drop(col, axis=1)
+            df_processed = df_processed.rename(columns={'Processed_' + col: col})
+    base_timestamp = pd.to_datetime(df_processed['Timestamp'].iloc[0])
+    first_time = df_processed['Time'].iloc[0]
+
+    def calculate_base_time(row, index):
+        if index == 0:
+            return base_timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        return (base_timestamp + pd.Timedelta(seconds=float(row['Time'] - first_time))).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+    df_processed['Base_Time'] = [calculate_base_time(row, i) for i, row in df_processed.iterrows()]
+    columns = ['Base_Time', 'Time', 'X', 'Y', 'Z', 'Magnitude', 'Filtered Magnitude', 'Timestamp']
+    if 'Monotonic_ns' in df_processed.columns:
+        columns.append('Monotonic_ns')
+    df_processed = df_processed[columns]
+    df_processed = df_processed[df_processed['Time'] <= duration]
+    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+    processed_file = os.path.join(PROCESSED_DATA_DIR, base_name.replace(".csv", "_processed.csv"))
+    df_processed.to_csv(processed_file, index=False, float_format='%.6f')
+
+
+def synthetic_capture(n, rate, seed=0):
+    """与落盘的原始数据相同的列和精度(经过一次CSV往返)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(1, n + 1) / rate
+    xyz = rng.normal([20000.0, -3000.0, 41000.0], 50.0, size=(n, 3))
+    magnitude = np.sqrt((xyz ** 2).sum(axis=1))
+    filtered = pd.Series(magnitude).rolling(10, min_periods=1).mean().to_numpy()
+    mono = 5_000 * NS_PER_S + (t * NS_PER_S).astype(np.int64) + rng.integers(200_000, 3_000_000, n)
+    mono = np.maximum.accumulate(mono)
+    anchor = 1_738_726_635 * NS_PER_S - 5_000 * NS_PER_S
+    df = pd.DataFrame({'Time': t, 'X': xyz[:, 0], 'Y': xyz[:, 1], 'Z': xyz[:, 2], 'Magnitude': magnitude,
+                       'Filtered Magnitude': filtered, 'Timestamp': format_timestamps_ms(mono + anchor),
+                       'Monotonic_ns': mono}, columns=MAG_CSV_HEADER)
+    return pd.read_csv(io.StringIO(df.to_csv(index=False, float_format='%.6f')))
+
+
+def run(fn, df, name, duration):
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(df, name, duration)
+    with open(os.path.join(PROCESSED_DATA_DIR, name.replace(".csv", "_processed.csv"))) as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="save_processed_csv 保存基准")
+    parser.add_argument('--minutes', type=float, default=60, help="合成采集时长(分钟)")
+    parser.add_argument('--rate', type=int, default=100, help="采样率(Hz)")
+    args = parser.parse_args()
+
+    duration = int(args.minutes * 60)
+    df = synthetic_capture(duration * args.rate, args.rate)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            old_t, old = best_time(run, legacy_save_processed_csv, df, "legacy.csv", duration, repeat=1)
+            new_t, new = best_time(run, save_processed_csv, df, "vectorized.csv", duration)
+        finally:
+            os.chdir(cwd)
+
+    # Base_Time 与原实现相同，向零截断到纳秒后再截断到毫秒，输出应逐字节一致
+    old_df, new_df = pd.read_csv(io.StringIO(old), dtype=str), pd.read_csv(io.StringIO(new), dtype=str)
+    shift_ms = (pd.to_datetime(new_df['Base_Time']) - pd.to_datetime(old_df['Base_Time'])).dt.total_seconds() * 1000
+    print_table(['rows', 'legacy s', 'vectorized s', 'speedup', 'identical', 'Base_Time diffs'],
+                [[len(df), f"{old_t:.2f}", f"{new_t:.2f}", f"{old_t / new_t:.1f}x", old == new,
+                  int((shift_ms != 0).sum())]])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+串口读取CPU占用基准：对比 in_waiting 空转轮询 与 阻塞读取(read(1)+read(in_waiting))
+
+用法: python benchmarks/bench_serial_cpu.py [--seconds 5] [--ins-rate 200] [--mag-rate 100]
+使用 pty 模拟串口设备，数据由独立进程按固定频率写入，只统计读取端进程的CPU时间(Linux)
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+import tty
+
+import serial
+
+from _common import print_table
+from _streams import load_recorded_ins, wit_stream
+from lib.device_model import DeviceModel
+from lib.protocol_resolver.roles.wit_protocol_resolver import WitProtocolResolver
+from mag_aq import SERIAL_READ_TIMEOUT_S, parse_received_data, read_from_serial
+
+
+class CountingProcessor:
+    """统计数据更新事件中的记录数"""
+
+    def __init__(self):
+        self.samples = 0
+
+    def onUpdate(self, deviceModel):
+        self.samples += 1
+
+    def onBulkUpdate(self, deviceModel, records):
+        self.samples += len(records["Chiptime"])
+
+
+class PollingDeviceModel(DeviceModel):
+    """原 readDataTh：串口打开期间空转轮询 inWaiting"""
+
+    def readDataTh(self, threadName, delay):
+        while True:
+            if self.isOpen:
+                try:
+                    tlen = self.serialPort.inWaiting()
+                    if (tlen>0):
+                        data = self.serialPort.read(tlen)
+                        self.dataReceivedNs = self.clock.now()
+                        self.onDataReceived(data)
+                except Exception:
+                    pass
+            else:
+                break
+
+
+class CountingWriter:
+    """代替CSV写入器，只统计样本数"""
+
+    def __init__(self):
+        self.samples = 0
+
+    def write(self, row):
+        self.samples += 1
+
+
+def polling_read_from_serial(ser, stop_event, writer, duration, clock=None):
+    """原 read_from_serial：空转轮询 in_waiting 后 readline()"""
+    while not stop_event.is_set():
+        try:
+            if not ser.is_open:
+                break
+            if ser.in_waiting > 0:
+                line = ser.readline()
+                recv_ns = time.monotonic_ns()
+                line = line.decode(errors='ignore').strip()
+                if line and not stop_event.is_set():
+                    for row in zip(*parse_received_data(line, recv_ns)):
+                        writer.write(row)
+        except:
+            break
+
+
+def feed(master, packets, rate, seconds):
+    """按固定频率向pty写入数据包"""
+    start = time.monotonic()
+    for i in range(int(rate * seconds)):
+        delay = start + i / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        os.write(master, packets[i % len(packets)])
+
+
+def open_pty():
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    return master, slave, os.ttyname(slave)
+
+
+def measure(run, packets, rate, seconds):
+    """运行读取端，返回 (CPU占用%, 收到的样本数)"""
+    master, slave, name = open_pty()
+    feeder = None
+    if packets:
+        feeder = multiprocessing.Process(target=feed, args=(master, packets, rate, seconds))
+    try:
+        cpu_start = time.process_time()
+        wall_start = time.monotonic()
+        samples = run(name, seconds, feeder)
+        cpu = time.process_time() - cpu_start
+        wall = time.monotonic() - wall_start
+    finally:
+        if feeder is not None:
+            feeder.join()
+        os.close(master)
+        os.close(slave)
+    return cpu / wall * 100, samples
+
+
+def run_device_model(model_cls):
+    def run(name, seconds, feeder):
+        processor = CountingProcessor()
+        device = model_cls("bench", WitProtocolResolver(bulkDecode=True), processor, "51_0")
+        device.serialConfig.portName = name
+        device.serialConfig.baud = 115200
+        device.openDevice()
+        if feeder is not None:
+            feeder.start()
+        time.sleep(seconds + 0.2)
+        device.closeDevice()
+        time.sleep(0.6)     # 等待读取线程退出
+        return processor.samples
+    return run
+
+
+def run_mag_reader(reader, timeout):
+    def run(name, seconds, feeder):
+        ser = serial.Serial(name, 115200, timeout=timeout)
+        writer = CountingWriter()
+        stop_event = threading.Event()
+        thread = threading.Thread(target=reader, args=(ser, stop_event, writer, 0))
+        thread.start()
+        if feeder is not None:
+            feeder.start()
+        time.sleep(seconds + 0.2)
+        stop_event.set()
+        thread.join()
+        ser.close()
+        return writer.samples
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="串口读取CPU占用基准")
+    parser.add_argument('--seconds', type=float, default=5.0, help="每种情况的运行时长")
+    parser.add_argument('--ins-rate', type=int, default=200, help="INS输出频率(Hz)")
+    parser.add_argument('--mag-rate', type=int, default=100, help="磁力计输出频率(Hz)")
+    args = parser.parse_args()
+
+    df = load_recorded_ins(args.ins_rate * 10)
+    stream = wit_stream(df)
+    sample_size = len(stream) // len(df)
+    ins_packets = [stream[i:i + sample_size] for i in range(0, len(stream), sample_size)]
+    mag_packets = [f"RD {i / args.mag_rate:.3f},20001.123,-3000.456,41000.789\r\n".encode()
+                   for i in range(args.mag_rate * 10)]
+
+    cases = [
+        ('DeviceModel', 'polling', run_device_model(PollingDeviceModel), ins_packets, args.ins_rate),
+        ('DeviceModel', 'blocking', run_device_model(DeviceModel), ins_packets, args.ins_rate),
+        ('mag_aq', 'polling', run_mag_reader(polling_read_from_serial, 1), mag_packets, args.mag_rate),
+        ('mag_aq', 'blocking', run_mag_reader(read_from_serial, SERIAL_READ_TIMEOUT_S), mag_packets, args.mag_rate),
+    ]
+    rows = []
+    for reader, mode, run, packets, rate in cases:
+        idle_cpu, _ = measure(run, None, rate, args.seconds)
+        busy_cpu, samples = measure(run, packets, rate, args.seconds)
+        rows.append([reader, mode, f"{idle_cpu:.1f}", f"{busy_cpu:.1f}",
+                     samples, int(rate * args.seconds)])
+
+    print_table(['reader', 'mode', 'idle CPU %', 'streaming CPU %', 'updates', 'samples sent'], rows)
+
+
+if __name__ == '__main__':
+    main()
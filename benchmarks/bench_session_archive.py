@@ -0,0 +1,94 @@
+"""
+会话归档读取基准：仓库中的 test_data 与 mag_data 文件按时间平移拼接放大100倍后，
+对比现有的 pd.read_csv(+时间列解析) 与 Parquet 归档的读取耗时：整表、只读两列、只读10%的时间范围
+
+用法: python benchmarks/bench_session_archive.py [--scale 100] [--dir /tmp]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from _common import ROOT, best_time, print_table
+from session_archive import archive_session, find_time_column, load_session
+
+SOURCES = [
+    ("test_data/ins_data.csv", ["Acceleration X (g)", "Timestamp"]),
+    ("test_data/mag_data.csv", ["Magnitude", "Timestamp"]),
+    ("mag_data/processed/mag_data_20250205_050028_processed.csv", ["Magnitude", "Timestamp"]),
+]
+
+
+def scale_csv(src, dst, scale):
+    """每份数据的时间列依次平移一个会话时长后拼接"""
+    df = pd.read_csv(src)
+    time_col = find_time_column(df.columns)
+    times = pd.to_datetime(df[time_col])
+    span = times.max() - times.min() + pd.Timedelta(milliseconds=10)
+    parts = []
+    for k in range(scale):
+        part = df.copy()
+        part[time_col] = (times + span * k).dt.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3]
+        parts.append(part)
+    pd.concat(parts, ignore_index=True).to_csv(dst, index=False, float_format='%.6f')
+    return times.min(), times.min() + span * scale
+
+
+def read_csv_full(path, time_col):
+    df = pd.read_csv(path)
+    df[time_col] = pd.to_datetime(df[time_col], errors='coerce')
+    return df
+
+
+def read_csv_columns(path, columns):
+    return pd.read_csv(path, usecols=columns)
+
+
+def read_csv_range(path, time_col, start, end):
+    df = read_csv_full(path, time_col)
+    return df[(df[time_col] >= start) & (df[time_col] < end)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话归档读取基准")
+    parser.add_argument('--scale', type=int, default=100, help="放大倍数")
+    parser.add_argument('--dir', default=None, help="临时文件目录，默认使用系统临时目录")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    rows = []
+    try:
+        for src, columns in SOURCES:
+            name = os.path.basename(src)
+            csv_path = os.path.join(directory, name)
+            first, last = scale_csv(os.path.join(ROOT, src), csv_path, args.scale)
+            parquet_path = archive_session(csv_path)
+            time_col = find_time_column(pd.read_csv(csv_path, nrows=0).columns)
+            start = first + (last - first) * 0.45
+            end = start + (last - first) * 0.1
+
+            cases = [
+                ("full", (read_csv_full, csv_path, time_col), (load_session, parquet_path)),
+                ("2 columns", (read_csv_columns, csv_path, columns), (load_session, parquet_path, columns)),
+                ("10% range", (read_csv_range, csv_path, time_col, start, end),
+                 (load_session, parquet_path, None, start, end)),
+            ]
+            for case, (csv_fn, *csv_args), (pq_fn, *pq_args) in cases:
+                csv_t, csv_df = best_time(csv_fn, *csv_args)
+                pq_t, pq_df = best_time(pq_fn, *pq_args)
+                rows.append([name, case, len(pq_df), f"{csv_t * 1e3:.1f}", f"{pq_t * 1e3:.1f}",
+                             f"{csv_t / pq_t:.1f}x"])
+                assert len(csv_df) == len(pq_df)
+            rows.append([name, "size MB", "", f"{os.path.getsize(csv_path) / 1e6:.1f}",
+                         f"{os.path.getsize(parquet_path) / 1e6:.1f}", ""])
+    finally:
+        shutil.rmtree(directory)
+
+    print_table(['file (x%d)' % args.scale, 'read', 'rows', 'read_csv ms', 'parquet ms', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
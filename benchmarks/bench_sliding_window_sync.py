@@ -0,0 +1,132 @@
+"""
+滑动窗口同步基准：sync_sensor_data_2.SensorDataSynchronizer.sync_with_sliding_window
+对比原来逐行构造字典、每行重新滤波整个窗口的实现与按列整块组装的实现
+
+用法: python benchmarks/bench_sliding_window_sync.py [--minutes 60] [--legacy-minutes 5] [--dir /tmp/sliding_sync_bench]
+test_data 中的磁力计与INS数据按时间首尾相接重复，扩展到 --minutes 分钟；
+原实现只在 --legacy-minutes 分钟的数据上运行，更长的时长按每行耗时线性估算(标注 est.，
+原实现每行都重新计算时间列最小值，实际耗时随时长超线性增长，估算值偏低)
+Savitzky-Golay 滤波的窗口两端由多项式拟合得到，整块拟合与逐个窗口拟合的舍入不同，核对时允许1e-12的误差
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.signal import savgol_filter
+
+from _common import ROOT, best_time, print_table
+from sync_sensor_data_2 import SensorDataSynchronizer
+
+
+def legacy_sync_with_sliding_window(self):
+    """原实现"""
+    synchronized_data = []
+    start_time = max(self.mag_data['seconds'].min(), self.ins_data['seconds'].min())
+    end_time = min(self.mag_data['seconds'].max(), self.ins_data['seconds'].max())
+
+    time_points = np.arange(start_time, end_time, 0.01)
+    mag_interp = self.interpolate_sensor_data(self.mag_data, time_points)
+    ins_interp = self.interpolate_sensor_data(self.ins_data, time_points)
+    mag_drift, mag_roll_mean, mag_roll_std = self.detect_time_drift(self.mag_data)
+    ins_drift, ins_roll_mean, ins_roll_std = self.detect_time_drift(self.ins_data)
+    for i in range(0, len(time_points) - self.window_size, self.window_size // 2):
+        window_slice = slice(i, i + self.window_size)
+        mag_window = mag_interp.iloc[window_slice]
+        ins_window = ins_interp.iloc[window_slice]
+        mag_quality = self.calculate_quality_metrics(mag_window['Magnitude'])
+        ins_quality = self.calculate_quality_metrics(ins_window['Acceleration X (g)'])
+        for j in range(len(mag_window)):
+            combined_data = {
+                'Timestamp': pd.Timestamp(self.mag_data['Timestamp'].min()) +
+                             pd.Timedelta(seconds=time_points[i + j]),
+                'Time_Point': time_points[i + j],
+                'Mag_X': mag_window['X'].iloc[j],
+                'Mag_Y': mag_window['Y'].iloc[j],
+                'Mag_Z': mag_window['Z'].iloc[j],
+                'Mag_Magnitude': mag_window['Magnitude'].iloc[j],
+                'Mag_Filtered_Magnitude': savgol_filter(mag_window['Magnitude'],
+                                                        window_length=min(11, len(mag_window)),
+                                                        polyorder=3)[j],
+                'INS_Accel_X': ins_window['Acceleration X (g)'].iloc[j],
+                'INS_Accel_Y': ins_window['Acceleration Y (g)'].iloc[j],
+                'INS_Accel_Z': ins_window['Acceleration Z (g)'].iloc[j],
+                'INS_Gyro_X': ins_window['Angular_velocity_X (dps)'].iloc[j],
+                'INS_Gyro_Y': ins_window['Angular_velocity_Y (dps)'].iloc[j],
+                'INS_Gyro_Z': ins_window['Angular_velocity_Z (dps)'].iloc[j],
+                'INS_Temperature': ins_window['Temperature (°C)'].iloc[j],
+                'INS_Longitude': ins_window['Longitude'].iloc[j],
+                'INS_Latitude': ins_window['Latitude'].iloc[j],
+                'Mag_Quality_Score': mag_quality['signal_noise_ratio'],
+                'INS_Quality_Score': ins_quality['signal_noise_ratio'],
+                'Window_Index': i // (self.window_size // 2)
+            }
+            synchronized_data.append(combined_data)
+
+    return pd.DataFrame(synchronized_data)
+
+
+def scaled_session(minutes, out_dir):
+    """test_data 的两份数据按同一周期首尾相接重复到 minutes 分钟，返回 (磁力计路径, INS路径)"""
+    frames = {name: pd.read_csv(os.path.join(ROOT, 'test_data', name)) for name in ('mag_data.csv', 'ins_data.csv')}
+    stamps = {name: pd.to_datetime(df['Timestamp']) for name, df in frames.items()}
+    period = max(s.max() - s.min() for s in stamps.values()) + pd.Timedelta('10ms')
+    copies = int(np.ceil(pd.Timedelta(minutes=minutes) / period))
+    paths = []
+    for name, df in frames.items():
+        tiled = pd.concat([df] * copies, ignore_index=True)
+        shift = np.repeat(np.arange(copies), len(df)) * period
+        tiled['Timestamp'] = (pd.concat([stamps[name]] * copies, ignore_index=True) + shift).dt.strftime(
+            '%Y-%m-%d %H:%M:%S.%f').str[:-3]
+        path = os.path.join(out_dir, f"{minutes}min_{name}")
+        tiled.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def load(paths):
+    synchronizer = SensorDataSynchronizer(window_size=100, max_time_diff_ms=3)
+    synchronizer.load_data(*paths)
+    return synchronizer
+
+
+def compare(old, new):
+    """列名、类型一致，时间列与其余列逐值相等，滤波列的差不超过1e-12"""
+    if list(old.columns) != list(new.columns) or not old.dtypes.equals(new.dtypes) or len(old) != len(new):
+        return False, float('nan')
+    diff = np.abs(old['Mag_Filtered_Magnitude'].to_numpy() - new['Mag_Filtered_Magnitude'].to_numpy()).max()
+    rest = new.columns.drop('Mag_Filtered_Magnitude')
+    return bool(old[rest].equals(new[rest]) and diff <= 1e-12), diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="滑动窗口同步基准")
+    parser.add_argument('--minutes', type=int, default=60, help="扩展后的数据时长(分钟)")
+    parser.add_argument('--legacy-minutes', type=int, default=5, help="运行原实现的数据时长(分钟)")
+    parser.add_argument('--dir', default=None, help="扩展数据的存放目录，默认临时目录")
+    args = parser.parse_args()
+
+    out_dir = args.dir or tempfile.mkdtemp(prefix='sliding_sync_bench_')
+    os.makedirs(out_dir, exist_ok=True)
+
+    rows = []
+    per_row = None
+    for minutes in sorted({args.legacy_minutes, args.minutes}):
+        synchronizer = load(scaled_session(minutes, out_dir))
+        new_t, new = best_time(synchronizer.sync_with_sliding_window)
+        if minutes <= args.legacy_minutes:
+            old_t, old = best_time(legacy_sync_with_sliding_window, synchronizer, repeat=1)
+            per_row = old_t / len(old)
+            same, diff = compare(old, new)
+            rows.append([minutes, len(new), f"{old_t:.1f}", f"{new_t:.3f}", f"{old_t / new_t:.0f}x",
+                         f"{'yes' if same else 'NO'} ({diff:.1e})"])
+        else:
+            old_t = per_row * len(new)
+            rows.append([minutes, len(new), f"{old_t:.0f} (est.)", f"{new_t:.3f}", f"{old_t / new_t:.0f}x", ''])
+
+    print_table(['minutes', 'rows', 'legacy s', 'new s', 'speedup', 'equal (max filter diff)'], rows)
+
+
+if __name__ == '__main__':
+    main()
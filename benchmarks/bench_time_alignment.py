@@ -0,0 +1,74 @@
+"""
+时间对齐基准：synchronize_and_merge 中磁力计对齐到INS网格的步骤，
+对比原来的 reindex(method='nearest')、pd.merge_asof 与 time_alignment 的 searchsorted 实现，
+并对比线性插值(原有做法需合并索引后 interpolate(method='time'))
+
+用法: python benchmarks/bench_time_alignment.py [--sizes 100000 1000000 10000000]
+网格为10ms的目标时间点，源数据约100Hz且带有随机抖动，6个数值列
+线性插值的差异来自 interpolate(method='time') 直接将纳秒时间戳转为浮点数(间隔约256ns)，time_alignment 先减去原点再转换
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from time_alignment import align_frame
+
+COLUMNS = ['time', 'x', 'y', 'z', 'magnitude', 'filtered magnitude']
+
+
+def make_data(n, rng):
+    start = pd.Timestamp('2025-02-05 05:00:30').value
+    grid = pd.DatetimeIndex(start + np.arange(n, dtype=np.int64) * 10_000_000)
+    # 源时间戳约每10ms一个，抖动±4ms，升序且不重复
+    src_ns = start + 3_000_000 + np.arange(n, dtype=np.int64) * 10_000_000 + rng.integers(-4_000_000, 4_000_000, n)
+    source = pd.DataFrame(rng.normal(size=(n, len(COLUMNS))), index=pd.DatetimeIndex(src_ns), columns=COLUMNS)
+    return grid, source
+
+
+def reindex_nearest(grid, source):
+    return source.reindex(grid, method='nearest')
+
+
+def merge_asof_nearest(grid, source):
+    left = pd.DataFrame({'t': grid})
+    right = source.reset_index(names='t')
+    return pd.merge_asof(left, right, on='t', direction='nearest').set_index('t')
+
+
+def pandas_linear(grid, source):
+    union = source.reindex(source.index.union(grid))
+    return union.interpolate(method='time', limit_area='inside').reindex(grid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="时间对齐基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000, 10000000], help="网格点数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in args.sizes:
+        grid, source = make_data(n, rng)
+        repeat = 1 if n >= 5000000 else 3
+
+        ref_t, ref = best_time(reindex_nearest, grid, source, repeat=repeat)
+        asof_t, asof = best_time(merge_asof_nearest, grid, source, repeat=repeat)
+        new_t, new = best_time(align_frame, grid, source, repeat=repeat)
+        same = np.array_equal(ref.to_numpy(), new.to_numpy())
+        rows.append([n, 'nearest', f"{ref_t * 1e3:.0f}", f"{asof_t * 1e3:.0f}", f"{new_t * 1e3:.0f}",
+                     f"{ref_t / new_t:.1f}x", 'yes' if same else 'NO'])
+
+        ref_t, ref = best_time(pandas_linear, grid, source, repeat=repeat)
+        new_t, new = best_time(align_frame, grid, source, 'linear', repeat=repeat)
+        diff = np.nanmax(np.abs(ref.to_numpy() - new.to_numpy()))
+        rows.append([n, 'linear', f"{ref_t * 1e3:.0f}", '', f"{new_t * 1e3:.0f}",
+                     f"{ref_t / new_t:.1f}x", f"max diff {diff:.1e}"])
+
+    print_table(['grid points', 'method', 'pandas ms', 'merge_asof ms', 'searchsorted ms', 'speedup',
+                 'matches pandas'], rows)
+
+
+if __name__ == '__main__':
+    main()
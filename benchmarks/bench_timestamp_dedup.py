@@ -0,0 +1,108 @@
+"""
+时间戳去重基准：对比逐行循环版 process_mag_data 与向量化实现
+
+用法: python benchmarks/bench_timestamp_dedup.py [--sizes 10000 100000 1000000] [--legacy-max-rows N]
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from _common import ROOT, best_time, print_table
+from mag_aq import process_mag_data
+
+
+def legacy_process_mag_data(df):
+    """原逐行实现，作为结果与耗时的对照"""
+    if len(df) < 2:
+        return df, 0
+
+    df['Processed_Timestamp'] = pd.to_datetime(df['Timestamp'])
+
+    i = 1
+    while i < len(df):
+        time_diff = (df.iloc[i]['Processed_Timestamp'] - df.iloc[i-1]['Processed_Timestamp']).total_seconds() * 1000
+        if time_diff < 2:
+            df.at[i, 'Processed_Timestamp'] = df.iloc[i-1]['Processed_Timestamp']
+        i += 1
+
+    i = 0
+    while i < len(df):
+        start_idx = i
+        current_timestamp = df.iloc[i]['Processed_Timestamp']
+        next_diff_idx = i + 1
+        while next_diff_idx < len(df) and df.iloc[next_diff_idx]['Processed_Timestamp'] == current_timestamp:
+            next_diff_idx += 1
+        if next_diff_idx < len(df):
+            next_timestamp = df.iloc[next_diff_idx]['Processed_Timestamp']
+            time_diff = (next_timestamp - current_timestamp).total_seconds() * 1000
+            intervals = next_diff_idx - start_idx
+            interval_diff = time_diff / intervals if intervals > 0 else 0
+            for j in range(start_idx + 1, next_diff_idx):
+                steps = j - start_idx
+                new_timestamp = current_timestamp + pd.Timedelta(milliseconds=int(interval_diff * steps))
+                df.at[j, 'Processed_Timestamp'] = new_timestamp
+            i = next_diff_idx
+        else:
+            break
+
+    df['Processed_Timestamp'] = df['Processed_Timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+    return df, 0
+
+
+def synthetic_capture(n, seed=0):
+    """模拟100Hz采集：串口缓冲导致部分行在同一毫秒附近成簇到达"""
+    rng = np.random.default_rng(seed)
+    true_ms = np.arange(n, dtype=np.int64) * 10
+    delay_ms = np.where(rng.random(n) < 0.2, rng.integers(5, 25, n), rng.integers(0, 2, n))
+    arrival_ms = np.maximum.accumulate(true_ms + delay_ms)
+    start = np.datetime64('2025-02-05T03:37:15.040', 'ms')
+    stamps = pd.Series(start + arrival_ms.astype('timedelta64[ms]'))
+    return pd.DataFrame({
+        'Time': true_ms / 1000.0,
+        'Timestamp': stamps.dt.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3],
+    })
+
+
+def check_recorded_sessions():
+    """在仓库中已记录的原始会话上核对两种实现的输出完全一致"""
+    files = sorted(glob.glob(os.path.join(ROOT, 'mag_data', 'unprocessed', '*.csv')))
+    checked = 0
+    for path in files:
+        df = pd.read_csv(path)
+        if 'Timestamp' not in df.columns or len(df) < 2:
+            continue
+        expected = legacy_process_mag_data(df.copy())[0]['Processed_Timestamp']
+        actual = process_mag_data(df.copy())[0]['Processed_Timestamp']
+        assert list(expected) == list(actual), f"输出不一致: {path}"
+        checked += 1
+    print(f"已核对 {checked} 个记录会话，Processed_Timestamp 完全一致")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="process_mag_data 时间戳去重基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-max-rows', type=int, default=None,
+                        help="超过该行数时跳过逐行版本(其在百万行上需要数十分钟)")
+    args = parser.parse_args()
+
+    check_recorded_sessions()
+
+    rows = []
+    for n in args.sizes:
+        df = synthetic_capture(n)
+        new_t, (new_df, _) = best_time(lambda: process_mag_data(df.copy()))
+        if args.legacy_max_rows is not None and n > args.legacy_max_rows:
+            rows.append([n, '-', f"{new_t:.3f}", '-', '-'])
+            continue
+        old_t, (old_df, _) = best_time(lambda: legacy_process_mag_data(df.copy()), repeat=1)
+        same = list(old_df['Processed_Timestamp']) == list(new_df['Processed_Timestamp'])
+        rows.append([n, f"{old_t:.3f}", f"{new_t:.3f}", f"{old_t / new_t:.0f}x", same])
+
+    print_table(['rows', 'legacy (s)', 'vectorized (s)', 'speedup', 'identical'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+时间戳配对基准：calculate_time_diffs.py 中找出相差小于3ms的INS与磁力计数据对，
+对比原来的双重 iterrows 循环与 timestamp_matching 的排序 + searchsorted 窗口
+
+用法: python benchmarks/bench_timestamp_matching.py [--sizes 1000 100000 1000000] [--legacy-max 1000]
+INS约100Hz、磁力计约107Hz(与 test_data 相同)，时间戳为毫秒精度；原实现为O(N·M)，
+超过 --legacy-max 的规模按 legacy-max 规模的单对耗时估算(标注 est.)
+原实现比较浮点秒数，恰好相差3ms的数据对因舍入误差有时被计入；timestamp_matching 按整数纳秒比较，
+核对时不计恰好相差3ms的数据对
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from _common import best_time, print_table
+from timestamp_matching import base_time_diffs
+
+
+def legacy_pairs(ins_data, mag_data):
+    """原实现的配对部分(Base_Time 为秒数)，去掉恰好相差3ms的数据对"""
+    stamps = pd.to_datetime(ins_data['Timestamp']), pd.to_datetime(mag_data['Timestamp'])
+    ins_data = ins_data.copy()
+    mag_data = mag_data.copy()
+    ins_data['Timestamp'] = stamps[0].apply(lambda x: x.timestamp())
+    mag_data['Timestamp'] = stamps[1].apply(lambda x: x.timestamp())
+    results = []
+    for i, ins_row in ins_data.iterrows():
+        for j, mag_row in mag_data.iterrows():
+            if abs(ins_row['Timestamp'] - mag_row['Timestamp']) < 0.003:
+                if abs(stamps[0][i] - stamps[1][j]) != pd.Timedelta(milliseconds=3):
+                    results.append((i, j, ins_row['Base_Time'] - mag_row['Base_Time']))
+    return results
+
+
+def make_session(n, step_ms, rng):
+    start = pd.Timestamp('2025-02-05 05:00:28.790').value // 1_000_000
+    ms = start + np.cumsum(rng.integers(step_ms - 4, step_ms + 5, n))
+    stamps = pd.Series(ms.astype('datetime64[ms]')).dt.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3]
+    return pd.DataFrame({'Base_Time': (ms - start) / 1e3 + rng.normal(0, 0.05, n).round(3), 'Timestamp': stamps})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="时间戳配对基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000], help="每种数据的行数")
+    parser.add_argument('--legacy-max', type=int, default=1000, help="实际运行原实现的最大行数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    per_pair = None
+    for n in args.sizes:
+        ins, mag = make_session(n, 10, rng), make_session(n, 9, rng)
+        new_t, (index_ins, index_mag, diffs) = best_time(base_time_diffs, ins, mag)
+        if n <= args.legacy_max:
+            old_t, old = best_time(legacy_pairs, ins, mag, repeat=1)
+            per_pair = old_t / (n * n)
+            same = (len(old) == len(diffs) and np.array_equal([r[0] for r in old], index_ins)
+                    and np.array_equal([r[1] for r in old], index_mag)
+                    and np.allclose([r[2] for r in old], diffs, rtol=0, atol=1e-9))
+            rows.append([f"{n} x {n}", len(diffs), f"{old_t:.1f}", f"{new_t * 1e3:.1f}", f"{old_t / new_t:.0f}x",
+                         'yes' if same else 'NO'])
+        elif per_pair is not None:
+            old_t = per_pair * n * n
+            rows.append([f"{n} x {n}", len(diffs), f"{old_t:.0f} (est.)", f"{new_t * 1e3:.1f}",
+                         f"{old_t / new_t:.0f}x", ''])
+        else:
+            rows.append([f"{n} x {n}", len(diffs), '', f"{new_t * 1e3:.1f}", '', ''])
+
+    print_table(['INS x MAG rows', 'pairs', 'legacy s', 'new ms', 'speedup', 'same pairs'], rows)
+
+
+if __name__ == '__main__':
+    main()
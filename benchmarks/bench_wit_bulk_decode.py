@@ -0,0 +1,85 @@
+"""
+维特协议批量结算基准：对比逐包结算+更新事件读取设备数据 与 结构化数组整块结算(样本/秒)
+
+用法: python benchmarks/bench_wit_bulk_decode.py [--stream capture.bin ...] [--chunks 64 256 1024 4096]
+                                                [--min-frames 64] [--rows N]
+未指定 --stream 时由 ins_data 中已记录的会话重建字节流(含四元数包)
+"""
+import argparse
+
+from _common import best_time, print_table
+from _streams import add_noise, chunks, load_recorded_ins, load_stream, wit_stream
+from lib.device_model import DeviceModel
+from lib.protocol_resolver.roles.wit_frame_decoder import PACK_FIELDS
+from lib.protocol_resolver.roles.wit_protocol_resolver import WitProtocolResolver
+
+FIELDS = [name for names in PACK_FIELDS.values() for name in names]
+
+
+class SnapshotProcessor:
+    """逐包路径：每次数据更新事件读取一遍设备数据，与 ins_aq 原记录方式相同"""
+
+    def __init__(self):
+        self.rows = []
+
+    def onUpdate(self, deviceModel):
+        self.rows.append(tuple(deviceModel.getDeviceData(name) for name in FIELDS))
+
+
+class ColumnProcessor(SnapshotProcessor):
+    """批量路径：包数较多的数据块收到一组按列组织的数据，其余仍逐包触发更新事件"""
+
+    def onBulkUpdate(self, deviceModel, records):
+        self.rows.extend(zip(*[records[name].tolist() for name in FIELDS]))
+
+
+class BenchDevice(DeviceModel):
+    """不打开串口的设备模型"""
+
+    def __init__(self, dataProcessor):
+        self.deviceData = {}
+        self.dataProcessor = dataProcessor
+
+
+def parse(bulk, data_chunks, min_frames=WitProtocolResolver.bulkMinFrames):
+    resolver = WitProtocolResolver(bulkDecode=bulk, bulkMinFrames=min_frames)
+    device = BenchDevice(ColumnProcessor() if bulk else SnapshotProcessor())
+    for chunk in data_chunks:
+        resolver.passiveReceiveData(chunk, device)
+    return device
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WitProtocolResolver 批量结算基准")
+    parser.add_argument('--stream', nargs='*', help="录制的原始串口字节流文件")
+    parser.add_argument('--chunks', type=int, nargs='+', default=[64, 256, 1024, 4096],
+                        help="单次 serial.read() 的字节数")
+    parser.add_argument('--min-frames', type=int, default=WitProtocolResolver.bulkMinFrames,
+                        help="批量结算的最少包数")
+    parser.add_argument('--rows', type=int, default=20000, help="重建字节流使用的INS记录行数")
+    args = parser.parse_args()
+
+    if args.stream:
+        streams = {'recorded': load_stream(args.stream)}
+    else:
+        clean = wit_stream(load_recorded_ins(args.rows), include_quaternion=True)
+        streams = {'recorded-clean': clean, 'recorded+1%noise': add_noise(clean)}
+
+    rows = []
+    for name, stream in streams.items():
+        for chunk in args.chunks:
+            data_chunks = chunks(stream, chunk)
+            old_t, old_dev = best_time(parse, False, data_chunks)
+            new_t, new_dev = best_time(parse, True, data_chunks, args.min_frames)
+            old_rows = old_dev.dataProcessor.rows
+            new_rows = new_dev.dataProcessor.rows
+            rows.append([name, chunk, len(new_rows),
+                         f"{len(old_rows) / old_t:,.0f}", f"{len(new_rows) / new_t:,.0f}",
+                         f"{old_t / new_t:.1f}x",
+                         old_rows == new_rows and old_dev.deviceData == new_dev.deviceData])
+
+    print_table(['stream', 'chunk', 'samples', 'per-frame samples/s', 'bulk samples/s', 'speedup', 'identical'], rows)
+
+
+if __name__ == '__main__':
+    main()
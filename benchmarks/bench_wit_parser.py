@@ -0,0 +1,289 @@
+"""
+维特协议解析吞吐基准：对比逐字节列表解析与整块字节扫描解析(帧/秒)
+原实现包含原来的 get_* 结算方法；核对结果时不含原实现没有的 ChiptimeMs
+
+用法: python benchmarks/bench_wit_parser.py [--stream capture.bin ...] [--chunk 256] [--rows N]
+未指定 --stream 时由 ins_data 中已记录的会话重建字节流
+"""
+import argparse
+
+from _common import best_time, print_table
+from _streams import add_noise, chunks, load_recorded_ins, load_stream, wit_stream
+from lib.device_model import DeviceModel
+from lib.protocol_resolver.roles.wit_protocol_resolver import WitProtocolResolver
+
+
+class LegacyWitProtocolResolver(WitProtocolResolver):
+    """原逐字节实现，作为结果与耗时的对照"""
+
+    def __init__(self):
+        super().__init__()
+        self.TempBytes = []
+
+    def passiveReceiveData(self, data, deviceModel):
+        for val in data:
+            self.TempBytes.append(val)
+            if (self.TempBytes[0]!=0x55):
+                del self.TempBytes[0]
+                continue
+            if (len(self.TempBytes)>1):
+                if (((self.TempBytes[1] - 0x50 >=0 and self.TempBytes[1] - 0x50 <=11) or self.TempBytes[1]==0x5f)==False):
+                    del self.TempBytes[0]
+                    continue
+            if (len(self.TempBytes) == self.PackSize):
+                CheckSum = 0
+                for i in range(0,self.PackSize-1):
+                    CheckSum+=self.TempBytes[i]
+                if (CheckSum&0xff==self.TempBytes[self.PackSize-1]):
+                    self.handle_pack(self.TempBytes, deviceModel)
+                    self.TempBytes=[]
+                else:
+                    del self.TempBytes[0]
+
+    # 原逐字节移位拼接的结算方法
+    def get_acc(self,datahex, deviceModel):
+        """
+        加速度、温度结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        axl = datahex[2]
+        axh = datahex[3]
+        ayl = datahex[4]
+        ayh = datahex[5]
+        azl = datahex[6]
+        azh = datahex[7]
+
+        tempVal = (datahex[9] << 8 | datahex[8])
+        acc_x = (axh << 8 | axl) / 32768.0 * self.accRange
+        acc_y = (ayh << 8 | ayl) / 32768.0 * self.accRange
+        acc_z = (azh << 8 | azl) / 32768.0 * self.accRange
+        if acc_x >= self.accRange:
+            acc_x -= 2 * self.accRange
+        if acc_y >= self.accRange:
+            acc_y -= 2 * self.accRange
+        if acc_z >= self.accRange:
+            acc_z -= 2 * self.accRange
+
+        deviceModel.setDeviceData("accX", round(acc_x, 4))     # 设备模型加速度X赋值
+        deviceModel.setDeviceData("accY", round(acc_y, 4))     # 设备模型加速度Y赋值
+        deviceModel.setDeviceData("accZ", round(acc_z, 4))     # 设备模型加速度Z赋值
+        temperature = round(tempVal / 100.0, 2)                                           # 温度结算,并保留两位小数
+        deviceModel.setDeviceData("temperature", temperature)                             # 设备模型温度赋值
+
+    def get_gyro(self,datahex, deviceModel):
+        """
+        角速度结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        wxl = datahex[2]
+        wxh = datahex[3]
+        wyl = datahex[4]
+        wyh = datahex[5]
+        wzl = datahex[6]
+        wzh = datahex[7]
+
+        gyro_x = (wxh << 8 | wxl) / 32768.0 * self.gyroRange
+        gyro_y = (wyh << 8 | wyl) / 32768.0 * self.gyroRange
+        gyro_z = (wzh << 8 | wzl) / 32768.0 * self.gyroRange
+        if gyro_x >= self.gyroRange:
+            gyro_x -= 2 * self.gyroRange
+        if gyro_y >= self.gyroRange:
+            gyro_y -= 2 * self.gyroRange
+        if gyro_z >= self.gyroRange:
+            gyro_z -= 2 * self.gyroRange
+
+        deviceModel.setDeviceData("gyroX", round(gyro_x, 4))  # 设备模型角速度X赋值
+        deviceModel.setDeviceData("gyroY", round(gyro_y, 4))  # 设备模型角速度Y赋值
+        deviceModel.setDeviceData("gyroZ", round(gyro_z, 4))  # 设备模型角速度Z赋值
+
+    def get_angle(self,datahex, deviceModel):
+        """
+        角度结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        rxl = datahex[2]
+        rxh = datahex[3]
+        ryl = datahex[4]
+        ryh = datahex[5]
+        rzl = datahex[6]
+        rzh = datahex[7]
+
+        angle_x = (rxh << 8 | rxl) / 32768.0 * self.angleRange
+        angle_y = (ryh << 8 | ryl) / 32768.0 * self.angleRange
+        angle_z = (rzh << 8 | rzl) / 32768.0 * self.angleRange
+        if angle_x >= self.angleRange:
+            angle_x -= 2 * self.angleRange
+        if angle_y >= self.angleRange:
+            angle_y -= 2 * self.angleRange
+        if angle_z >= self.angleRange:
+            angle_z -= 2 * self.angleRange
+
+        deviceModel.setDeviceData("angleX", round(angle_x, 3))  # 设备模型角度X赋值
+        deviceModel.setDeviceData("angleY", round(angle_y, 3))  # 设备模型角度Y赋值
+        deviceModel.setDeviceData("angleZ", round(angle_z, 3))  # 设备模型角度Z赋值
+
+    def get_mag(self,datahex, deviceModel):
+        """
+        磁场结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        _x = deviceModel.get_int(bytes([datahex[2],datahex[3]]))
+        _y = deviceModel.get_int(bytes([datahex[4],datahex[5]]))
+        _z = deviceModel.get_int(bytes([datahex[6],datahex[7]]))
+
+        deviceModel.setDeviceData("magX", round(_x, 0))   # 设备模型磁场X赋值
+        deviceModel.setDeviceData("magY", round(_y, 0))   # 设备模型磁场Y赋值
+        deviceModel.setDeviceData("magZ", round(_z, 0))   # 设备模型磁场Z赋值
+
+    def get_lonlat(self,datahex, deviceModel):
+        """
+        经纬度结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+
+        lon = deviceModel.get_unint(bytes([datahex[2],datahex[3],datahex[4],datahex[5]]))
+        lat = deviceModel.get_unint(bytes([datahex[6],datahex[7],datahex[8],datahex[9]]))
+        #(lon / 10000000 + ((double)(lon % 10000000) / 1e5 / 60.0)).ToString("f8")
+        tlon = int(lon / 10000000) + ((lon % 10000000) / 100000 / 60)
+        tlat = int(lat / 10000000) + ((lat % 10000000) / 100000 / 60)
+
+        deviceModel.setDeviceData("lon", round(tlon, 8))   # 设备模型经度赋值
+        deviceModel.setDeviceData("lat", round(tlat, 8))   # 设备模型纬度赋值
+
+    def get_gps(self,datahex, deviceModel):
+        """
+        GPS结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        Height = deviceModel.get_int(bytes([datahex[2],datahex[3]])) / 10.0   #高度
+        Yaw = deviceModel.get_int(bytes([datahex[4],datahex[5]])) / 100.0     #航向角
+        Speed = deviceModel.get_unint(bytes([datahex[6],datahex[7],datahex[8],datahex[9]])) / 1e3            #海里
+
+        deviceModel.setDeviceData("Height", round(Height, 3))   # 设备模型高度赋值
+        deviceModel.setDeviceData("Yaw", round(Yaw, 2))   # 设备模型航向角赋值
+        deviceModel.setDeviceData("Speed", round(Speed, 3))   # 设备模型速度赋值
+
+    def get_four_elements(self,datahex, deviceModel):
+        """
+        四元素结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        q1 = deviceModel.get_int(bytes([datahex[2],datahex[3]])) / 32768.0
+        q2 = deviceModel.get_int(bytes([datahex[4],datahex[5]])) / 32768.0
+        q3 = deviceModel.get_int(bytes([datahex[6],datahex[7]])) / 32768.0
+        q4 = deviceModel.get_int(bytes([datahex[8],datahex[9]])) / 32768.0
+
+        deviceModel.setDeviceData("q1", round(q1, 5))   # 设备模型元素1赋值
+        deviceModel.setDeviceData("q2", round(q2, 5))   # 设备模型元素2赋值
+        deviceModel.setDeviceData("q3", round(q3, 5))   # 设备模型元素3赋值
+        deviceModel.setDeviceData("q4", round(q4, 5))  # 设备模型元素4赋值
+
+    def get_chiptime(self,datahex, deviceModel):
+        """
+        芯片时间结算
+        :param datahex: 原始始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        tempVals = []      #临时结算数据
+        for i in range(0,4):
+            tIndex = 2 + i * 2
+            tempVals.append(datahex[tIndex+1] << 8 | datahex[tIndex])
+
+        _year = 2000 + (tempVals[0] & 0xff)      # 年
+        _moth = ((tempVals[0] >> 8) & 0xff)      # 月
+        _day = (tempVals[1] & 0xff)              # 日
+        _hour = ((tempVals[1] >> 8) & 0xff)      # 时
+        _minute = (tempVals[2] & 0xff)           # 分
+        _second = ((tempVals[2] >> 8) & 0xff)    # 秒
+        _millisecond = tempVals[3]               # 毫秒
+        deviceModel.setDeviceData("Chiptime",
+                                  str(_year) + "-" + str(_moth) + "-" + str(_day) + " " + str(_hour) + ":" + str(
+                                      _minute) + ":" + str(_second) + "." + str(_millisecond))  # 设备模型芯片时间赋值
+
+
+class RecordingProcessor:
+    """记录每次数据更新事件"""
+
+    def __init__(self):
+        self.updates = 0
+
+    def onUpdate(self, deviceModel):
+        self.updates += 1
+
+
+class RecordingDevice(DeviceModel):
+    """不打开串口的设备模型，记录解析器写入的全部数据"""
+
+    def __init__(self):
+        self.deviceData = {}
+        self.dataProcessor = RecordingProcessor()
+        self.values = []
+        self.frames = 0
+
+    def setDeviceData(self, key, value):
+        self.deviceData[key] = value
+        self.values.append((key, value))
+
+
+def parse(resolver_cls, data_chunks, decode=True):
+    """decode=False 时只统计通过校验的数据包，单独衡量分包与校验的开销"""
+    resolver = resolver_cls()
+    device = RecordingDevice()
+    handle_pack = resolver.handle_pack
+
+    def counting_handle_pack(datahex, deviceModel):
+        device.frames += 1
+        if decode:
+            handle_pack(datahex, deviceModel)
+
+    resolver.handle_pack = counting_handle_pack
+    for chunk in data_chunks:
+        resolver.passiveReceiveData(chunk, device)
+    return device
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WitProtocolResolver 解析吞吐基准")
+    parser.add_argument('--stream', nargs='*', help="录制的原始串口字节流文件")
+    parser.add_argument('--chunk', type=int, default=256, help="单次 serial.read() 的字节数")
+    parser.add_argument('--rows', type=int, default=20000, help="重建字节流使用的INS记录行数")
+    args = parser.parse_args()
+
+    if args.stream:
+        streams = {'recorded': load_stream(args.stream)}
+    else:
+        clean = wit_stream(load_recorded_ins(args.rows))
+        streams = {'recorded-clean': clean, 'recorded+1%noise': add_noise(clean)}
+
+    rows = []
+    for name, stream in streams.items():
+        data_chunks = chunks(stream, args.chunk)
+        for decode in (False, True):
+            old_t, old_dev = best_time(parse, LegacyWitProtocolResolver, data_chunks, decode, repeat=1)
+            new_t, new_dev = best_time(parse, WitProtocolResolver, data_chunks, decode)
+            rows.append([name, 'framing+decode' if decode else 'framing', new_dev.frames,
+                         f"{old_dev.frames / old_t:,.0f}", f"{new_dev.frames / new_t:,.0f}",
+                         f"{old_t / new_t:.1f}x",
+                         old_dev.frames == new_dev.frames
+                         and old_dev.values == [v for v in new_dev.values if v[0] != 'ChiptimeMs']])
+
+    print_table(['stream', 'stage', 'frames', 'legacy frames/s', 'batch frames/s', 'speedup', 'identical'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from session_archive import load_session
 
 def evaluate_interpolation(original_df, interpolated_df):
     print("=== 插值效果统计 ===\n")
@@ -93,7 +94,8 @@ if __name__ == "__main__":
         print(f"Error: 找不到数据文件 {original_file} 或 {interpolated_file}")
         exit(1)
     
-    original_df = pd.read_csv(original_file)
-    interpolated_df = pd.read_csv(interpolated_file)
+    # 原始数据只用到三轴分量
+    original_df = load_session(original_file, columns=['X', 'Y', 'Z'])
+    interpolated_df = load_session(interpolated_file)
     
     evaluate_interpolation(original_df, interpolated_df)
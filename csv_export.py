@@ -0,0 +1,64 @@
+import csv
+import os
+
+import numpy as np
+
+"""
+按列精度导出CSV：每列按所属的列组保留固定位数的小数(经纬度8位、磁力计6位、其余INS数据4位)，NaN写为空字段
+按块用一个 '%.nf' 组成的行格式串逐行格式化，与逐个单元格 '%.nf' 格式化相同，每块拼接为文本后一次写出
+"""
+
+# 列组(小写列名)及其小数位数，未列出的列使用 DEFAULT_PRECISION
+PRECISION_SPEC = (
+    (('longitude', 'latitude'), 8),
+    (('x', 'y', 'z', 'magnitude', 'filtered magnitude'), 6),
+)
+
+DEFAULT_PRECISION = 4
+
+# 每块的行数，限制格式化后的字符串数组占用的内存
+CHUNK_ROWS = 65536
+
+
+def column_precisions(columns, spec=PRECISION_SPEC, default=DEFAULT_PRECISION):
+    """每列的小数位数，列名不区分大小写"""
+    places = {}
+    for names, precision in spec:
+        for name in names:
+            places[name.lower()] = precision
+    return [places.get(str(col).lower(), default) for col in columns]
+
+
+def _time_field(index):
+    """时间索引格式化为 '%Y-%m-%d %H:%M:%S.毫秒' 的字符串列表，NaT为空字段"""
+    ms = np.asarray(index, dtype='datetime64[ms]')
+    cells = np.char.replace(np.datetime_as_string(ms, unit='ms'), 'T', ' ')
+    cells[np.isnat(ms)] = ''
+    return cells.tolist()
+
+
+def write_precision_csv(df, output_path, precisions=None, index_label='timestamp', chunk_rows=CHUNK_ROWS):
+    """
+    将以时间为索引的数值DataFrame写为CSV，第一列为毫秒精度的时间(列名 index_label)
+    precisions 为每列的小数位数，默认按 PRECISION_SPEC 由列名确定
+    先写同目录下的临时文件，完成后再替换 output_path，中途失败不会留下写了一半的输出文件
+    """
+    if precisions is None:
+        precisions = column_precisions(df.columns)
+    # 一行的格式串，NaN格式化为 'nan' 后整块替换为空字段
+    row_format = '%s' + ''.join(',%%.%df' % p for p in precisions) + '\n'
+    values = df.to_numpy(dtype=np.float64)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator='\n').writerow([index_label, *df.columns])
+            for start in range(0, len(df), chunk_rows):
+                stop = min(start + chunk_rows, len(df))
+                stamps = _time_field(df.index[start:stop])
+                text = ''.join([row_format % (stamp, *row) for stamp, row in zip(stamps, values[start:stop].tolist())])
+                f.write(text.replace('nan', ''))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
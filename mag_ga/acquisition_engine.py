@@ -0,0 +1,234 @@
+import asyncio
+import os
+import platform
+import threading
+from datetime import datetime
+
+import serial
+
+import ins_aq
+import mag_aq
+from lib.device_model import DeviceModel
+from lib.data_processor.roles.jy901s_dataProcessor import JY901SDataProcessor
+from lib.protocol_resolver.roles.wit_protocol_resolver import WitProtocolResolver
+from lib.utils.acquisition_clock import AcquisitionClock
+from lib.utils.async_serial import AsyncSerialReader
+from lib.utils.filters import FilterBank, MovingAverage
+
+"""
+    单进程采集引擎：INS(JY901)与磁力计共用一个 asyncio 事件循环和一个采集时钟，
+    两个串口的文件描述符注册到事件循环(Windows 下为读取线程，见 AsyncSerialReader)，
+    不再启动两个子进程，也不需要进程间的启动握手；GUI 通过 EngineRunner 在工作线程中调用
+"""
+
+BAUDRATE = 115200
+
+# 磁力计启动命令
+MAG_SEND_DB = "db 15"
+MAG_SEND_RC = "rc"
+
+# 定时采集时在指定时长之后多采集的时间，与 mag_aq 一致
+STOP_MARGIN_S = 0.15
+
+
+def default_ports():
+    """
+    根据操作系统选择串口
+    :return: (INS串口, 磁力计串口)
+    """
+    if platform.system().lower() == 'linux':
+        return "/dev/ttyUSB0", "/dev/ttyUSB2"
+    return "COM5", "COM6"
+
+
+class AcquisitionEngine:
+    """
+    采集引擎，start()/stop() 为协程；GUI 在其他线程中使用 EngineRunner
+    """
+
+    def __init__(self, ins_port=None, mag_port=None, baudrate=BAUDRATE, mag_filters=mag_aq.MAG_FILTERS,
+                 capture=mag_aq.CAPTURE_FORMAT):
+        default_ins, default_mag = default_ports()
+        self.ins_port = ins_port or default_ins
+        self.mag_port = mag_port or default_mag
+        self.baudrate = baudrate
+        self.mag_filters = mag_filters     # 磁力计实时滤波器组配置
+        self.capture = capture             # 记录文件格式，"csv" 或 "binary"
+        self.clock = None
+        self.duration = 0
+        self.running = False
+        self.start_time = None
+        self.finish_time = None
+        # INS
+        self.device = None
+        self.ins_reader = None
+        # 磁力计
+        self.mag_serial = None
+        self.mag_reader = None
+        self.mag_writer = None
+        self.mag_file = None
+        self.mag_data = None
+        self._mag_pending = b''
+        self._mag_window = MovingAverage(10)
+        self._mag_bank = None
+
+    async def start(self, duration=0):
+        """
+        打开两个串口并开始采集
+        :param duration: 采集时长(秒)，0表示手动停止，用于过滤处理后的磁力计数据
+        """
+        if self.running:
+            return
+        self.duration = duration
+        self.clock = AcquisitionClock()     # 两个传感器共用的采集时钟
+        os.makedirs(mag_aq.UNPROCESSED_DATA_DIR, exist_ok=True)
+        os.makedirs(mag_aq.PROCESSED_DATA_DIR, exist_ok=True)
+        try:
+            await asyncio.gather(self._start_ins(), self._start_mag())
+        except Exception:
+            await self._close()
+            raise
+        self.running = True
+        self.start_time = datetime.now()
+        ins_aq.log_message(f'acquisition engine started: {self.start_time}')
+
+    async def stop(self):
+        """
+        停止采集，关闭串口并生成处理后的磁力计数据
+        :return: 采集完成的提示信息
+        """
+        if not self.running:
+            return None
+        self.running = False
+        await self._close()
+        self.finish_time = datetime.now()
+        ins_aq.log_message(f'acquisition engine finished: {self.finish_time}')
+
+        print(f"原始数据已保存到: {self.mag_file}")
+        self.mag_data = await asyncio.to_thread(mag_aq.load_and_process, self.mag_file, self.duration)
+
+        elapsed_time = (self.finish_time - self.start_time).total_seconds()
+        return f"数据采集完成\n开始时间: {self.start_time}\n结束时间: {self.finish_time}\n运行时间: {elapsed_time:.1f}秒"
+
+    async def run(self, duration):
+        """
+        采集指定时长
+        :param duration: 采集时长(秒)，须大于0
+        :return: 采集完成的提示信息
+        """
+        await self.start(duration)
+        await asyncio.sleep(duration + STOP_MARGIN_S)
+        return await self.stop()
+
+    async def _start_ins(self):
+        self.device = DeviceModel("我的JY901", WitProtocolResolver(bulkDecode=ins_aq.BULK_DECODE),
+                                  JY901SDataProcessor(), "51_0")
+        self.device.serialConfig.portName = self.ins_port
+        self.device.serialConfig.baud = self.baudrate
+        self.device.openDevice(startReader=False, clock=self.clock)
+        if not self.device.isOpen:
+            raise serial.SerialException(f"打开 {self.ins_port} 失败")
+        self.ins_reader = AsyncSerialReader(self.device.serialPort, self.device.onSerialData, self.clock)
+        self.ins_reader.start()
+        # 配置写入过程中有等待，放到线程中执行，事件循环继续读取数据
+        await asyncio.to_thread(ins_aq.setConfig, self.device)
+        # 样本缓存为模块全局，清空上一次采集的样本，绘图与计数只包含本次会话
+        ins_aq.samples.clear()
+        JY901SDataProcessor.onVarChanged.append(ins_aq.onUpdate_uesr)
+        JY901SDataProcessor.onBulkChanged.append(ins_aq.onBulkUpdate_user)
+        ins_aq.startRecord(self.clock, self.capture)
+
+    async def _start_mag(self):
+        self.mag_serial = serial.Serial(self.mag_port, self.baudrate, timeout=0)
+        await asyncio.sleep(1.8)
+        self.mag_serial.write(MAG_SEND_DB.encode('ascii'))
+        await asyncio.sleep(0.5)
+
+        output_csv_file = f"mag_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        self._mag_bank = FilterBank.fromSpec(self.mag_filters) if self.mag_filters else None
+        self.mag_file, self.mag_writer = mag_aq.create_mag_writer(output_csv_file, self.clock, self._mag_bank,
+                                                                    self.capture)
+        self.mag_writer.start()
+
+        await asyncio.sleep(0.1)
+        self.mag_serial.write(MAG_SEND_RC.encode('ascii'))
+        self._mag_pending = b''
+        self._mag_window.reset()
+        self.mag_reader = AsyncSerialReader(self.mag_serial, self._on_mag_data, self.clock)
+        self.mag_reader.start()
+
+    def _on_mag_data(self, data, received_ns):
+        self._mag_pending = mag_aq.handle_serial_data(self._mag_pending, data, received_ns,
+                                                      self._mag_window, self.mag_writer, self._mag_bank)
+
+    async def _close(self):
+        """
+        先停止事件循环读取，再关闭串口和写入器
+        """
+        for reader in (self.ins_reader, self.mag_reader):
+            if reader is not None:
+                reader.stop()
+        self.ins_reader = self.mag_reader = None
+
+        if self.device is not None:
+            self.device.closeDevice()
+            if ins_aq.onUpdate_uesr in JY901SDataProcessor.onVarChanged:
+                JY901SDataProcessor.onVarChanged.remove(ins_aq.onUpdate_uesr)
+            if ins_aq.onBulkUpdate_user in JY901SDataProcessor.onBulkChanged:
+                JY901SDataProcessor.onBulkChanged.remove(ins_aq.onBulkUpdate_user)
+            if ins_aq._IsWriteF:
+                ins_aq.endRecord()
+            self.device = None
+
+        if self.mag_serial is not None:
+            try:
+                self.mag_serial.close()
+            except:
+                pass
+            self.mag_serial = None
+        if self.mag_writer is not None:
+            await asyncio.to_thread(self.mag_writer.close)
+            self.mag_writer = None
+
+
+class EngineRunner:
+    """
+    在后台线程中运行采集引擎的事件循环，供 GUI 线程同步调用
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine if engine is not None else AcquisitionEngine()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def start(self, duration=0):
+        """
+        开始采集，打开串口完成后返回
+        """
+        return asyncio.run_coroutine_threadsafe(self.engine.start(duration), self.loop).result()
+
+    def stop(self):
+        """
+        停止采集，数据处理完成后返回提示信息
+        """
+        return asyncio.run_coroutine_threadsafe(self.engine.stop(), self.loop).result()
+
+    def run(self, duration, stop_event):
+        """
+        采集到指定时长或 stop_event 被设置为止，在 GUI 的工作线程中调用，不阻塞界面
+        :param duration: 采集时长(秒)，0表示只由 stop_event 停止
+        :param stop_event: threading.Event，手动停止时设置
+        :return: 采集完成的提示信息
+        """
+        self.start(duration)
+        stop_event.wait(duration + STOP_MARGIN_S if duration > 0 else None)
+        return self.stop()
+
+    def close(self):
+        """
+        结束后台事件循环
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
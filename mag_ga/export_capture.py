@@ -0,0 +1,59 @@
+import argparse
+import os
+import time
+
+from lib.utils.binary_capture import CAPTURE_SUFFIX, CaptureReader
+
+"""
+    二进制采集文件导出：将 .cap 文件导出为与采集时CSV格式相同的文件，或只显示文件头
+    用法: python export_capture.py mag_data/unprocessed/mag_data_20250205_033701.cap [-o out.csv]
+          python export_capture.py ins_data --info
+"""
+
+
+def find_captures(paths):
+    """
+    :param paths: 文件或目录列表，目录中查找所有采集文件
+    :return: 采集文件路径列表
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(CAPTURE_SUFFIX))
+        else:
+            files.append(path)
+    return files
+
+
+def show_info(reader):
+    header = reader.header
+    print(f"{reader.path}: {header['sensor']} {len(reader)} 条记录, 每条 {header['record_size']} 字节, "
+          f"创建于 {header['created']}")
+    print("  列: " + ", ".join(f"{name}({dtype})" for name, dtype in header['columns']))
+    if header.get('clock'):
+        print(f"  时钟锚点: {header['clock']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="二进制采集文件导出为CSV")
+    parser.add_argument("paths", nargs='+', help="采集文件或包含采集文件的目录")
+    parser.add_argument("-o", "--output", help="输出CSV路径，只能用于单个文件，默认与采集文件同名")
+    parser.add_argument("--info", action="store_true", help="只显示文件头")
+    args = parser.parse_args()
+
+    files = find_captures(args.paths)
+    if args.output and len(files) != 1:
+        parser.error("--output 只能用于单个文件")
+    for path in files:
+        reader = CaptureReader(path)
+        if args.info:
+            show_info(reader)
+            continue
+        csv_path = args.output or os.path.splitext(path)[0] + ".csv"
+        start = time.perf_counter()
+        count = reader.to_csv(csv_path)
+        print(f"{path} -> {csv_path}: {count} 条记录, {time.perf_counter() - start:.2f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 from mpl_toolkits.basemap import Basemap
 import time
 import os
-import csv
 from datetime import datetime
 import platform
 import argparse
@@ -10,23 +9,46 @@ import serial
 from lib.device_model import DeviceModel
 from lib.data_processor.roles.jy901s_dataProcessor import JY901SDataProcessor
 from lib.protocol_resolver.roles.wit_protocol_resolver import WitProtocolResolver
+from lib.utils.timestamp_utils import format_timestamps_ms
+from lib.utils.csv_stream_writer import ChunkedCsvWriter
+from lib.utils.binary_capture import CAPTURE_SUFFIX, ChunkedBinaryWriter
+from lib.utils.start_barrier import BarrierClient
+from lib.utils.sample_buffer import SampleBuffer
+from lib.utils.chip_clock import ChipClockEstimator
+import numpy as np
 import matplotlib.pyplot as plt
-# 初始化数据列表
-chaptime_list = []
-temp_list = []
-accx_list = []
-accy_list = []
-accz_list = []
-lon_list = []
-lat_list = []
-gyro_x_list = []
-gyro_y_list = []
-gyro_z_list = []
+
+# 芯片时间字符串的最大长度："年-月-日 时:分:秒.毫秒"，年为2000加一字节、毫秒为两字节，如 "2255-255-255 255:255:255.65535"
+CHIPTIME_DTYPE = "S30"
+
+# 可视化用的样本缓存，绘图只需单精度；经纬度保留双精度
+SAMPLE_COLUMNS = [
+    ("Chiptime", CHIPTIME_DTYPE),
+    ("temperature", np.float32),
+    ("accX", np.float32), ("accY", np.float32), ("accZ", np.float32),
+    ("lon", np.float64), ("lat", np.float64),
+    ("gyroX", np.float32), ("gyroY", np.float32), ("gyroZ", np.float32),
+]
+samples = SampleBuffer(SAMPLE_COLUMNS, capacity=4096)
+
+# 记录文件标题行，Record Time 为接收时刻的本地时间，Monotonic_ns 为接收时刻的单调时钟值，
+# Corrected Time / Corrected_Monotonic_ns 为按芯片时间对时后去除接收抖动的时刻(见 lib.utils.chip_clock)
+INS_CSV_HEADER = [
+    "Chiptime", "Acceleration X (g)", "Acceleration Y (g)", "Acceleration Z (g)","Angular_velocity_X (dps)", "Angular_velocity_Y (dps)", "Angular_velocity_Z (dps)",
+    "Temperature (°C)", "Longitude", "Latitude", "Record Time", "Monotonic_ns", "Corrected Time", "Corrected_Monotonic_ns"
+]
+
+# 记录文件格式："csv" 为文本，"binary" 为定长记录的二进制采集文件(见 lib.utils.binary_capture)
+CAPTURE_FORMAT = "csv"
+
+# 数据包整块结算(WitProtocolResolver bulkDecode)；一次读取64~256字节时不比逐包结算快
+# (benchmarks/bench_wit_bulk_decode.py)，默认关闭
+BULK_DECODE = False
 
 # 全局变量
 _IsWriteF = False
-csv_writer = None
-csvfile = None
+record_writer = None
+chip_clock = None
 stop_event = threading.Event()
 
 def log_message(message):
@@ -101,21 +123,13 @@ def onUpdate_uesr(deviceModel):
     gyro_y = sensor_data["角速度"]["Y轴"]
     gyro_z = sensor_data["角速度"]["Z轴"]
 
-    # 将数据存储到全局列表
-    global chaptime_list, temp_list, accx_list, accy_list, accz_list, lon_list, lat_list,gyro_x_list,gyro_y_list,gyro_z_list
-    chaptime_list.append(chip_time)
-    temp_list.append(temperature)
-    accx_list.append(acc_x)
-    accy_list.append(acc_y)
-    accz_list.append(acc_z)
-    lon_list.append(lon)
-    lat_list.append(lat)
-    gyro_x_list.append(gyro_x)
-    gyro_y_list.append(gyro_y)
-    gyro_z_list.append(gyro_z)
+    # 将数据存储到样本缓存
+    samples.append((chip_time, temperature, acc_x, acc_y, acc_z, lon, lat, gyro_x, gyro_y, gyro_z))
 
     if _IsWriteF:
-        csv_writer.writerow([
+        # Record Time、Corrected Time 位置先放单调时钟值，由写入器落盘时批量换算
+        corrected = chip_clock.update(deviceModel.getDeviceData("ChiptimeMs"), deviceModel.dataReceivedNs)
+        record_writer.write((
             sensor_data["芯片时间"],
             sensor_data["加速度"]["X轴"],
             sensor_data["加速度"]["Y轴"],
@@ -126,34 +140,62 @@ def onUpdate_uesr(deviceModel):
             sensor_data["温度"],
             sensor_data["经度"],
             sensor_data["纬度"],
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            deviceModel.dataReceivedNs,
+            deviceModel.dataReceivedNs,
+            corrected,
+            corrected
+        ))
 
-        ])
+# 批量数据更新时写入记录文件的字段，与标题行顺序一致
+RECORD_FIELDS = ("Chiptime", "accX", "accY", "accZ", "gyroX", "gyroY", "gyroZ", "temperature", "lon", "lat")
 
-def startRecord():
+def onBulkUpdate_user(deviceModel, records):
     """
-    开始记录数据到CSV文件
+    批量数据更新事件，一次串口读取的数据包较多时整块触发一次
+    :param deviceModel: 设备模型
+    :param records: {字段: 每个更新事件时刻的值}
+    :return:
     """
-    global _IsWriteF, csv_writer, csvfile
+    # 将数据整块存入样本缓存
+    samples.extend(records)
 
-    # 创建data文件夹（如果不存在）
-    if not os.path.exists('ins_data'):
-        os.makedirs('ins_data')
-    
-    # 新建一个CSV文件
-    filename = os.path.join('ins_data', str(datetime.now().strftime('ins_data_%Y%m%d%H%M%S.%f')[:-3]) + ".csv")
-    csvfile = open(filename, "w", newline='')
+    if _IsWriteF:
+        # 同一次读取的数据共用到达时刻，由芯片时间拆开
+        columns = [records[name].tolist() for name in RECORD_FIELDS]
+        count = len(columns[0])
+        mono = [deviceModel.dataReceivedNs] * count
+        corrected = [chip_clock.update(chip, received) for chip, received in zip(records["ChiptimeMs"].tolist(), mono)]
+        record_writer.write_columns(columns + [mono, mono, corrected, corrected])
+
+def startRecord(clock, capture=CAPTURE_FORMAT):
+    """
+    开始记录数据到文件，由写入线程分块落盘
+    :param clock: 设备的采集时钟，Record Time、Corrected Time 列由单调时钟值换算
+    :param capture: 记录文件格式，"csv" 或 "binary"
+    """
+    global _IsWriteF, record_writer, chip_clock
+
+    # 每个记录文件重新估计芯片时钟
+    chip_clock = ChipClockEstimator()
+
+    # 新建一个记录文件，ins_data文件夹由写入器创建
+    filename = os.path.join('ins_data', str(datetime.now().strftime('ins_data_%Y%m%d%H%M%S.%f')[:-3]))
+    if capture == "binary":
+        # Record Time、Corrected Time 列不落盘，读取时由文件头中的时钟锚点从单调时钟列换算
+        record_writer = ChunkedBinaryWriter(filename + CAPTURE_SUFFIX, INS_CSV_HEADER,
+                                            dtypes={"Chiptime": CHIPTIME_DTYPE, "Monotonic_ns": np.int64,
+                                                    "Corrected_Monotonic_ns": np.int64},
+                                            timestamp_columns={"Record Time": "Monotonic_ns",
+                                                               "Corrected Time": "Corrected_Monotonic_ns"},
+                                            clock=clock, sensor="ins", float_format=None)
+    else:
+        # 浮点数按 repr 输出，与 csv 模块默认一致
+        to_local = lambda mono: format_timestamps_ms(clock.to_local_ns(mono))
+        record_writer = ChunkedCsvWriter(filename + ".csv", INS_CSV_HEADER, float_format=None,
+                                         column_formatters={INS_CSV_HEADER.index("Record Time"): to_local,
+                                                            INS_CSV_HEADER.index("Corrected Time"): to_local})
+    record_writer.start()
     _IsWriteF = True
-    
-    # 创建csv写入器
-    csv_writer = csv.writer(csvfile)
-    
-    # 写入CSV标题行
-    header = [
-        "Chiptime", "Acceleration X (g)", "Acceleration Y (g)", "Acceleration Z (g)","Angular_velocity_X (dps)", "Angular_velocity_Y (dps)", "Angular_velocity_Z (dps)",
-        "Temperature (°C)", "Longitude", "Latitude", "Record Time"
-    ]
-    csv_writer.writerow(header)
 
 def endRecord():
     """
@@ -161,11 +203,20 @@ def endRecord():
     """
     global _IsWriteF
     _IsWriteF = False
-    csvfile.close()
+    record_writer.close()
     log_message("结束记录数据")
 
 def visualize_data():
     """可视化加速度、温度及其他数据。"""
+    # 样本缓存的列视图，不复制数据；横轴为样本序号，首末刻度标注芯片时间
+    data = samples.columns()
+    chaptime_list = np.arange(len(samples))
+    chip_labels = [data["Chiptime"][0].decode(), data["Chiptime"][-1].decode()]
+    temp_list = data["temperature"]
+    accx_list, accy_list, accz_list = data["accX"], data["accY"], data["accZ"]
+    gyro_x_list, gyro_y_list, gyro_z_list = data["gyroX"], data["gyroY"], data["gyroZ"]
+    lon_list, lat_list = data["lon"], data["lat"]
+
     # 创建主图
     fig = plt.figure(figsize=(14, 10))
     
@@ -177,55 +228,55 @@ def visualize_data():
     ax1.plot(chaptime_list, accx_list, label='Acceleration X', color='r')
     ax1.plot(chaptime_list, accy_list, label='Acceleration Y', color='g')
     ax1.plot(chaptime_list, accz_list, label='Acceleration Z', color='b')
-    ax1.set_xlabel('Time (s)')
+    ax1.set_xlabel('Sample')
     ax1.set_ylabel('Acceleration (g)')
     ax1.set_title('Acceleration Over Time')
     ax1.legend()
     ax1.grid()
     ax1.set_xticks([chaptime_list[0], chaptime_list[-1]])
-    ax1.set_xticklabels([str(chaptime_list[0]), str(chaptime_list[-1])])
+    ax1.set_xticklabels(chip_labels)
 
     # 温度图
     ax2 = fig.add_subplot(gs[0, 1])
     ax2.plot(chaptime_list, temp_list, label='Temperature', color='purple')
-    ax2.set_xlabel('Time (s)')
+    ax2.set_xlabel('Sample')
     ax2.set_ylabel('Temperature (°C)')
     ax2.set_title('Temperature Over Time')
     ax2.legend()
     ax2.grid()
     ax2.set_xticks([chaptime_list[0], chaptime_list[-1]])
-    ax2.set_xticklabels([str(chaptime_list[0]), str(chaptime_list[-1])])
+    ax2.set_xticklabels(chip_labels)
 
     # 角速度图
     ax3 = fig.add_subplot(gs[1, 0])
     ax3.plot(chaptime_list, gyro_x_list, label='Angular Velocity X', color='r')
     ax3.plot(chaptime_list, gyro_y_list, label='Angular Velocity Y', color='g')
     ax3.plot(chaptime_list, gyro_z_list, label='Angular Velocity Z', color='b')
-    ax3.set_xlabel('Time (s)')
+    ax3.set_xlabel('Sample')
     ax3.set_ylabel('Angular Velocity (dps)')
     ax3.set_title('Angular Velocity Over Time')
     ax3.legend()
     ax3.grid()
     ax3.set_xticks([chaptime_list[0], chaptime_list[-1]])
-    ax3.set_xticklabels([str(chaptime_list[0]), str(chaptime_list[-1])])
+    ax3.set_xticklabels(chip_labels)
 
     # 经纬度图
     ax4 = fig.add_subplot(gs[1, 1])
     ax4.plot(chaptime_list, lon_list, label='Longitude', color='orange')
     ax4.plot(chaptime_list, lat_list, label='Latitude', color='cyan')
-    ax4.set_xlabel('Time (s)')
+    ax4.set_xlabel('Sample')
     ax4.set_ylabel('Coordinates')
     ax4.set_title('Position Over Time')
     ax4.legend()
     ax4.grid()
     ax4.set_xticks([chaptime_list[0], chaptime_list[-1]])
-    ax4.set_xticklabels([str(chaptime_list[0]), str(chaptime_list[-1])])
+    ax4.set_xticklabels(chip_labels)
 
     # 地图
     ax5 = fig.add_subplot(gs[2, :])
     m = Basemap(projection='merc', 
-                llcrnrlat=min(lat_list)-0.1, urcrnrlat=max(lat_list)+0.1,
-                llcrnrlon=min(lon_list)-0.1, urcrnrlon=max(lon_list)+0.1,
+                llcrnrlat=lat_list.min()-0.1, urcrnrlat=lat_list.max()+0.1,
+                llcrnrlon=lon_list.min()-0.1, urcrnrlon=lon_list.max()+0.1,
                 resolution='h', ax=ax5)
     
     m.drawcoastlines()
@@ -244,23 +295,11 @@ def visualize_data():
     plt.tight_layout()
     plt.show()
 
-def wait_for_mag_ready():
-    while True:
-        try:
-            with open("/dev/shm/mag_ready", "r") as f:
-                content = f.read().strip()
-                if content == "ready":
-                    # 读取到ready后删除文件
-                    os.remove("/dev/shm/mag_ready")
-                    return
-        except FileNotFoundError:
-            time.sleep(0.1)
-
 # Global timing variables
 start_time = None
 finish_time = None
 
-def main(duration):
+def main(duration, capture=CAPTURE_FORMAT):
     """
     Main function to run the program for a specified duration
     :param duration: Duration to run the program in seconds
@@ -270,7 +309,7 @@ def main(duration):
     # 初始化设备模型
     device = DeviceModel(
         "我的JY901",
-        WitProtocolResolver(),
+        WitProtocolResolver(bulkDecode=BULK_DECODE),
         JY901SDataProcessor(),
         "51_0"
     )
@@ -279,22 +318,26 @@ def main(duration):
     else:
         device.serialConfig.portName = "COM5"
     device.serialConfig.baud = 115200
-    #wait_for_mag_ready()
-    #time.sleep(2.24)
 
     device.openDevice()
     setConfig(device)
+
+    # 由调度进程启动时，等待与磁力计在同一时刻开始记录
+    barrier = BarrierClient.fromEnv("ins")
+    if barrier is not None:
+        barrier.waitStart()
     start_time = datetime.now()
     log_message(f'ins_aq started: {start_time}')
     device.dataProcessor.onVarChanged.append(onUpdate_uesr)
+    device.dataProcessor.onBulkChanged.append(onBulkUpdate_user)
 
     if duration != 0:
-        startRecord()  # 开始记录数据到 CSV
+        startRecord(device.clock, capture)  # 开始记录数据
         time.sleep(duration)
         device.closeDevice()
         endRecord()  # 结束记录数据
     else:
-        startRecord()  # 开始记录数据到 CSV
+        startRecord(device.clock, capture)  # 开始记录数据
         input()
         device.closeDevice()
         endRecord()  # 结束记录数据
@@ -306,14 +349,16 @@ def main(duration):
     # 计算并写入最后的消息
     elapsed_time = (finish_time - start_time).total_seconds()
     final_msg = f"数据采集完成\n开始时间: {start_time}\n结束时间: {finish_time}\n运行时间: {elapsed_time:.1f}秒"
-    with open("/dev/shm/ins_final_msg", "w") as f:
-        f.write(final_msg)
+    if barrier is not None:
+        barrier.finish({"message": final_msg, "elapsed_s": elapsed_time, "records": len(samples)})
 
     visualize_data()  # 可视化数据
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Run program for a specified duration.")
     parser.add_argument("duration", type=int, help="Duration to run the program in seconds")
+    parser.add_argument("--capture", choices=["csv", "binary"], default=CAPTURE_FORMAT,
+                        help="记录文件格式")
     args = parser.parse_args()
-    main(args.duration)
+    main(args.duration, args.capture)
     print("程序运行时间：" + str(finish_time-start_time))
@@ -9,6 +9,7 @@ class IDataProcessor(metaclass=ABCMeta):
     :return:
     """
     onVarChanged = []
+    onBulkChanged = []
 
     @abstractmethod
     def onOpen(self, deviceModel):
@@ -20,4 +21,11 @@ class IDataProcessor(metaclass=ABCMeta):
 
     @staticmethod
     def onUpdate(*args):
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def onBulkUpdate(*args):
+        """
+        批量数据更新，参数为 (设备模型, {字段: 每个更新事件时刻的值})
+        """
+        pass
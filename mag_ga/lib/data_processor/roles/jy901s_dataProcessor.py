@@ -8,6 +8,7 @@ from lib.data_processor.interface.i_data_processor import IDataProcessor
 
 class JY901SDataProcessor(IDataProcessor):
     onVarChanged = []
+    onBulkChanged = []
     def onOpen(self, deviceModel):
         pass
 
@@ -17,4 +18,9 @@ class JY901SDataProcessor(IDataProcessor):
     @staticmethod
     def onUpdate(*args):
         for fun in JY901SDataProcessor.onVarChanged:
-            fun(*args)
\ No newline at end of file
+            fun(*args)
+
+    @staticmethod
+    def onBulkUpdate(*args):
+        for fun in JY901SDataProcessor.onBulkChanged:
+            fun(*args)
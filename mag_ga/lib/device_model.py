@@ -5,6 +5,7 @@ import time
 import struct
 import serial
 from serial import SerialException
+from lib.utils.acquisition_clock import AcquisitionClock
 '''
     串口配置
 '''
@@ -50,6 +51,12 @@ class DeviceModel:
     # 协议解析器
     protocolResolver = None
 
+    # 采集时钟，每次打开设备时记录会话锚点
+    clock = None
+
+    # 最近一次收到数据时的单调时钟值(纳秒)
+    dataReceivedNs = 0
+
     def __init__(self, deviceName, protocolResolver, dataProcessor, dataUpdateListener):
         print("初始化设备模型")
         self.deviceName = deviceName
@@ -96,20 +103,27 @@ class DeviceModel:
             # 如果串口打开了
             if self.isOpen:
                 try:
-                    tlen = self.serialPort.inWaiting()
-                    if (tlen>0):
-                        data = self.serialPort.read(tlen)
-                        self.onDataReceived(data)
+                    # 阻塞等待数据到达(最长为串口超时时间)，不再空转轮询 inWaiting
+                    data = self.serialPort.read(1)
+                    if data:
+                        receivedNs = self.clock.now()               # 数据到达时刻
+                        tlen = self.serialPort.inWaiting()
+                        if (tlen>0):
+                            data += self.serialPort.read(tlen)      # 一次读出已到达的全部数据
+                        self.onSerialData(data, receivedNs)
                 except Exception as ex:
-                    print(ex)
+                    if self.isOpen:
+                        print(ex)
             else:
                 time.sleep(0.1)
                 print("暂停")
                 break
 
-    def openDevice(self):
+    def openDevice(self, startReader=True, clock=None):
         """
         打开设备
+        :param startReader: 是否开启读取线程，由事件循环读取串口时传False
+        :param clock: 采集时钟，多个设备共用时传入，默认新建
         :return: 无返回
         """
 
@@ -117,9 +131,11 @@ class DeviceModel:
         self.closeDevice()
         try:
             self.serialPort = serial.Serial(self.serialConfig.portName, self.serialConfig.baud, timeout=0.5)
+            self.clock = clock if clock is not None else AcquisitionClock()
             self.isOpen = True
-            t = threading.Thread(target=self.readDataTh, args=("Data-Received-Thread",10,))          # 开启一个线程接收数据
-            t.start()
+            if startReader:
+                t = threading.Thread(target=self.readDataTh, args=("Data-Received-Thread",10,))          # 开启一个线程接收数据
+                t.start()
         except SerialException:
             print("打开" + self.serialConfig.portName + self.serialConfig.baud + "失败")
 
@@ -128,12 +144,24 @@ class DeviceModel:
         关闭设备
         :return: 无返回
         """
+        self.isOpen = False
         if self.serialPort is not None:
+            if hasattr(self.serialPort, "cancel_read"):
+                self.serialPort.cancel_read()               # 唤醒阻塞中的读取
             self.serialPort.close()
             print("端口关闭了")
-        self.isOpen = False
         print("设备关闭了")
 
+    def onSerialData(self, data, receivedNs):
+        """
+        串口收到数据时，由读取线程或事件循环调用
+        :param data: 收到的数据
+        :param receivedNs: 数据到达时的单调时钟值(纳秒)
+        :return: 无返回
+        """
+        self.dataReceivedNs = receivedNs
+        self.onDataReceived(data)
+
     def onDataReceived(self, data):
         """
         接收数据时
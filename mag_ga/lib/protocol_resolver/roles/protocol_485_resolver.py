@@ -2,53 +2,16 @@
 import time
 import datetime
 from lib.protocol_resolver.interface.i_protocol_resolver import IProtocolResolver
+from lib.utils.crc16 import CRC16_INIT, crc16, crc16_update
 
 """
     485协议解析器
 """
 
 class Protocol485Resolver(IProtocolResolver):
-    #region   计算CRC
-    auchCRCHi = [
-        0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81,
-        0x40, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0,
-        0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01,
-        0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01, 0xC0, 0x80, 0x41,
-        0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81,
-        0x40, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01, 0xC0,
-        0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01,
-        0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40,
-        0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81,
-        0x40, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0,
-        0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01,
-        0xC0, 0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41,
-        0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81,
-        0x40, 0x01, 0xC0, 0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0,
-        0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01,
-        0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81, 0x40, 0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41,
-        0x00, 0xC1, 0x81, 0x40, 0x01, 0xC0, 0x80, 0x41, 0x01, 0xC0, 0x80, 0x41, 0x00, 0xC1, 0x81,
-        0x40]
-    auchCRCLo = [
-        0x00, 0xC0, 0xC1, 0x01, 0xC3, 0x03, 0x02, 0xC2, 0xC6, 0x06, 0x07, 0xC7, 0x05, 0xC5, 0xC4,
-        0x04, 0xCC, 0x0C, 0x0D, 0xCD, 0x0F, 0xCF, 0xCE, 0x0E, 0x0A, 0xCA, 0xCB, 0x0B, 0xC9, 0x09,
-        0x08, 0xC8, 0xD8, 0x18, 0x19, 0xD9, 0x1B, 0xDB, 0xDA, 0x1A, 0x1E, 0xDE, 0xDF, 0x1F, 0xDD,
-        0x1D, 0x1C, 0xDC, 0x14, 0xD4, 0xD5, 0x15, 0xD7, 0x17, 0x16, 0xD6, 0xD2, 0x12, 0x13, 0xD3,
-        0x11, 0xD1, 0xD0, 0x10, 0xF0, 0x30, 0x31, 0xF1, 0x33, 0xF3, 0xF2, 0x32, 0x36, 0xF6, 0xF7,
-        0x37, 0xF5, 0x35, 0x34, 0xF4, 0x3C, 0xFC, 0xFD, 0x3D, 0xFF, 0x3F, 0x3E, 0xFE, 0xFA, 0x3A,
-        0x3B, 0xFB, 0x39, 0xF9, 0xF8, 0x38, 0x28, 0xE8, 0xE9, 0x29, 0xEB, 0x2B, 0x2A, 0xEA, 0xEE,
-        0x2E, 0x2F, 0xEF, 0x2D, 0xED, 0xEC, 0x2C, 0xE4, 0x24, 0x25, 0xE5, 0x27, 0xE7, 0xE6, 0x26,
-        0x22, 0xE2, 0xE3, 0x23, 0xE1, 0x21, 0x20, 0xE0, 0xA0, 0x60, 0x61, 0xA1, 0x63, 0xA3, 0xA2,
-        0x62, 0x66, 0xA6, 0xA7, 0x67, 0xA5, 0x65, 0x64, 0xA4, 0x6C, 0xAC, 0xAD, 0x6D, 0xAF, 0x6F,
-        0x6E, 0xAE, 0xAA, 0x6A, 0x6B, 0xAB, 0x69, 0xA9, 0xA8, 0x68, 0x78, 0xB8, 0xB9, 0x79, 0xBB,
-        0x7B, 0x7A, 0xBA, 0xBE, 0x7E, 0x7F, 0xBF, 0x7D, 0xBD, 0xBC, 0x7C, 0xB4, 0x74, 0x75, 0xB5,
-        0x77, 0xB7, 0xB6, 0x76, 0x72, 0xB2, 0xB3, 0x73, 0xB1, 0x71, 0x70, 0xB0, 0x50, 0x90, 0x91,
-        0x51, 0x93, 0x53, 0x52, 0x92, 0x96, 0x56, 0x57, 0x97, 0x55, 0x95, 0x94, 0x54, 0x9C, 0x5C,
-        0x5D, 0x9D, 0x5F, 0x9F, 0x9E, 0x5E, 0x5A, 0x9A, 0x9B, 0x5B, 0x99, 0x59, 0x58, 0x98, 0x88,
-        0x48, 0x49, 0x89, 0x4B, 0x8B, 0x8A, 0x4A, 0x4E, 0x8E, 0x8F, 0x4F, 0x8D, 0x4D, 0x4C, 0x8C,
-        0x44, 0x84, 0x85, 0x45, 0x87, 0x47, 0x46, 0x86, 0x82, 0x42, 0x43, 0x83, 0x41, 0x81, 0x80,
-        0x40]
-    #endregion  计算CRC
-    TempBytes=[]         # 临时数据列表
+    TempBytes=bytearray()  # 未组成完整数据包的剩余字节
+    TempCrc = CRC16_INIT   # 剩余字节中已计入CRC部分的校验状态
+    TempCrcLen = 0         # 剩余字节中已计入CRC的字节数
     PackSize = 87        # 一包数据大小
     gyroRange = 2000.0   # 角速度量程
     accRange = 16.0      # 加速度量程
@@ -56,6 +19,12 @@ class Protocol485Resolver(IProtocolResolver):
     TempFindValues=[]    # 读取指定寄存器返回的数据
     TempReadRegCount = 0 # 读取寄存器个数
 
+    def __init__(self):
+        self.TempBytes = bytearray()
+        self.TempCrc = CRC16_INIT
+        self.TempCrcLen = 0
+        self.TempFindValues = []
+
     def get_crc(self,datas,dlen):
         """
         获取CRC校验
@@ -63,14 +32,7 @@ class Protocol485Resolver(IProtocolResolver):
         :param dlen:校验数据长度
         :return:
         """
-        tempH=0xff         #高 CRC 字节初始化
-        tempL=0xff         #低 CRC 字节初始化
-        for i in range(0,dlen):
-            tempIndex = (tempH^datas[i]) & 0xff
-            tempH = (tempL^self.auchCRCHi[tempIndex]) & 0xff
-            tempL = self.auchCRCLo[tempIndex]
-        return (tempH<<8) | tempL
-        pass
+        return crc16(datas[:dlen])
     def setConfig(self, deviceModel):
         pass
 
@@ -78,32 +40,52 @@ class Protocol485Resolver(IProtocolResolver):
         success_bytes = deviceModel.serialPort.write(sendData)
     def passiveReceiveData(self, data, deviceModel):
         """
-        接收数据处理
+        接收数据处理，整块查找包头，CRC随数据到达增量计算，每个字节只计入一次
         :param data: 串口数据
         :param deviceModel: 设备模型
         :return:
         """
-        global TempBytes
-        for val in data:
-            self.TempBytes.append(val)
-            if (self.TempBytes[0]!=deviceModel.ADDR):       #开头的字节不等于设备ID
-                del self.TempBytes[0]                       #去除第一个字节
-                continue
-            if (len(self.TempBytes)>2):
-                if ((self.TempBytes[1]==0x03)==False):            #第三个字节数值不等于0x03
-                    del self.TempBytes[0]                         #去除第一个字节
+        buf = self.TempBytes
+        buf += data
+        size = len(buf)
+        pos = 0
+        crc = self.TempCrc
+        crcLen = self.TempCrcLen                                #从buf[0]开始已计入CRC的字节数
+        with memoryview(buf) as view:
+            while True:
+                pos = buf.find(deviceModel.ADDR, pos)           #查找设备ID
+                if pos < 0:                                     #没有包头，丢弃全部数据
+                    pos = size
+                    crcLen = 0
+                    break
+                if pos + 1 < size and buf[pos + 1] != 0x03:     #第二个字节数值不等于0x03
+                    pos += 1                                    #跳过该字节
                     continue
-                tlen = len(self.TempBytes)                        #获取当前数据长度
-                if (tlen==self.TempBytes[2] + 5):                 #表示一个包的数据大小
-                    tempCrc = self.get_crc(self.TempBytes,tlen-2)      #获取CRC校验
-                    if ((tempCrc>>8) == self.TempBytes[tlen-2] and (tempCrc & 0xff) == self.TempBytes[tlen-1]):   #数据CRC校验通过
-                        if (self.PackSize==tlen):                 #获取加速度、角速度、角度
-                            self.get_data(self.TempBytes, deviceModel)      #结算数据
-                            deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
-                        self.get_find(self.TempBytes,deviceModel)
-                        self.TempBytes=[]                        #清除数据
-                    else:                                        #数据CRC校验未通过
-                        del self.TempBytes[0]                    #去除第一个字节
+                if pos > 0:                                     #包头位置变化，重新计算CRC
+                    crcLen = 0
+                if crcLen == 0:
+                    crc = CRC16_INIT
+                if pos + 2 >= size:                             #数据长度未知，等待后续数据
+                    break
+                end = pos + buf[pos + 2] + 5                    #一个包的数据大小
+                crcEnd = min(end - 2, size)
+                crc = crc16_update(crc, view[pos + crcLen:crcEnd])
+                crcLen = crcEnd - pos
+                if end > size:                                  #剩余数据不足一包，等待后续数据
+                    break
+                if (crc & 0xff) == buf[end - 2] and (crc >> 8) == buf[end - 1]:   #数据CRC校验通过
+                    datahex = bytes(view[pos:end])
+                    if (self.PackSize == end - pos):            #获取加速度、角速度、角度
+                        self.get_data(datahex, deviceModel)     #结算数据
+                        deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
+                    self.get_find(datahex, deviceModel)
+                    pos = end
+                else:                                           #数据CRC校验未通过，跳过该字节
+                    pos += 1
+                crcLen = 0
+        del buf[:pos]
+        self.TempCrc = crc
+        self.TempCrcLen = crcLen
 
     def get_readbytes(self,devid, regAddr,regCount):
         """
@@ -0,0 +1,145 @@
+# coding:UTF-8
+import numpy as np
+
+from lib.utils.chip_clock import chiptime_ms
+
+"""
+    维特协议数据包批量结算：将校验通过的11字节数据包视为结构化数组，按类型整列结算
+"""
+
+# 一包数据：0x55 + 类型 + 4个小端int16数据 + 校验和
+WIT_PACK_DTYPE = np.dtype([('head', 'u1'), ('type', 'u1'), ('data', '<i2', (4,)), ('sum', 'u1')])
+
+# 各类型数据包结算出的字段
+PACK_FIELDS = {
+    0x50: ('Chiptime', 'ChiptimeMs'),
+    0x51: ('accX', 'accY', 'accZ', 'temperature'),
+    0x52: ('gyroX', 'gyroY', 'gyroZ'),
+    0x53: ('angleX', 'angleY', 'angleZ'),
+    0x54: ('magX', 'magY', 'magZ'),
+    0x57: ('lon', 'lat'),
+    0x58: ('Height', 'Yaw', 'Speed'),
+    0x59: ('q1', 'q2', 'q3', 'q4'),
+}
+
+# 触发数据更新事件的数据包类型：磁场、经纬度、gps、四元素
+UPDATE_PACK_TYPES = (0x54, 0x57, 0x58, 0x59)
+
+
+def _chiptime(words):
+    _year = 2000 + (words[:, 0] & 0xff)      # 年
+    _moth = (words[:, 0] >> 8) & 0xff        # 月
+    _day = words[:, 1] & 0xff                # 日
+    _hour = (words[:, 1] >> 8) & 0xff        # 时
+    _minute = words[:, 2] & 0xff             # 分
+    _second = (words[:, 2] >> 8) & 0xff      # 秒
+    _millisecond = words[:, 3]               # 毫秒
+    text = np.array([f"{y}-{mo}-{d} {h}:{mi}:{s}.{ms}" for y, mo, d, h, mi, s, ms in
+                     zip(_year.tolist(), _moth.tolist(), _day.tolist(), _hour.tolist(),
+                         _minute.tolist(), _second.tolist(), _millisecond.tolist())], dtype=object)
+    return [text, chiptime_ms(_year, _moth, _day, _hour, _minute, _second, _millisecond)]
+
+
+def _degree_minute(raw):
+    # 度*1e7 + 分*1e5 -> 十进制度
+    return np.round(raw // 10000000 + (raw % 10000000) / 100000 / 60, 8)
+
+
+def decode_frames(buffer, accRange=16.0, gyroRange=2000.0, angleRange=180.0):
+    """
+    批量结算数据包
+    :param buffer: 连续存放的校验通过的数据包
+    :param accRange: 加速度量程
+    :param gyroRange: 角速度量程
+    :param angleRange: 角度量程
+    :return: (每包类型数组, {类型: (该类型数据包的位置, [各字段结算值])})
+    """
+    packs = np.frombuffer(buffer, dtype=WIT_PACK_DTYPE)
+    types = packs['type']
+    order = np.argsort(types, kind='stable')
+    sortedTypes = types[order]
+    present = np.flatnonzero(np.diff(sortedTypes, prepend=-1))
+    groups = {}
+    for start, stop in zip(present.tolist(), present[1:].tolist() + [len(types)]):
+        packType = int(sortedTypes[start])
+        if packType not in PACK_FIELDS:
+            continue
+        pos = order[start:stop]
+        data = packs['data'][pos].astype(np.int64)      # 有符号int16
+        words = data & 0xffff                           # 无符号int16
+        if packType == 0x50:
+            values = _chiptime(words)
+        elif packType == 0x51:
+            acc = np.round(data[:, :3] / 32768.0 * accRange, 4)
+            values = [acc[:, 0], acc[:, 1], acc[:, 2], np.round(words[:, 3] / 100.0, 2)]
+        elif packType == 0x52:
+            gyro = np.round(data[:, :3] / 32768.0 * gyroRange, 4)
+            values = [gyro[:, 0], gyro[:, 1], gyro[:, 2]]
+        elif packType == 0x53:
+            angle = np.round(data[:, :3] / 32768.0 * angleRange, 3)
+            values = [angle[:, 0], angle[:, 1], angle[:, 2]]
+        elif packType == 0x54:
+            values = [data[:, 0], data[:, 1], data[:, 2]]
+        elif packType == 0x57:
+            values = [_degree_minute(words[:, 0] | words[:, 1] << 16),
+                      _degree_minute(words[:, 2] | words[:, 3] << 16)]
+        elif packType == 0x58:
+            values = [np.round(data[:, 0] / 10.0, 3), np.round(data[:, 1] / 100.0, 2),
+                      np.round((words[:, 2] | words[:, 3] << 16) / 1e3, 3)]
+        else:
+            quaternion = np.round(data / 32768.0, 5)
+            values = [quaternion[:, 0], quaternion[:, 1], quaternion[:, 2], quaternion[:, 3]]
+        groups[packType] = (pos, values)
+    return types, groups
+
+
+# 按类型字节查表判断是否触发数据更新事件
+_IS_UPDATE_PACK = np.zeros(256, dtype=bool)
+_IS_UPDATE_PACK[list(UPDATE_PACK_TYPES)] = True
+
+
+def build_update_records(types, groups, previous):
+    """
+    生成每个数据更新事件时刻的数据，与逐包结算后在更新事件中读取设备数据的结果一致
+    :param types: 每包类型数组
+    :param groups: decode_frames 结算出的各类型数据
+    :param previous: 本批数据之前的设备数据，用于补齐本批中尚未出现的字段
+    :return: {字段: 每个更新事件时刻的值}
+    """
+    trigger = np.flatnonzero(_IS_UPDATE_PACK[types])
+    records = {}
+    for packType, names in PACK_FIELDS.items():
+        if packType not in groups:
+            for name in names:
+                prev = previous.get(name)
+                records[name] = np.full(len(trigger), prev, dtype=object if prev is None else None)
+            continue
+        pos, values = groups[packType]
+        idx = np.searchsorted(pos, trigger, side='right') - 1
+        missing = idx < 0
+        anyMissing = bool(missing.any())
+        if anyMissing:
+            idx = np.maximum(idx, 0)
+        for name, value in zip(names, values):
+            column = value[idx]
+            if anyMissing:
+                prev = previous.get(name)
+                if prev is None:
+                    column = column.astype(object)
+                column[missing] = prev
+            records[name] = column
+    return records
+
+
+def latest_values(groups):
+    """
+    各字段本批中的最后一个值
+    :param groups: decode_frames 结算出的各类型数据
+    :return: {字段: 值}
+    """
+    latest = {}
+    for packType, (pos, values) in groups.items():
+        for name, value in zip(PACK_FIELDS[packType], values):
+            last = value[-1]
+            latest[name] = last.item() if isinstance(last, np.generic) else last
+    return latest
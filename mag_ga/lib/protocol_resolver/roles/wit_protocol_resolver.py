@@ -1,18 +1,41 @@
 # coding:UTF-8
+import struct
 import time
 from lib.protocol_resolver.interface.i_protocol_resolver import IProtocolResolver
+from lib.protocol_resolver.roles.wit_frame_decoder import decode_frames, build_update_records, latest_values
+from lib.utils.chip_clock import chiptime_ms
 
 """
     维特协议解析器
 """
 
+# 数据包中第2字节起的数据区，按类型一次解包，结果与逐字节移位拼接相同
+_UINT16X4 = struct.Struct('<4H')     # 加速度/温度、角速度、角度(无符号，超量程减去两倍量程)
+_INT16X4 = struct.Struct('<4h')      # 磁场、四元素
+_UINT32X2 = struct.Struct('<2I')     # 经纬度
+_GPS = struct.Struct('<hhI')         # 高度、航向角、速度
+_CHIPTIME = struct.Struct('<6BH')    # 年、月、日、时、分、秒、毫秒
+
 class WitProtocolResolver(IProtocolResolver):
-    TempBytes=[]         # 临时数据列表
+    TempBytes=bytearray()  # 未组成完整数据包的剩余字节
     PackSize = 11        # 一包数据大小
     gyroRange = 2000.0   # 角速度量程
     accRange = 16.0      # 加速度量程
     angleRange = 180.0   # 角度量程
     TempFindValues=[]    # 读取指定寄存器返回的数据
+    bulkDecode = False   # 是否按整块批量结算数据包
+    bulkMinFrames = 64   # 批量结算的最少包数，包数较少时逐包结算开销更小
+
+    def __init__(self, bulkDecode=False, bulkMinFrames=64):
+        """
+        :param bulkDecode: 为True时一次接收到的数据包整块结算，并通过数据处理器的 onBulkUpdate 输出按列组织的数据；
+                           不足 bulkMinFrames 包时仍逐包结算并触发 onUpdate
+        :param bulkMinFrames: 批量结算的最少包数
+        """
+        self.TempBytes = bytearray()
+        self.TempFindValues = []
+        self.bulkDecode = bulkDecode
+        self.bulkMinFrames = bulkMinFrames
 
     def setConfig(self, deviceModel):
         pass
@@ -21,51 +44,97 @@ class WitProtocolResolver(IProtocolResolver):
         success_bytes = deviceModel.serialPort.write(sendData)
     def passiveReceiveData(self, data, deviceModel):
         """
-        接收数据处理
+        接收数据处理，整块扫描包头，逐包校验后保留末尾不完整的数据
         :param data: 串口数据
         :param deviceModel: 设备模型
         :return:
         """
-        global TempBytes
-        for val in data:
-            self.TempBytes.append(val)
-            if (self.TempBytes[0]!=0x55):                   #非标识符0x55开头的
-                del self.TempBytes[0]                       #去除第一个字节
-                continue
-            if (len(self.TempBytes)>1):
-                if (((self.TempBytes[1] - 0x50 >=0 and self.TempBytes[1] - 0x50 <=11) or self.TempBytes[1]==0x5f)==False):   #第二个字节数值不在0x50~0x5a范围或者不等于0x5f
-                    del self.TempBytes[0]                   #去除第一个字节
+        buf = self.TempBytes
+        buf += data
+        frames = bytearray() if self.bulkDecode else None   #待批量结算的数据包
+        size = len(buf)
+        pos = 0
+        with memoryview(buf) as view:
+            while True:
+                pos = buf.find(0x55, pos)                       #查找标识符0x55
+                if pos < 0:                                     #没有包头，丢弃全部数据
+                    pos = size
+                    break
+                if pos + 1 < size and not self.is_pack_type(buf[pos + 1]):
+                    pos += 1                                    #第二个字节不是数据包类型，跳过该字节
                     continue
-            if (len(self.TempBytes) == self.PackSize):      #表示一个包的数据大小
-                CheckSum = 0                                #求和校验位
-                for i in range(0,self.PackSize-1):
-                    CheckSum+=self.TempBytes[i]
-                if (CheckSum&0xff==self.TempBytes[self.PackSize-1]):  #校验和通过
-                    if (self.TempBytes[1] == 0x50):                   #芯片时间包
-                        self.get_chiptime(self.TempBytes, deviceModel) #结算芯片时间数据
-                    elif (self.TempBytes[1]==0x51):                    #加速度包
-                        self.get_acc(self.TempBytes,deviceModel)       #结算加速度数据
-                    elif(self.TempBytes[1]==0x52):                    #角速度包
-                        self.get_gyro(self.TempBytes,deviceModel)     #结算角速度数据
-                    elif(self.TempBytes[1]==0x53):                    #角度包
-                        self.get_angle(self.TempBytes,deviceModel)    #结算角度数据
-                    elif(self.TempBytes[1]==0x54):                    #磁场包
-                        self.get_mag(self.TempBytes, deviceModel)     #结算磁场数据
-                        deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
-                    elif(self.TempBytes[1]==0x57):                    #经纬度包
-                        self.get_lonlat(self.TempBytes, deviceModel)     #结算经纬度数据
-                        deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
-                    elif(self.TempBytes[1]==0x58):                    #gps包
-                        self.get_gps(self.TempBytes, deviceModel)     #结算gps数据
-                        deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
-                    elif(self.TempBytes[1]==0x59):                    #四元素包
-                        self.get_four_elements(self.TempBytes, deviceModel)     #结算四元素数据
-                        deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
-                    elif(self.TempBytes[1]==0x5f):           #返回读取指定的寄存器
-                        self.get_find(self.TempBytes,deviceModel)
-                    self.TempBytes=[]                        #清除数据
-                else:                                        #校验和未通过
-                    del self.TempBytes[0]                    # 去除第一个字节
+                end = pos + self.PackSize
+                if end > size:                                  #剩余数据不足一包，等待后续数据
+                    break
+                if sum(view[pos:end - 1]) & 0xff == buf[end - 1]:   #校验和通过
+                    if frames is not None and buf[pos + 1] != 0x5f:
+                        frames += view[pos:end]
+                    else:
+                        self.handle_pack(bytes(view[pos:end]), deviceModel)
+                    pos = end
+                else:                                           #校验和未通过，跳过该字节
+                    pos += 1
+        del buf[:pos]
+        if not frames:
+            return
+        if len(frames) >= self.bulkMinFrames * self.PackSize:
+            self.handle_packs(frames, deviceModel)
+        else:
+            for start in range(0, len(frames), self.PackSize):
+                self.handle_pack(bytes(frames[start:start + self.PackSize]), deviceModel)
+
+    @staticmethod
+    def is_pack_type(typeByte):
+        """
+        判断是否为数据包类型字节(0x50~0x5b或0x5f)
+        :param typeByte: 第二个字节
+        :return:
+        """
+        return 0x50 <= typeByte <= 0x5b or typeByte == 0x5f
+
+    def handle_packs(self, frames, deviceModel):
+        """
+        批量结算一块校验通过的数据包，设备数据每块只更新一次
+        :param frames: 连续存放的数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        types, groups = decode_frames(frames, self.accRange, self.gyroRange, self.angleRange)
+        records = build_update_records(types, groups, deviceModel.deviceData)
+        deviceModel.deviceData.update(latest_values(groups))
+        if len(records["Chiptime"]) > 0:
+            deviceModel.dataProcessor.onBulkUpdate(deviceModel, records)
+
+    def handle_pack(self, datahex, deviceModel):
+        """
+        按类型结算一个校验通过的数据包
+        :param datahex: 原始数据包
+        :param deviceModel: 设备模型
+        :return:
+        """
+        packType = datahex[1]
+        if (packType == 0x50):                              #芯片时间包
+            self.get_chiptime(datahex, deviceModel)         #结算芯片时间数据
+        elif (packType == 0x51):                            #加速度包
+            self.get_acc(datahex, deviceModel)              #结算加速度数据
+        elif (packType == 0x52):                            #角速度包
+            self.get_gyro(datahex, deviceModel)             #结算角速度数据
+        elif (packType == 0x53):                            #角度包
+            self.get_angle(datahex, deviceModel)            #结算角度数据
+        elif (packType == 0x54):                            #磁场包
+            self.get_mag(datahex, deviceModel)              #结算磁场数据
+            deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
+        elif (packType == 0x57):                            #经纬度包
+            self.get_lonlat(datahex, deviceModel)           #结算经纬度数据
+            deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
+        elif (packType == 0x58):                            #gps包
+            self.get_gps(datahex, deviceModel)              #结算gps数据
+            deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
+        elif (packType == 0x59):                            #四元素包
+            self.get_four_elements(datahex, deviceModel)    #结算四元素数据
+            deviceModel.dataProcessor.onUpdate(deviceModel) #触发数据更新事件
+        elif (packType == 0x5f):                            #返回读取指定的寄存器
+            self.get_find(datahex, deviceModel)
 
     def get_readbytes(self,regAddr):
         """
@@ -91,17 +160,10 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        axl = datahex[2]
-        axh = datahex[3]
-        ayl = datahex[4]
-        ayh = datahex[5]
-        azl = datahex[6]
-        azh = datahex[7]
-
-        tempVal = (datahex[9] << 8 | datahex[8])
-        acc_x = (axh << 8 | axl) / 32768.0 * self.accRange
-        acc_y = (ayh << 8 | ayl) / 32768.0 * self.accRange
-        acc_z = (azh << 8 | azl) / 32768.0 * self.accRange
+        ax, ay, az, tempVal = _UINT16X4.unpack_from(datahex, 2)
+        acc_x = ax / 32768.0 * self.accRange
+        acc_y = ay / 32768.0 * self.accRange
+        acc_z = az / 32768.0 * self.accRange
         if acc_x >= self.accRange:
             acc_x -= 2 * self.accRange
         if acc_y >= self.accRange:
@@ -122,16 +184,10 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        wxl = datahex[2]
-        wxh = datahex[3]
-        wyl = datahex[4]
-        wyh = datahex[5]
-        wzl = datahex[6]
-        wzh = datahex[7]
-
-        gyro_x = (wxh << 8 | wxl) / 32768.0 * self.gyroRange
-        gyro_y = (wyh << 8 | wyl) / 32768.0 * self.gyroRange
-        gyro_z = (wzh << 8 | wzl) / 32768.0 * self.gyroRange
+        wx, wy, wz, _ = _UINT16X4.unpack_from(datahex, 2)
+        gyro_x = wx / 32768.0 * self.gyroRange
+        gyro_y = wy / 32768.0 * self.gyroRange
+        gyro_z = wz / 32768.0 * self.gyroRange
         if gyro_x >= self.gyroRange:
             gyro_x -= 2 * self.gyroRange
         if gyro_y >= self.gyroRange:
@@ -150,16 +206,10 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        rxl = datahex[2]
-        rxh = datahex[3]
-        ryl = datahex[4]
-        ryh = datahex[5]
-        rzl = datahex[6]
-        rzh = datahex[7]
-
-        angle_x = (rxh << 8 | rxl) / 32768.0 * self.angleRange
-        angle_y = (ryh << 8 | ryl) / 32768.0 * self.angleRange
-        angle_z = (rzh << 8 | rzl) / 32768.0 * self.angleRange
+        rx, ry, rz, _ = _UINT16X4.unpack_from(datahex, 2)
+        angle_x = rx / 32768.0 * self.angleRange
+        angle_y = ry / 32768.0 * self.angleRange
+        angle_z = rz / 32768.0 * self.angleRange
         if angle_x >= self.angleRange:
             angle_x -= 2 * self.angleRange
         if angle_y >= self.angleRange:
@@ -178,9 +228,7 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        _x = deviceModel.get_int(bytes([datahex[2],datahex[3]]))
-        _y = deviceModel.get_int(bytes([datahex[4],datahex[5]]))
-        _z = deviceModel.get_int(bytes([datahex[6],datahex[7]]))
+        _x, _y, _z, _ = _INT16X4.unpack_from(datahex, 2)
 
         deviceModel.setDeviceData("magX", round(_x, 0))   # 设备模型磁场X赋值
         deviceModel.setDeviceData("magY", round(_y, 0))   # 设备模型磁场Y赋值
@@ -194,8 +242,7 @@ class WitProtocolResolver(IProtocolResolver):
         :return:
         """
 
-        lon = deviceModel.get_unint(bytes([datahex[2],datahex[3],datahex[4],datahex[5]]))
-        lat = deviceModel.get_unint(bytes([datahex[6],datahex[7],datahex[8],datahex[9]]))
+        lon, lat = _UINT32X2.unpack_from(datahex, 2)
         #(lon / 10000000 + ((double)(lon % 10000000) / 1e5 / 60.0)).ToString("f8")
         tlon = int(lon / 10000000) + ((lon % 10000000) / 100000 / 60)
         tlat = int(lat / 10000000) + ((lat % 10000000) / 100000 / 60)
@@ -210,9 +257,10 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        Height = deviceModel.get_int(bytes([datahex[2],datahex[3]])) / 10.0   #高度
-        Yaw = deviceModel.get_int(bytes([datahex[4],datahex[5]])) / 100.0     #航向角
-        Speed = deviceModel.get_unint(bytes([datahex[6],datahex[7],datahex[8],datahex[9]])) / 1e3            #海里
+        height, yaw, speed = _GPS.unpack_from(datahex, 2)
+        Height = height / 10.0   #高度
+        Yaw = yaw / 100.0        #航向角
+        Speed = speed / 1e3      #海里
 
         deviceModel.setDeviceData("Height", round(Height, 3))   # 设备模型高度赋值
         deviceModel.setDeviceData("Yaw", round(Yaw, 2))   # 设备模型航向角赋值
@@ -225,10 +273,7 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        q1 = deviceModel.get_int(bytes([datahex[2],datahex[3]])) / 32768.0
-        q2 = deviceModel.get_int(bytes([datahex[4],datahex[5]])) / 32768.0
-        q3 = deviceModel.get_int(bytes([datahex[6],datahex[7]])) / 32768.0
-        q4 = deviceModel.get_int(bytes([datahex[8],datahex[9]])) / 32768.0
+        q1, q2, q3, q4 = (v / 32768.0 for v in _INT16X4.unpack_from(datahex, 2))
 
         deviceModel.setDeviceData("q1", round(q1, 5))   # 设备模型元素1赋值
         deviceModel.setDeviceData("q2", round(q2, 5))   # 设备模型元素2赋值
@@ -242,21 +287,11 @@ class WitProtocolResolver(IProtocolResolver):
         :param deviceModel: 设备模型
         :return:
         """
-        tempVals = []      #临时结算数据
-        for i in range(0,4):
-            tIndex = 2 + i * 2
-            tempVals.append(datahex[tIndex+1] << 8 | datahex[tIndex])
-
-        _year = 2000 + (tempVals[0] & 0xff)      # 年
-        _moth = ((tempVals[0] >> 8) & 0xff)      # 月
-        _day = (tempVals[1] & 0xff)              # 日
-        _hour = ((tempVals[1] >> 8) & 0xff)      # 时
-        _minute = (tempVals[2] & 0xff)           # 分
-        _second = ((tempVals[2] >> 8) & 0xff)    # 秒
-        _millisecond = tempVals[3]               # 毫秒
-        deviceModel.setDeviceData("Chiptime",
-                                  str(_year) + "-" + str(_moth) + "-" + str(_day) + " " + str(_hour) + ":" + str(
-                                      _minute) + ":" + str(_second) + "." + str(_millisecond))  # 设备模型芯片时间赋值
+        _year, _moth, _day, _hour, _minute, _second, _millisecond = _CHIPTIME.unpack_from(datahex, 2)
+        _year += 2000      # 年
+        deviceModel.setDeviceData("Chiptime", f"{_year}-{_moth}-{_day} {_hour}:{_minute}:{_second}.{_millisecond}")  # 设备模型芯片时间赋值
+        deviceModel.setDeviceData("ChiptimeMs",
+                                  chiptime_ms(_year, _moth, _day, _hour, _minute, _second, _millisecond))  # 芯片时间毫秒计数，用于对时
 
     def readReg(self, regAddr,regCount, deviceModel):
         """
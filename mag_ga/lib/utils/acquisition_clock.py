@@ -0,0 +1,76 @@
+# coding:UTF-8
+import time
+
+from lib.utils.timestamp_utils import local_offset_ns
+
+"""
+    采集时钟：数据到达时只记录 time.monotonic_ns()，每个会话记录一次墙上时间锚点，
+    需要墙上时间时由锚点换算。单调时钟为系统级时钟，两个传感器进程记录的值可直接比较
+"""
+
+
+class AcquisitionClock:
+    """
+    采集时钟
+    """
+
+    def __init__(self, samples=5):
+        """
+        记录会话锚点：取多次采样中前后两次单调时钟读数间隔最短的一次，
+        以其中点作为与墙上时间对应的单调时钟值
+        :param samples: 采样次数
+        """
+        best = None
+        for _ in range(samples):
+            before = time.monotonic_ns()
+            wall = time.time_ns()
+            after = time.monotonic_ns()
+            if best is None or after - before < best[0]:
+                best = (after - before, (before + after) // 2, wall)
+        self.anchor_uncertainty_ns, self.anchor_mono_ns, self.anchor_wall_ns = best
+        self.local_offset_ns = local_offset_ns()
+
+    @staticmethod
+    def now():
+        """
+        读取单调时钟，在数据到达时调用
+        :return: int纳秒
+        """
+        return time.monotonic_ns()
+
+    def to_wall_ns(self, mono_ns):
+        """
+        单调时钟值换算为UTC墙上时间
+        :param mono_ns: 单调时钟值(int或int64数组)
+        :return: UTC纳秒时间戳
+        """
+        return mono_ns - self.anchor_mono_ns + self.anchor_wall_ns
+
+    def to_local_ns(self, mono_ns):
+        """
+        单调时钟值换算为本地时间，与 datetime.now() 对应，可直接用 format_timestamps_ms 格式化
+        :param mono_ns: 单调时钟值(int或int64数组)
+        :return: 本地时间纳秒时间戳
+        """
+        return self.to_wall_ns(mono_ns) + self.local_offset_ns
+
+    # 写入文件头的锚点字段
+    ANCHOR_FIELDS = ("anchor_mono_ns", "anchor_wall_ns", "anchor_uncertainty_ns", "local_offset_ns")
+
+    def anchor(self):
+        """
+        :return: 锚点字典，可写入文件头并由 fromAnchor 还原
+        """
+        return {name: getattr(self, name) for name in self.ANCHOR_FIELDS}
+
+    @classmethod
+    def fromAnchor(cls, anchor):
+        """
+        由记录的锚点还原采集时钟，用于离线换算已落盘的单调时钟值
+        :param anchor: anchor() 返回的字典
+        :return: AcquisitionClock
+        """
+        clock = cls.__new__(cls)
+        for name in cls.ANCHOR_FIELDS:
+            setattr(clock, name, int(anchor[name]))
+        return clock
@@ -0,0 +1,94 @@
+# coding:UTF-8
+import asyncio
+import os
+import threading
+
+from serial import SerialException
+
+"""
+    事件循环串口读取：把串口的文件描述符注册到 asyncio 事件循环，可读时一次读出已到达的全部数据，
+    多个串口共用一个线程，不需要为每个串口开读取线程；
+    Windows 的串口句柄不能注册到事件循环，改为每个串口一个阻塞读取线程，数据交给事件循环处理
+"""
+
+
+class AsyncSerialReader:
+    """
+    事件循环串口读取器
+    """
+    THREAD_READ_TIMEOUT_S = 0.1     # 读取线程阻塞读取的超时，停止时最多等待该时长
+
+    def __init__(self, serialPort, onData, clock):
+        """
+        :param serialPort: 已打开的 serial.Serial
+        :param onData: 数据回调 onData(data, receivedNs)
+        :param clock: 采集时钟，记录数据到达时刻
+        """
+        self.serialPort = serialPort
+        self.onData = onData
+        self.clock = clock
+        self.loop = None
+        self.fd = None
+        self.thread = None
+        self.running = False
+
+    def start(self, loop=None):
+        """
+        开始读取，posix 下串口改为非阻塞并注册到事件循环，其他平台启动读取线程
+        :param loop: 事件循环，默认为当前运行的事件循环
+        :return: 无返回
+        """
+        self.loop = loop if loop is not None else asyncio.get_running_loop()
+        if os.name != 'posix':
+            self.serialPort.timeout = self.THREAD_READ_TIMEOUT_S
+            self.running = True
+            self.thread = threading.Thread(target=self.readLoop, name="Async-Serial-Reader", daemon=True)
+            self.thread.start()
+            return
+        self.serialPort.timeout = 0
+        self.fd = self.serialPort.fileno()
+        self.loop.add_reader(self.fd, self.onReadable)
+
+    def stop(self):
+        """
+        停止读取，必须在关闭串口之前调用
+        :return: 无返回
+        """
+        if self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.fd = None
+        if self.thread is not None:
+            self.running = False
+            self.thread.join()
+            self.thread = None
+
+    def onReadable(self):
+        """
+        串口可读时由事件循环调用
+        :return: 无返回
+        """
+        receivedNs = self.clock.now()       # 数据到达时刻
+        try:
+            data = self.serialPort.read(self.serialPort.in_waiting or 1)
+        except SerialException as ex:
+            print(ex)
+            self.stop()
+            return
+        if data:
+            self.onData(data, receivedNs)
+
+    def readLoop(self):
+        """
+        读取线程：阻塞读取，数据与到达时刻交给事件循环线程调用 onData
+        :return: 无返回
+        """
+        while self.running:
+            try:
+                data = self.serialPort.read(self.serialPort.in_waiting or 1)
+            except SerialException as ex:
+                print(ex)
+                self.running = False
+                return
+            if data:
+                receivedNs = self.clock.now()       # 数据到达时刻
+                self.loop.call_soon_threadsafe(self.onData, data, receivedNs)
@@ -0,0 +1,233 @@
+# coding:UTF-8
+import json
+import os
+import struct
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from lib.utils.acquisition_clock import AcquisitionClock
+from lib.utils.csv_stream_writer import ChunkedCsvWriter
+from lib.utils.timestamp_utils import format_timestamps_ms
+
+"""
+    二进制采集文件：定长小端记录，文件头为JSON，描述各列类型、对应的CSV标题行和会话时钟锚点
+    文件结构: 魔数(8字节) + 文件头长度(uint32小端) + JSON文件头(以空格补齐，使记录从64字节边界开始) + 记录
+    记录数由文件大小推算，进程被强制结束时最后一块之前的记录完整可读，末尾不完整的记录被忽略
+    时间戳字符串列不落盘，只记录对应的单调时钟列，读取或导出CSV时由锚点换算并格式化
+"""
+
+CAPTURE_MAGIC = b"MAGCAP1\n"
+CAPTURE_VERSION = 1
+CAPTURE_SUFFIX = ".cap"
+HEADER_ALIGN = 64
+
+_LENGTH = struct.Struct("<I")
+
+
+def record_dtype(columns):
+    """
+    :param columns: [(列名, dtype)]
+    :return: 紧凑排列的小端结构化dtype
+    """
+    return np.dtype([(name, np.dtype(dtype).newbyteorder('<')) for name, dtype in columns])
+
+
+def encode_header(header):
+    """
+    :param header: 文件头字典
+    :return: 魔数 + 长度 + JSON，总长度为 HEADER_ALIGN 的整数倍
+    """
+    body = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    prefix = len(CAPTURE_MAGIC) + _LENGTH.size
+    body += b" " * (-(prefix + len(body)) % HEADER_ALIGN)
+    return CAPTURE_MAGIC + _LENGTH.pack(len(body)) + body
+
+
+def read_header(path):
+    """
+    :param path: 采集文件路径
+    :return: (文件头字典, 记录起始偏移)
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(CAPTURE_MAGIC))
+        if magic != CAPTURE_MAGIC:
+            raise ValueError(f"{path} 不是采集文件")
+        length, = _LENGTH.unpack(f.read(_LENGTH.size))
+        header = json.loads(f.read(length).decode('utf-8'))
+    if header.get("version") != CAPTURE_VERSION:
+        raise ValueError(f"不支持的采集文件版本: {header.get('version')}")
+    return header, len(CAPTURE_MAGIC) + _LENGTH.size + length
+
+
+class ChunkedBinaryWriter(ChunkedCsvWriter):
+    """
+    分块二进制写入器，接口及落盘策略与 ChunkedCsvWriter 相同，样本按相同的标题行投递
+    """
+
+    def __init__(self, file_path, header, dtypes=None, timestamp_columns=None, clock=None, sensor="",
+                 flush_rows=100, flush_interval_ms=500, queue_size=10000, float_format='%.6f'):
+        """
+        :param file_path: 采集文件路径
+        :param header: 标题行，与CSV相同
+        :param dtypes: {列名: dtype}，未列出的列为 float64
+        :param timestamp_columns: {时间戳列名: 单调时钟列名}，这些列不落盘，读取时由单调时钟列换算
+        :param clock: 本次会话的采集时钟，其锚点写入文件头
+        :param sensor: 传感器名称
+        :param float_format: 导出CSV时的浮点数格式，为None时按 repr 输出
+        """
+        super().__init__(file_path, header, flush_rows=flush_rows, flush_interval_ms=flush_interval_ms,
+                         queue_size=queue_size, float_format=float_format)
+        dtypes = dtypes or {}
+        self.timestamp_columns = dict(timestamp_columns or {})
+        # 落盘列在样本中的位置
+        self.stored = [i for i, name in enumerate(header) if name not in self.timestamp_columns]
+        self.dtype = record_dtype([(header[i], dtypes.get(header[i], np.float64)) for i in self.stored])
+        self.clock = clock
+        self.sensor = sensor
+
+    def file_header(self):
+        """
+        :return: 文件头字典
+        """
+        return {
+            "version": CAPTURE_VERSION,
+            "sensor": self.sensor,
+            "created": datetime.now().isoformat(),
+            "columns": [[name, self.dtype[name].str] for name in self.dtype.names],
+            "record_size": self.dtype.itemsize,
+            "csv_header": list(self.header),
+            "timestamp_columns": self.timestamp_columns,
+            "float_format": self.float_format,
+            "clock": self.clock.anchor() if self.clock is not None else None,
+        }
+
+    def start(self):
+        """
+        创建文件、写入文件头并启动写入线程
+        :return: 无返回
+        """
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.file_path, "wb")
+        self._file.write(encode_header(self.file_header()))
+        self._file.flush()
+        self._thread = threading.Thread(target=self._run, name="Capture-Writer-Thread", daemon=True)
+        self._thread.start()
+
+    def pack_rows(self, rows):
+        """
+        样本打包为记录，字符串超过列宽时抛出 ValueError，不截断写入
+        :param rows: 样本列表
+        :return: 结构化数组，浮点列中的 None 记为 nan，字符串列中的 None 记为空
+        """
+        block = np.empty(len(rows), dtype=self.dtype)
+        columns = list(zip(*rows))
+        for name, index in zip(self.dtype.names, self.stored):
+            values = columns[index]
+            if self.dtype[name].kind == 'S':
+                values = [b'' if v is None else v for v in values]
+                width = max(len(v.encode('utf-8') if isinstance(v, str) else v) for v in values)
+                if width > self.dtype[name].itemsize:
+                    raise ValueError(f"{name} 列的值长度 {width} 超过列宽 {self.dtype[name].itemsize}")
+            block[name] = values
+        return block
+
+    def _flush(self, rows):
+        if rows:
+            self._file.write(self.pack_rows(rows).tobytes())
+            self.rows_written += len(rows)
+        self._file.flush()
+
+
+class CaptureReader:
+    """
+    采集文件读取器，记录以 np.memmap 映射，打开文件不读取数据
+    """
+
+    def __init__(self, path):
+        """
+        :param path: 采集文件路径
+        """
+        self.path = path
+        self.header, offset = read_header(path)
+        self.dtype = record_dtype(self.header["columns"])
+        self.csv_header = self.header["csv_header"]
+        self.timestamp_columns = self.header["timestamp_columns"]
+        anchor = self.header.get("clock")
+        self.clock = AcquisitionClock.fromAnchor(anchor) if anchor else None
+        count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=offset, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        """
+        :param name: 列名，时间戳列返回格式化后的字符串数组
+        :return: 落盘列返回映射的视图
+        """
+        if name in self.timestamp_columns:
+            return self.timestamps(name)
+        return self.records[name]
+
+    def timestamps(self, name, start=0, stop=None):
+        """
+        由单调时钟列换算时间戳列，与CSV中的格式相同
+        :param name: 时间戳列名
+        :return: 字符串数组
+        """
+        mono = np.asarray(self.records[self.timestamp_columns[name]][start:stop], dtype=np.int64)
+        if self.clock is None:
+            raise ValueError(f"{self.path} 没有记录时钟锚点，无法换算 {name}")
+        return format_timestamps_ms(self.clock.to_local_ns(mono))
+
+    def to_dataframe(self, start=0, stop=None):
+        """
+        读取一段记录，列与CSV标题行一致
+        :param start: 起始记录序号
+        :param stop: 结束记录序号(不含)，None为到末尾
+        :return: DataFrame
+        """
+        block = self.records[start:stop]
+        data = {}
+        for name in self.csv_header:
+            if name in self.timestamp_columns:
+                data[name] = self.timestamps(name, start, stop)
+            elif block.dtype[name].kind == 'S':
+                data[name] = np.char.decode(block[name], 'utf-8')
+            else:
+                data[name] = np.array(block[name])
+        return pd.DataFrame(data, columns=self.csv_header)
+
+    def to_csv(self, csv_path, chunk_rows=500000):
+        """
+        按块导出为与采集时CSV相同格式的文件(行尾与 csv 模块一致为 \r\n)
+        :param csv_path: 输出文件路径
+        :param chunk_rows: 每块记录数
+        :return: 导出的记录数
+        """
+        float_format = self.header.get("float_format")
+        with open(csv_path, "w", newline='') as f:
+            pd.DataFrame(columns=self.csv_header).to_csv(f, index=False, lineterminator='\r\n')
+            for start in range(0, len(self), chunk_rows):
+                self.to_dataframe(start, start + chunk_rows).to_csv(f, index=False, header=False, lineterminator='\r\n',
+                                                                   float_format=float_format)
+        return len(self)
+
+
+def load_capture(path):
+    """
+    读取采集文件或CSV文件
+    :param path: 文件路径，以 CAPTURE_SUFFIX 结尾时按采集文件读取
+    :return: DataFrame
+    """
+    if path.endswith(CAPTURE_SUFFIX):
+        return CaptureReader(path).to_dataframe()
+    return pd.read_csv(path)
@@ -0,0 +1,110 @@
+# coding:UTF-8
+from collections import deque
+
+"""
+    芯片时钟对时：将传感器芯片时间换算为整数毫秒计数，在采集过程中在线估计芯片时钟与主机单调时钟之间的偏移和漂移，
+    由芯片时间得到去除串口接收抖动后的单调时钟值
+"""
+
+NS_PER_MS = 1000000
+
+
+def chiptime_ms(year, month, day, hour, minute, second, millisecond):
+    """
+    芯片时间各字段换算为毫秒计数，参数可为int或int64数组
+    每月按31天计，不校验日期是否有效(芯片未授时时月、日可能超出范围)，
+    因此跨月、跨日时计数可能跳变，由 ChipClockEstimator 检测后重新估计
+    :return: 毫秒计数
+    """
+    return ((((((year * 12 + month) * 31 + day) * 24 + hour) * 60 + minute) * 60 + second) * 1000
+            + millisecond)
+
+
+class ChipClockEstimator:
+    """
+    芯片时钟估计器：对最近 window 个 (芯片毫秒计数, 到达时刻单调时钟值) 做最小二乘直线拟合，
+    拟合量以整数累加和保存，每次更新增删一个样本，开销与窗口大小无关
+    """
+
+    def __init__(self, window=12000, max_gap_ms=2000):
+        """
+        :param window: 参与拟合的样本数，默认约30秒(芯片时间100Hz、每个芯片时间4个数据更新事件)
+        :param max_gap_ms: 相邻样本的芯片时间间隔与主机时间间隔相差超过该值时(芯片时间重置、跨日等)，丢弃已有样本重新估计
+        """
+        self.window = window
+        self.max_gap_ms = max_gap_ms
+        self.reset()
+
+    def reset(self):
+        """
+        丢弃所有样本
+        :return: 无返回
+        """
+        self.samples = deque()
+        self.x0 = self.y0 = None
+        self.last_chip_ms = self.last_mono_ns = None
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0
+        self.intercept = 0.0
+        self.slope = 0.0
+
+    def update(self, chip_ms, mono_ns):
+        """
+        加入一个样本并返回该样本校正后的单调时钟值
+        :param chip_ms: 芯片毫秒计数(chiptime_ms)，为None(尚未收到芯片时间数据包)时原样返回 mono_ns
+        :param mono_ns: 数据到达时刻的单调时钟值
+        :return: 拟合直线在该芯片时间处的单调时钟值(int纳秒)
+        """
+        if chip_ms is None:
+            return mono_ns
+        if self.last_chip_ms is not None:
+            step = chip_ms - self.last_chip_ms
+            if step < 0 or abs(step * NS_PER_MS - (mono_ns - self.last_mono_ns)) > self.max_gap_ms * NS_PER_MS:
+                self.reset()
+        if self.x0 is None:
+            self.x0, self.y0 = chip_ms, mono_ns
+        self.last_chip_ms, self.last_mono_ns = chip_ms, mono_ns
+
+        # x 为相对首个样本的芯片毫秒数，y 为到达时刻与按芯片时间推算的时刻之差(纳秒)
+        x = chip_ms - self.x0
+        y = mono_ns - self.y0 - x * NS_PER_MS
+        self.samples.append((x, y))
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        if self.n > self.window:
+            ox, oy = self.samples.popleft()
+            self.n -= 1
+            self.sx -= ox
+            self.sy -= oy
+            self.sxx -= ox * ox
+            self.sxy -= ox * oy
+
+        # 累加和为整数，相减时没有舍入误差；样本的芯片时间都相同时只估计偏移
+        det = self.n * self.sxx - self.sx * self.sx
+        if det:
+            self.slope = (self.n * self.sxy - self.sx * self.sy) / det
+            self.intercept = (self.sy - self.slope * self.sx) / self.n
+        else:
+            self.slope = 0.0
+            self.intercept = self.sy / self.n
+        return self.y0 + x * NS_PER_MS + round(self.intercept + self.slope * x)
+
+    @property
+    def offset_ns(self):
+        """
+        :return: 最近一个样本处拟合出的 单调时钟值 - 芯片毫秒计数 * 1e6，随漂移缓慢变化；尚无样本时为None
+        """
+        if self.x0 is None:
+            return None
+        x = self.last_chip_ms - self.x0
+        return self.y0 - self.x0 * NS_PER_MS + round(self.intercept + self.slope * x)
+
+    @property
+    def drift_ppm(self):
+        """
+        :return: 主机单调时钟相对芯片时钟的频率偏差，正值表示芯片时钟偏慢
+        """
+        # 每芯片毫秒多出的纳秒数，1ns/ms 即 1ppm
+        return self.slope
@@ -0,0 +1,85 @@
+# coding:UTF-8
+import struct
+from array import array
+
+import numpy as np
+
+"""
+    Modbus CRC16 校验(多项式0xA001，初值0xFFFF)
+    校验状态为标准的反射形式，低字节为先发送的CRC字节
+"""
+
+CRC16_INIT = 0xffff
+
+
+def _make_byte_table():
+    """
+    生成单字节查表，等价于原 auchCRCHi / auchCRCLo 两张表合并
+    :return: 256项查表
+    """
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+def _make_word_table(byteTable):
+    """
+    生成双字节查表：校验状态与两个字节(小端)异或后一次查表，得到处理完这两个字节后的状态
+    :param byteTable: 单字节查表
+    :return: 65536项查表
+    """
+    return array('H', ((byteTable[v & 0xff] >> 8) ^ byteTable[((v >> 8) ^ byteTable[v & 0xff]) & 0xff]
+                       for v in range(65536)))
+
+
+CRC16_TABLE = array('H', _make_byte_table())
+CRC16_WORD_TABLE = _make_word_table(CRC16_TABLE)    # 紧凑数组，比元组/列表的缓存命中率高
+_CRC16_WORD_TABLE_NP = np.frombuffer(CRC16_WORD_TABLE, dtype=np.uint16)
+_CRC16_TABLE_NP = np.frombuffer(CRC16_TABLE, dtype=np.uint16)
+
+
+def crc16_update(crc, data):
+    """
+    在已有CRC状态上继续计算，用于数据分段到达时的增量校验
+    :param crc: 当前CRC状态，初始为 CRC16_INIT
+    :param data: 新增的字节(bytes/bytearray/memoryview)
+    :return: 新的CRC状态
+    """
+    dlen = len(data)
+    table = CRC16_WORD_TABLE
+    for word in struct.unpack_from('<%dH' % (dlen >> 1), data):
+        crc = table[crc ^ word]
+    if dlen & 1:
+        crc = (crc >> 8) ^ CRC16_TABLE[(crc ^ data[dlen - 1]) & 0xff]
+    return crc
+
+
+def crc16(data):
+    """
+    计算CRC校验
+    :param data: 数据
+    :return: CRC校验值，高字节为先发送的CRC字节
+    """
+    crc = crc16_update(CRC16_INIT, bytes(data))
+    return ((crc & 0xff) << 8) | (crc >> 8)
+
+
+def crc16_packets(packets):
+    """
+    批量计算等长数据包的CRC，每次处理所有数据包的同一列字节
+    :param packets: (包数, 校验数据长度) 的uint8数组
+    :return: 每包的CRC校验值，高字节为先发送的CRC字节
+    """
+    packets = np.ascontiguousarray(packets, dtype=np.uint8)
+    dlen = packets.shape[1]
+    words = packets[:, :dlen & ~1].view('<u2')
+    crc = np.full(len(packets), CRC16_INIT, dtype=np.uint16)
+    for column in words.T:
+        crc = _CRC16_WORD_TABLE_NP[crc ^ column]
+    if dlen & 1:
+        crc = (crc >> 8) ^ _CRC16_TABLE_NP[(crc ^ packets[:, -1]) & 0xff]
+    return (crc << 8) | (crc >> 8)
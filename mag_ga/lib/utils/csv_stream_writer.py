@@ -0,0 +1,181 @@
+# coding:UTF-8
+import csv
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+"""
+    分块CSV写入器：采集线程通过有界队列投递样本，独立写入线程按行数或时间间隔分块落盘
+    写入线程出错(格式化异常、磁盘已满等)后不再接受样本，异常由之后的 write/close 抛出
+"""
+
+_STOP = object()    # 结束标志
+
+
+class _Rows(list):
+    """一次投递的多个样本，写入线程整块取出"""
+_PUT_TIMEOUT_S = 0.2    # 队列满时检查写入线程状态的间隔
+
+
+class ChunkedCsvWriter:
+    """
+    分块CSV写入器
+    每累计 flush_rows 个样本或距上次落盘超过 flush_interval_ms 毫秒时写入一次并flush，
+    进程被强制结束时，文件内容完整保留到最后一次落盘
+    """
+
+    def __init__(self, file_path, header, flush_rows=100, flush_interval_ms=500,
+                 queue_size=10000, float_format='%.6f', column_formatters=None):
+        """
+        :param file_path: CSV文件路径
+        :param header: 标题行
+        :param flush_rows: 每块最多样本数
+        :param flush_interval_ms: 最长落盘间隔(毫秒)
+        :param queue_size: 队列容量，队列满时 write 阻塞
+        :param float_format: 浮点数格式，为None时按 csv 模块默认方式输出(repr)
+        :param column_formatters: {列序号: 格式化函数}，函数接收整块该列的数组并返回字符串数组，
+                                  用于采集时只记录整数、落盘时再批量格式化的列(如时间戳)
+        """
+        self.file_path = file_path
+        self.header = header
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.float_format = float_format
+        self.column_formatters = column_formatters or {}
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._writer = None
+        self._thread = None
+        self._error = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        """
+        创建文件、写入标题行并启动写入线程
+        :return: 无返回
+        """
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.file_path, "w", newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+        self._file.flush()
+        self._thread = threading.Thread(target=self._run, name="Csv-Writer-Thread", daemon=True)
+        self._thread.start()
+
+    def write(self, row):
+        """
+        投递一个样本
+        :param row: 与标题行对应的数据
+        :return: 无返回
+        """
+        self._put(row)
+
+    def write_columns(self, columns):
+        """
+        一次投递一组按列组织的样本，整组只占一个队列位置
+        :param columns: 与标题行对应的各列，等长序列
+        :return: 无返回
+        """
+        rows = _Rows(zip(*columns))
+        if rows:
+            self._put(rows)
+
+    def close(self):
+        """
+        写入剩余样本并关闭文件
+        :return: 无返回
+        """
+        if self._thread is None:
+            return
+        try:
+            if self._error is None:
+                self._put(_STOP)
+            self._thread.join()
+        finally:
+            self._thread = None
+            self._file.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        """
+        写入线程已出错时抛出其异常
+        :return: 无返回
+        """
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, item):
+        """
+        投递到队列，队列满时定期检查写入线程，线程已退出时抛出其异常而不是一直阻塞
+        :param item: 样本或结束标志
+        :return: 无返回
+        """
+        self._raise_error()
+        while True:
+            try:
+                self._queue.put(item, timeout=_PUT_TIMEOUT_S)
+                return
+            except queue.Full:
+                self._raise_error()
+                if not self._thread.is_alive():
+                    raise RuntimeError(f"{self.file_path} 的写入线程已退出")
+
+    def format_rows(self, rows):
+        """
+        格式化一块样本，浮点数按 float_format 输出
+        :param rows: 样本列表
+        :return: 格式化后的行列表
+        """
+        fmt = self.float_format
+        if self.column_formatters:
+            columns = list(zip(*rows))
+            for index, formatter in self.column_formatters.items():
+                columns[index] = formatter(np.asarray(columns[index])).tolist()
+            rows = zip(*columns)
+        if fmt is None:
+            return list(rows)
+        return [[fmt % v if isinstance(v, float) else v for v in row] for row in rows]
+
+    def _flush(self, rows):
+        if rows:
+            self._writer.writerows(self.format_rows(rows))
+            self.rows_written += len(rows)
+        self._file.flush()
+
+    def _run(self):
+        try:
+            self._loop()
+        except Exception as e:
+            self._error = e
+
+    def _loop(self):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(pending)
+                break
+            if type(item) is _Rows:
+                pending.extend(item)
+            elif item is not None:
+                pending.append(item)
+            if len(pending) >= self.flush_rows or time.monotonic() >= deadline:
+                self._flush(pending)
+                pending = []
+                deadline = time.monotonic() + self.flush_interval
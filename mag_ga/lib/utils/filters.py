@@ -0,0 +1,271 @@
+# coding:UTF-8
+from bisect import bisect_left, insort
+from collections import deque
+from operator import mul
+
+import numpy as np
+from scipy.signal import butter, savgol_coeffs, sosfilt_zi
+
+"""
+    滤波工具：尾随窗口均值滤波，离线处理用累计和一次算完整列，采集时用增量版本逐点更新
+    两者语义相同：第i点取 [max(0, i-窗口+1), i] 内的均值，开头不足一个窗口时取已有数据的均值
+    采集时的其他实时滤波器(中值、指数、Savitzky-Golay、Butterworth低通)由 FilterBank 组合，
+    每个滤波器只保存固定大小的状态，每个样本的开销与数据总量无关
+"""
+
+
+def moving_average(data, window_size=10):
+    """
+    尾随窗口均值滤波，O(n)
+    :param data: 数据序列
+    :param window_size: 窗口大小
+    :return: 滤波后的float64数组
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n = len(data)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+    # 减去首个值后再累加，避免大数值(如磁场模值约45000)长时间累加后相减损失精度
+    offset = data[0]
+    csum = np.empty(n + 1, dtype=np.float64)
+    csum[0] = 0.0
+    np.cumsum(data - offset, out=csum[1:])
+    end = np.arange(1, n + 1)
+    start = np.maximum(end - window_size, 0)
+    return (csum[end] - csum[start]) / (end - start) + offset
+
+
+class MovingAverage:
+    """
+    增量尾随窗口均值滤波，每个样本O(1)
+    """
+    __slots__ = ("window", "size", "index", "count", "total")
+
+    def __init__(self, window_size=10):
+        """
+        :param window_size: 窗口大小
+        """
+        self.window = [0.0] * window_size
+        self.size = window_size
+        self.index = 0          # 下一个写入位置
+        self.count = 0          # 窗口内的数据个数
+        self.total = 0.0        # 窗口内数据之和
+
+    def update(self, value):
+        """
+        加入一个新数据
+        :param value: 新数据
+        :return: 当前窗口的均值
+        """
+        if self.count == self.size:
+            self.total -= self.window[self.index]
+        else:
+            self.count += 1
+        self.window[self.index] = value
+        self.total += value
+        self.index += 1
+        if self.index == self.size:
+            self.index = 0
+            # 每转一圈按窗口重新求和一次，消除增减累计的舍入误差
+            self.total = sum(self.window)
+        return self.total / self.count
+
+    def reset(self):
+        """
+        清空窗口
+        :return: 无返回
+        """
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+
+class MovingMedian:
+    """
+    尾随窗口中值滤波，开头不足一个窗口时取已有数据的中值
+    """
+    __slots__ = ("window", "ordered")
+
+    def __init__(self, window_size=5):
+        """
+        :param window_size: 窗口大小
+        """
+        self.window = deque(maxlen=window_size)
+        self.ordered = []       # 窗口内数据排序后的副本
+
+    def update(self, value):
+        """
+        加入一个新数据
+        :param value: 新数据
+        :return: 当前窗口的中值
+        """
+        window = self.window
+        ordered = self.ordered
+        if len(window) == window.maxlen:
+            del ordered[bisect_left(ordered, window[0])]
+        window.append(value)
+        insort(ordered, value)
+        n = len(ordered)
+        half = n >> 1
+        if n & 1:
+            return ordered[half]
+        return (ordered[half - 1] + ordered[half]) / 2
+
+    def reset(self):
+        self.window.clear()
+        self.ordered.clear()
+
+
+class ExponentialMovingAverage:
+    """
+    指数滑动平均 y = y + alpha * (x - y)，以第一个数据为初值
+    """
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha=0.1):
+        """
+        :param alpha: 平滑系数(0, 1]，越小越平滑
+        """
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+    def reset(self):
+        self.value = None
+
+
+class SavitzkyGolay:
+    """
+    因果Savitzky-Golay滤波：对最近的窗口拟合多项式，取最新一点的拟合值
+    开头数据点数不超过多项式阶数时直接输出原值
+    """
+    __slots__ = ("window", "coeffs", "polyorder")
+
+    def __init__(self, window_size=11, polyorder=2):
+        """
+        :param window_size: 窗口大小
+        :param polyorder: 多项式阶数，须小于窗口大小
+        """
+        self.window = deque(maxlen=window_size)
+        self.polyorder = polyorder
+        # 每种窗口长度(预热阶段窗口未满)对应的系数，按从旧到新排列
+        self.coeffs = [None] * (window_size + 1)
+        for n in range(polyorder + 1, window_size + 1):
+            self.coeffs[n] = savgol_coeffs(n, polyorder, pos=n - 1, use='dot').tolist()
+
+    def update(self, value):
+        window = self.window
+        window.append(value)
+        coeffs = self.coeffs[len(window)]
+        if coeffs is None:
+            return value
+        return sum(map(mul, coeffs, window))
+
+    def reset(self):
+        self.window.clear()
+
+
+class ButterworthLowpass:
+    """
+    Butterworth低通滤波，二阶节级联(直接II型转置)逐点计算，
+    以第一个数据的稳态为初始状态，避免启动瞬态
+    """
+    __slots__ = ("sections", "zi", "state")
+
+    def __init__(self, order=2, cutoff=5.0, fs=100.0):
+        """
+        :param order: 阶数
+        :param cutoff: 截止频率(Hz)
+        :param fs: 采样率(Hz)
+        """
+        sos = butter(order, cutoff, fs=fs, output='sos')
+        self.sections = [tuple(section[[0, 1, 2, 4, 5]]) for section in sos]
+        self.zi = sosfilt_zi(sos).tolist()
+        self.state = None
+
+    def update(self, value):
+        if self.state is None:
+            self.state = [[z1 * value, z2 * value] for z1, z2 in self.zi]
+        x = value
+        for (b0, b1, b2, a1, a2), z in zip(self.sections, self.state):
+            y = b0 * x + z[0]
+            z[0] = b1 * x - a1 * y + z[1]
+            z[1] = b2 * x - a2 * y
+            x = y
+        return x
+
+    def reset(self):
+        self.state = None
+
+
+# 滤波器配置名称
+FILTER_TYPES = {
+    "mean": MovingAverage,
+    "median": MovingMedian,
+    "ema": ExponentialMovingAverage,
+    "savgol": SavitzkyGolay,
+    "butter": ButterworthLowpass,
+}
+
+
+def _number(text):
+    """
+    配置参数转为数字
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class FilterBank:
+    """
+    实时滤波器组：每个样本依次更新各滤波器，输出对应的附加列
+    """
+    __slots__ = ("columns", "filters")
+
+    def __init__(self, filters, prefix="Magnitude"):
+        """
+        :param filters: [(名称, 滤波器)]，滤波器需提供 update(value) 与 reset()
+        :param prefix: 输出列名前缀
+        """
+        self.columns = [f"{prefix}_{name}" for name, _ in filters]
+        self.filters = [f for _, f in filters]
+
+    @classmethod
+    def fromSpec(cls, spec, prefix="Magnitude"):
+        """
+        由配置字符串创建，如 "median:5,ema:0.1,savgol:11:2,butter:2:5:100"
+        各项为 类型:参数...，参数依次对应滤波器的构造参数
+        :param spec: 配置字符串，为空时返回没有滤波器的滤波器组
+        :param prefix: 输出列名前缀
+        :return: FilterBank
+        """
+        filters = []
+        for item in (spec or "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            kind, *params = item.split(":")
+            if kind not in FILTER_TYPES:
+                raise ValueError(f"未知的滤波器类型: {kind}，可选: {', '.join(FILTER_TYPES)}")
+            filters.append(("_".join([kind] + params), FILTER_TYPES[kind](*map(_number, params))))
+        return cls(filters, prefix)
+
+    def update(self, value):
+        """
+        加入一个新数据
+        :param value: 新数据
+        :return: 各滤波器的输出，与 columns 顺序一致
+        """
+        return tuple([f.update(value) for f in self.filters])
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
@@ -0,0 +1,119 @@
+# coding:UTF-8
+import numpy as np
+
+"""
+    列式样本缓存：每列一个预分配的NumPy数组，容量不足时按倍数扩容，
+    取列时返回已写入部分的视图，绘图与写入不复制数据
+"""
+
+
+class SampleBuffer:
+    """
+    列式样本缓存
+    """
+    __slots__ = ("names", "arrays", "size", "capacity", "pending")
+
+    # 逐个追加的样本先暂存，凑满后按列整块写入数组，避免逐元素写入NumPy数组的开销
+    PENDING_ROWS = 256
+
+    def __init__(self, columns, capacity=1024):
+        """
+        :param columns: [(列名, dtype)]，如 [("accX", np.float32), ("Chiptime", "S30")]
+        :param capacity: 初始容量(样本数)
+        """
+        self.names = [name for name, _ in columns]
+        self.arrays = [np.empty(capacity, dtype=dtype) for _, dtype in columns]
+        self.size = 0
+        self.capacity = capacity
+        self.pending = []
+
+    def __len__(self):
+        return self.size + len(self.pending)
+
+    def reserve(self, count):
+        """
+        确保还能再写入count个样本，不足时容量翻倍直到足够
+        :param count: 即将写入的样本数
+        :return: 无返回
+        """
+        needed = self.size + count
+        if needed <= self.capacity:
+            return
+        capacity = max(self.capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        for i, array in enumerate(self.arrays):
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.arrays[i] = grown
+        self.capacity = capacity
+
+    def append(self, row):
+        """
+        追加一个样本
+        :param row: 按列顺序排列的值，None 在浮点列中记为 nan
+        :return: 无返回
+        """
+        self.pending.append(row)
+        if len(self.pending) >= self.PENDING_ROWS:
+            self.flush()
+
+    def flush(self):
+        """
+        将暂存的样本写入数组
+        :return: 无返回
+        """
+        pending = self.pending
+        if not pending:
+            return
+        count = len(pending)
+        self.reserve(count)
+        start = self.size
+        for array, values in zip(self.arrays, zip(*pending)):
+            array[start:start + count] = values
+        self.size = start + count
+        pending.clear()
+
+    def extend(self, columns):
+        """
+        整块追加样本
+        :param columns: {列名: 等长序列}，须包含所有列
+        :return: 无返回
+        """
+        self.flush()
+        count = len(columns[self.names[0]])
+        self.reserve(count)
+        start = self.size
+        for name, array in zip(self.names, self.arrays):
+            array[start:start + count] = columns[name]
+        self.size = start + count
+
+    def column(self, name):
+        """
+        :param name: 列名
+        :return: 已写入部分的视图
+        """
+        self.flush()
+        return self.arrays[self.names.index(name)][:self.size]
+
+    def columns(self):
+        """
+        :return: {列名: 已写入部分的视图}
+        """
+        self.flush()
+        return {name: array[:self.size] for name, array in zip(self.names, self.arrays)}
+
+    def clear(self):
+        """
+        清空样本，保留已分配的容量
+        :return: 无返回
+        """
+        self.size = 0
+        self.pending.clear()
+
+    @property
+    def nbytes(self):
+        """
+        :return: 已分配的数组字节数
+        """
+        return sum(array.nbytes for array in self.arrays)
@@ -0,0 +1,276 @@
+# coding:UTF-8
+import json
+import os
+import selectors
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+"""
+    启动屏障：调度进程与各采集进程通过Unix域套接字(Windows下为本机回环TCP)交换JSON行消息
+    采集进程准备就绪后发送 ready，调度进程在全部就绪后下发同一个单调时钟启动时刻 start，
+    各采集进程等到该时刻同时开始记录并回报实际启动时刻 started，结束时回报结果 finished。
+    单调时钟为系统级时钟，不同进程的值可直接比较
+"""
+
+# 套接字地址通过环境变量传给采集进程，Unix域套接字为路径，回环TCP为 "tcp:主机:端口"
+BARRIER_ENV = "MAG_GA_BARRIER"
+TCP_PREFIX = "tcp:"
+LOOPBACK_HOST = "127.0.0.1"
+
+# 启动时刻相对全部就绪时刻的提前量，保证消息送达后仍有等待时间
+START_LEAD_NS = 50_000_000
+
+# 等待启动时刻时，最后一段改为忙等以减小唤醒误差
+SPIN_NS = 2_000_000
+
+
+def send_message(sock, message):
+    """
+    发送一条JSON行消息
+    :param sock: 套接字
+    :param message: 消息字典
+    :return: 无返回
+    """
+    sock.sendall((json.dumps(message, ensure_ascii=False) + "\n").encode())
+
+
+def connect(address):
+    """
+    连接启动屏障
+    :param address: 调度进程下发的套接字地址
+    :return: 已连接的套接字
+    """
+    if address.startswith(TCP_PREFIX):
+        host, port = address[len(TCP_PREFIX):].rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+
+def sleep_until_ns(target_ns):
+    """
+    等待到指定的单调时钟时刻
+    :param target_ns: 单调时钟值(纳秒)
+    :return: 实际到达时的单调时钟值
+    """
+    remaining = target_ns - time.monotonic_ns()
+    if remaining > SPIN_NS:
+        time.sleep((remaining - SPIN_NS) / 1e9)
+    now = time.monotonic_ns()
+    while now < target_ns:
+        now = time.monotonic_ns()
+    return now
+
+
+class StartBarrier:
+    """
+    调度进程端：监听套接字，收齐就绪消息后同时放行各采集进程，并收集启动时刻与结果
+    """
+
+    def __init__(self, parties, readyTimeout=30.0, log=print):
+        """
+        :param parties: 采集进程名称列表
+        :param readyTimeout: 等待就绪的最长时间(秒)，超时后放行已就绪的进程
+        :param log: 日志函数
+        """
+        self.parties = list(parties)
+        self.readyTimeout = readyTimeout
+        self.log = log
+        self.startNs = None
+        self.released = []
+        self.startedNs = {}
+        self.summaries = {}
+        self.finished = threading.Event()
+        self._dir = None
+        if hasattr(socket, "AF_UNIX"):
+            self._dir = tempfile.mkdtemp(prefix="mag_ga_")
+            self.address = os.path.join(self._dir, "barrier.sock")
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(self.address)
+        else:
+            # Windows 的 CPython 没有 AF_UNIX，监听本机回环地址上的随机端口
+            self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._server.bind((LOOPBACK_HOST, 0))
+            self.address = f"{TCP_PREFIX}{LOOPBACK_HOST}:{self._server.getsockname()[1]}"
+        self._server.listen(len(self.parties))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def env(self):
+        """
+        :return: 启动采集进程时使用的环境变量
+        """
+        env = dict(os.environ)
+        env[BARRIER_ENV] = self.address
+        return env
+
+    def start(self):
+        """
+        开始监听
+        :return: 无返回
+        """
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        等待全部进程回报结果或断开
+        :param timeout: 最长等待时间(秒)
+        :return: {进程名称: 结果}
+        """
+        self.finished.wait(timeout)
+        return self.summaries
+
+    def close(self):
+        """
+        关闭套接字并删除临时目录
+        :return: 无返回
+        """
+        try:
+            self._server.close()
+        finally:
+            if self._dir is not None:
+                shutil.rmtree(self._dir, ignore_errors=True)
+
+    def _run(self):
+        try:
+            connections = self._collectReady()
+            self._release(connections)
+            self._collectResults(connections)
+        except OSError as ex:
+            self.log(f"启动屏障异常: {ex}")
+        finally:
+            self.finished.set()
+
+    def _collectReady(self):
+        """
+        接受连接并读取就绪消息
+        :return: {进程名称: (套接字, 读取文件)}
+        """
+        connections = {}
+        deadline = time.monotonic() + self.readyTimeout
+        while len(connections) < len(self.parties):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                missing = [name for name in self.parties if name not in connections]
+                self.log(f"等待就绪超时，未就绪: {', '.join(missing)}")
+                break
+            self._server.settimeout(remaining)
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(None)
+            if conn.family != getattr(socket, "AF_UNIX", None):
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            reader = conn.makefile("r", encoding="utf-8")
+            line = reader.readline()
+            if not line:
+                conn.close()
+                continue
+            message = json.loads(line)
+            connections[message["name"]] = (conn, reader)
+            self.log(f"{message['name']} 已就绪")
+        return connections
+
+    def _release(self, connections):
+        """
+        下发同一个启动时刻
+        """
+        self.startNs = time.monotonic_ns() + START_LEAD_NS
+        self.released = list(connections)
+        for conn, _ in connections.values():
+            send_message(conn, {"type": "start", "start_ns": self.startNs})
+
+    def _collectResults(self, connections):
+        """
+        读取各进程的启动时刻与结果，直到全部断开
+        """
+        selector = selectors.DefaultSelector()
+        for name, (conn, reader) in connections.items():
+            selector.register(conn, selectors.EVENT_READ, (name, reader))
+        while selector.get_map():
+            for key, _ in selector.select():
+                name, reader = key.data
+                line = reader.readline()
+                if not line:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+                self._onMessage(name, json.loads(line))
+        selector.close()
+
+    def _onMessage(self, name, message):
+        if message["type"] == "started":
+            self.startedNs[name] = message["started_ns"]
+            if len(self.startedNs) == len(self.released):
+                self.logSkew()
+        elif message["type"] == "finished":
+            self.summaries[name] = message["summary"]
+
+    def logSkew(self):
+        """
+        记录各进程实际启动时刻相对下发时刻的偏差及进程间的启动偏差
+        :return: 启动偏差(纳秒)
+        """
+        lags = {name: ns - self.startNs for name, ns in self.startedNs.items()}
+        skew = max(self.startedNs.values()) - min(self.startedNs.values())
+        detail = ", ".join(f"{name} +{lag / 1e3:.1f}us" for name, lag in lags.items())
+        self.log(f"启动偏差: {skew / 1e3:.1f}us ({detail})")
+        return skew
+
+
+class BarrierClient:
+    """
+    采集进程端
+    """
+
+    def __init__(self, name, address):
+        """
+        :param name: 采集进程名称
+        :param address: 套接字地址，见 BARRIER_ENV
+        """
+        self.name = name
+        self.sock = connect(address)
+        self.reader = self.sock.makefile("r", encoding="utf-8")
+
+    @classmethod
+    def fromEnv(cls, name):
+        """
+        由调度进程启动时连接启动屏障
+        :param name: 采集进程名称
+        :return: BarrierClient，单独运行(未设置环境变量)时返回None
+        """
+        address = os.environ.get(BARRIER_ENV)
+        if not address:
+            return None
+        return cls(name, address)
+
+    def waitStart(self):
+        """
+        发送就绪消息并等待到统一的启动时刻
+        :return: 实际启动时的单调时钟值(纳秒)
+        """
+        send_message(self.sock, {"type": "ready", "name": self.name})
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("启动屏障已关闭")
+        startedNs = sleep_until_ns(json.loads(line)["start_ns"])
+        send_message(self.sock, {"type": "started", "started_ns": startedNs})
+        return startedNs
+
+    def finish(self, summary):
+        """
+        回报结果并断开
+        :param summary: 结果字典
+        :return: 无返回
+        """
+        try:
+            send_message(self.sock, {"type": "finished", "summary": summary})
+        finally:
+            self.reader.close()
+            self.sock.close()
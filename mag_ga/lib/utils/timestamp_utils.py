@@ -0,0 +1,175 @@
+# coding:UTF-8
+import time
+
+import numpy as np
+import pandas as pd
+
+"""
+    时间戳工具：基于int64纳秒数组的向量化时间戳处理
+"""
+
+# 小于该间隔(纳秒)的相邻时间戳视为同一时间戳
+SAME_TIMESTAMP_NS = 2_000_000
+NS_PER_MS = 1_000_000
+NS_PER_S = 1_000_000_000
+
+
+def collapse_close_timestamps(ts_ns, threshold_ns=SAME_TIMESTAMP_NS):
+    """
+    将与当前组起点相差小于阈值的时间戳归并为组起点
+    与逐行比较"当前值 - 上一个处理后的值 < 阈值"的结果完全一致
+    :param ts_ns: int64纳秒时间戳数组
+    :param threshold_ns: 归并阈值(纳秒)
+    :return: 归并后的int64纳秒时间戳数组
+    """
+    ts_ns = np.asarray(ts_ns, dtype=np.int64)
+    n = len(ts_ns)
+    out = ts_ns.copy()
+    if n < 2:
+        return out
+
+    # 组起点一定是之前出现过的某个时间戳，不会超过之前的累计最大值；
+    # 因此与累计最大值相差不小于阈值的点必然开启新组
+    prev_max = np.maximum.accumulate(ts_ns)[:-1]
+    hard_start = np.empty(n, dtype=bool)
+    hard_start[0] = True
+    hard_start[1:] = ts_ns[1:] - prev_max >= threshold_ns
+
+    starts = np.flatnonzero(hard_start)
+    seg_id = np.cumsum(hard_start) - 1
+    seg_anchor = ts_ns[starts][seg_id]
+    out[:] = seg_anchor
+
+    # 段内若存在与段起点相差不小于阈值的点(亚阈值间隔连成的长链)，
+    # 组起点会在段内更换，这类段较少，逐点处理
+    ambiguous = np.unique(seg_id[ts_ns - seg_anchor >= threshold_ns])
+    if len(ambiguous):
+        ends = np.append(starts[1:], n)
+        for seg in ambiguous:
+            anchor = ts_ns[starts[seg]]
+            for i in range(starts[seg] + 1, ends[seg]):
+                if ts_ns[i] - anchor >= threshold_ns:
+                    anchor = ts_ns[i]
+                out[i] = anchor
+    return out
+
+
+def spread_timestamp_runs(ts_ns):
+    """
+    在相邻的不同时间戳之间平均分配重复时间戳
+    每组第k个点的时间戳为 组起点 + int(组间隔毫秒 / 组长度 * k) 毫秒，最后一组保持不变
+    :param ts_ns: int64纳秒时间戳数组
+    :return: 分配后的int64纳秒时间戳数组
+    """
+    ts_ns = np.asarray(ts_ns, dtype=np.int64)
+    n = len(ts_ns)
+    out = ts_ns.copy()
+    if n < 2:
+        return out
+
+    run_start = np.empty(n, dtype=bool)
+    run_start[0] = True
+    run_start[1:] = ts_ns[1:] != ts_ns[:-1]
+    starts = np.flatnonzero(run_start)
+    if len(starts) < 2:
+        return out
+
+    # 最后一组之后没有不同的时间戳，不做分配
+    last_start = starts[-1]
+    lengths = np.diff(starts)
+    gap_ms = (np.diff(ts_ns[starts]) / 1e9) * 1000
+    interval_ms = gap_ms / lengths
+
+    steps = np.arange(last_start) - np.repeat(starts[:-1], lengths)
+    offset_ms = np.trunc(np.repeat(interval_ms, lengths) * steps).astype(np.int64)
+    out[:last_start] = ts_ns[:last_start] + offset_ms * NS_PER_MS
+    return out
+
+
+def dedup_timestamps_ns(ts_ns, threshold_ns=SAME_TIMESTAMP_NS):
+    """
+    时间戳去重：先归并小于阈值的间隔，再在不同时间戳之间平均分配
+    :param ts_ns: int64纳秒时间戳数组
+    :param threshold_ns: 归并阈值(纳秒)
+    :return: 处理后的int64纳秒时间戳数组
+    """
+    return spread_timestamp_runs(collapse_close_timestamps(ts_ns, threshold_ns))
+
+
+def local_offset_ns():
+    """
+    本地时区相对UTC的偏移
+    :return: 偏移(纳秒)
+    """
+    return time.localtime().tm_gmtoff * NS_PER_S
+
+
+def map_device_time_ns(device_s, host_ns, window_s=10.0):
+    """
+    将传感器硬件时间映射到主机单调时钟
+    主机接收时间 = 硬件时间 + 时钟偏差 + 传输延迟(>=0)；各窗口内延迟最小的样本最接近真实偏差，
+    对窗口最小值做线性拟合(含时钟漂移)，再整体下移使所有样本的延迟均不为负
+    :param device_s: 硬件时间(秒)，须单调不减
+    :param host_ns: 主机接收时间(单调时钟纳秒)
+    :param window_s: 估计最小延迟的窗口长度(秒)
+    :return: 映射后的int64纳秒数组
+    """
+    device_ns = np.round(np.asarray(device_s, dtype=np.float64) * NS_PER_S).astype(np.int64)
+    host_ns = np.asarray(host_ns, dtype=np.int64)
+    lag = host_ns - device_ns
+    elapsed = device_ns - device_ns[0]
+
+    window = elapsed // max(1, int(window_s * NS_PER_S))
+    starts = np.flatnonzero(np.diff(window, prepend=-1))
+    if len(starts) >= 3:
+        lag_min = np.minimum.reduceat(lag, starts)
+        centers = np.add.reduceat(elapsed, starts) / np.diff(np.append(starts, len(elapsed)))
+        drift, offset = np.polyfit(centers, (lag_min - lag_min[0]).astype(np.float64), 1)
+        fitted = np.round(offset + drift * elapsed).astype(np.int64) + lag_min[0]
+    else:
+        fitted = np.zeros(len(lag), dtype=np.int64)
+    fitted -= (fitted - lag).max()
+    return device_ns + fitted
+
+
+def anchor_delta_ns(ts_ns, mono_ns):
+    """
+    由截断到毫秒的时间戳列与单调时钟列还原会话锚点(时间戳 - 单调时钟)，误差小于1毫秒
+    :param ts_ns: 时间戳(int64纳秒，截断到毫秒)
+    :param mono_ns: 同一行的单调时钟值
+    :return: 锚点差值(纳秒)
+    """
+    return int((np.asarray(ts_ns, dtype=np.int64) - np.asarray(mono_ns, dtype=np.int64)).max())
+
+
+def to_ns(timestamps):
+    """
+    将时间戳字符串/日期序列转换为int64纳秒数组
+    :param timestamps: 时间戳序列
+    :return: int64纳秒数组
+    """
+    values = np.asarray(pd.to_datetime(timestamps), dtype='datetime64[ns]')
+    return values.view(np.int64)
+
+
+def format_timestamp_ms(ts_ns):
+    """
+    格式化单个int纳秒时间戳，逐条写入时使用
+    :param ts_ns: int纳秒时间戳
+    :return: "%Y-%m-%d %H:%M:%S.毫秒" 字符串
+    """
+    seconds, ns = divmod(ts_ns, NS_PER_S)
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(seconds)) + ".%03d" % (ns // NS_PER_MS)
+
+
+def format_timestamps_ms(ts_ns):
+    """
+    将int64纳秒时间戳格式化为"%Y-%m-%d %H:%M:%S.毫秒"字符串(截断到毫秒)
+    :param ts_ns: int64纳秒时间戳数组
+    :return: 字符串数组
+    """
+    ms = (np.asarray(ts_ns, dtype=np.int64) // NS_PER_MS).view('datetime64[ms]')
+    if ms.size == 0:
+        return np.array([], dtype='<U23')
+    return np.char.replace(np.datetime_as_string(ms, unit='ms'), 'T', ' ')
+
@@ -3,63 +3,69 @@ import time
 from datetime import datetime
 import matplotlib.pyplot as plt
 import threading
-import csv
 import argparse
 import os
 import numpy as np
 import pandas as pd
+from lib.utils.csv_stream_writer import ChunkedCsvWriter
+from lib.utils.binary_capture import CAPTURE_SUFFIX, ChunkedBinaryWriter, load_capture
+from lib.utils.filters import FilterBank, MovingAverage
+from lib.utils.acquisition_clock import AcquisitionClock
+from lib.utils.start_barrier import BarrierClient
+from lib.utils.timestamp_utils import (dedup_timestamps_ns, to_ns, format_timestamps_ms,
+                                      map_device_time_ns, anchor_delta_ns)
 
 # 文件路径配置
 UNPROCESSED_DATA_DIR = "mag_data/unprocessed"
 PROCESSED_DATA_DIR = "mag_data/processed"
 
-# 保存数据到CSV（只保留模值和滤波后的模值六位小数）
-def save_to_csv(file_path, t_values, x_values, y_values, z_values, magnitudes, filtered_magnitudes, timestamps, duration):
-    """保存数据到CSV文件并进行处理"""
-    # 创建DataFrame
-    df = pd.DataFrame({
-        'Time': [round(t, 6) for t in t_values],
-        'X': [round(x, 6) for x in x_values],
-        'Y': [round(y, 6) for y in y_values],
-        'Z': [round(z, 6) for z in z_values],
-        'Magnitude': [round(m, 6) for m in magnitudes],
-        'Filtered Magnitude': [round(fm, 6) for fm in filtered_magnitudes],
-        'Timestamp': timestamps
-    })
-    
-    # 保存原始数据
-    os.makedirs(UNPROCESSED_DATA_DIR, exist_ok=True)
+# 原始数据列，Timestamp 为接收时刻的本地时间，Monotonic_ns 为接收时刻的单调时钟值
+MAG_CSV_HEADER = ['Time', 'X', 'Y', 'Z', 'Magnitude', 'Filtered Magnitude', 'Timestamp', 'Monotonic_ns']
+
+# 实时滤波器组的默认配置，为空时不附加滤波列，可由 --filters 按会话配置
+# 例如 "median:5,ema:0.1,savgol:11:2,butter:2:5:100"，见 lib.utils.filters.FilterBank.fromSpec
+MAG_FILTERS = ""
+
+# 原始数据文件格式："csv" 为文本，"binary" 为定长记录的二进制采集文件(见 lib.utils.binary_capture)，
+# 二进制文件可由 export_capture.py 按需导出为相同格式的CSV
+CAPTURE_FORMAT = "csv"
+
+# 原始数据分块落盘参数
+CSV_FLUSH_ROWS = 100          # 每100个样本落盘一次
+CSV_FLUSH_INTERVAL_MS = 500   # 最长500毫秒落盘一次
+CSV_QUEUE_SIZE = 10000        # 写入队列容量
+
+# 串口读取超时：无数据时读取线程最多阻塞该时长后检查停止标志
+SERIAL_READ_TIMEOUT_S = 0.1
+
+# 处理原始数据并保存（只保留模值和滤波后的模值六位小数）
+def save_processed_csv(df, file_path, duration):
+    """对已落盘的原始数据进行处理并保存到处理后目录"""
     base_name = os.path.basename(file_path)
-    unprocessed_file = os.path.join(UNPROCESSED_DATA_DIR, base_name)
-    df.to_csv(unprocessed_file, index=False, float_format='%.6f')
-    print(f"原始数据已保存到: {unprocessed_file}")
     
     # 处理数据
     df_processed, _ = process_mag_data(df.copy())  # 使用df的副本进行处理
     
-    # 再次确保所有数值都是6位小数
-    for col in ['Time', 'X', 'Y', 'Z', 'Magnitude', 'Filtered Magnitude']:
-        df_processed[col] = df_processed[col].round(6)
-    
     # 删除原始时间戳列，然后将处理后的时间戳列重命名
-    if 'Processed_Timestamp' in df_processed.columns:
-        if 'Timestamp' in df_processed.columns:
-            df_processed = df_processed.drop('Timestamp', axis=1)
-        df_processed = df_processed.rename(columns={'Processed_Timestamp': 'Timestamp'})
+    for col in ['Timestamp', 'Monotonic_ns']:
+        if 'Processed_' + col in df_processed.columns:
+            if col in df_processed.columns:
+                df_processed = df_processed.drop(col, axis=1)
+            df_processed = df_processed.rename(columns={'Processed_' + col: col})
     
     # 添加新列Base_Time，第一行保持原始时间戳，之后的行从第一个时间戳开始累加Time值
-    base_timestamp = pd.to_datetime(df_processed['Timestamp'].iloc[0])
-    first_time = df_processed['Time'].iloc[0]
-    
-    def calculate_base_time(row, index):
-        if index == 0:
-            return base_timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        return (base_timestamp + pd.Timedelta(seconds=float(row['Time'] - first_time))).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-    
-    df_processed['Base_Time'] = [calculate_base_time(row, i) for i, row in df_processed.iterrows()]
+    # 整列计算后一次格式化，截断到毫秒；数值列的6位小数由 to_csv 的 float_format 统一处理
+    # 累加的时间差与原逐行 pd.Timedelta(seconds=...) 相同，向零截断到纳秒(不舍入)
+    base_ns = to_ns(df_processed['Timestamp'].iloc[:1])[0]
+    elapsed = (df_processed['Time'] - df_processed['Time'].iloc[0]).to_numpy(dtype=np.float64)
+    df_processed['Base_Time'] = format_timestamps_ms(base_ns + (elapsed * 1e9).astype(np.int64))
     
     # 确保列的顺序正确
     columns = ['Base_Time', 'Time', 'X', 'Y', 'Z', 'Magnitude', 'Filtered Magnitude', 'Timestamp']
+    if 'Monotonic_ns' in df_processed.columns:
+        columns.append('Monotonic_ns')
+    # 采集时滤波器组附加的列保持在最后
+    columns += [col for col in df.columns if col not in MAG_CSV_HEADER]
     df_processed = df_processed[columns]
     
     # 过滤掉Time大于Duration的数据
@@ -67,139 +73,40 @@ def save_to_csv(file_path, t_values, x_values, y_values, z_values, magnitudes, f
     
     # 保存处理后的数据
     os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
-    processed_file = os.path.join(PROCESSED_DATA_DIR, base_name.replace(".csv", "_processed.csv"))
+    processed_file = os.path.join(PROCESSED_DATA_DIR, os.path.splitext(base_name)[0] + "_processed.csv")
     df_processed.to_csv(processed_file, index=False, float_format='%.6f')
     print(f"处理后的数据已保存到: {processed_file}")
 
 # 解析接收到的数据
-def parse_received_data(received_data):
+def parse_received_data(received_data, recv_ns=None):
+    """
+    解析 RD 数据行
+    :param received_data: 串口收到的文本
+    :param recv_ns: 收到该数据时的单调时钟值(整数纳秒)，默认取当前时间
+    :return: x, y, z, t 列表与整数纳秒时间戳列表，时间戳在写入时再批量格式化
+    """
+    if recv_ns is None:
+        recv_ns = AcquisitionClock.now()
     x_values = []
     y_values = []
     z_values = []
     t_values = []
-    timestamps = []
-    
-    lines = received_data.splitlines()
-    
-    # 用于时间戳处理的变量
-    last_different_timestamp = None  # 上一个不同的时间戳
-    same_timestamp_count = 0  # 相同时间戳的计数
-    temp_data_points = []  # 临时存储具有相同时间戳的数据点
-    
-    for line in lines:
-        line = line.strip()
+
+    for line in received_data.splitlines():
         parts = line.split()
-        
-        for i, part in enumerate(parts):
-            if part.startswith("RD"):
-                if i + 1 < len(parts):
-                    xyz_parts = parts[i + 1].split(",")
-                    if len(xyz_parts) == 4:
-                        t = float(xyz_parts[0].strip())
-                        x = float(xyz_parts[1].strip())
-                        y = float(xyz_parts[2].strip())
-                        z = float(xyz_parts[3].strip())
-                        
-                        # 获取当前时间戳
-                        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                        
-                        # 如果是第一个数据点
-                        if not timestamps:
-                            last_different_timestamp = current_time
-                            timestamps.append(current_time)
-                            t_values.append(t)
-                            x_values.append(x)
-                            y_values.append(y)
-                            z_values.append(z)
-                            continue
-                        
-                        # 检查与上一个时间戳的时间差
-                        prev_timestamp = pd.to_datetime(timestamps[-1])
-                        curr_timestamp = pd.to_datetime(current_time)
-                        time_diff = (curr_timestamp - prev_timestamp).total_seconds() * 1000
-                        
-                        # 如果时间差小于2ms，认为是相同时间戳
-                        if time_diff < 2:
-                            same_timestamp_count += 1
-                            temp_data_points.append({
-                                't': t,
-                                'x': x,
-                                'y': y,
-                                'z': z,
-                                'timestamp': current_time
-                            })
-                        else:
-                            # 如果之前有累积的相同时间戳数据点
-                            if temp_data_points:
-                                # 添加当前点到临时列表
-                                temp_data_points.append({
-                                    't': t,
-                                    'x': x,
-                                    'y': y,
-                                    'z': z,
-                                    'timestamp': current_time
-                                })
-                                
-                                # 计算时间间隔
-                                first_timestamp = pd.to_datetime(last_different_timestamp)
-                                last_timestamp = pd.to_datetime(current_time)
-                                total_interval = (last_timestamp - first_timestamp).total_seconds() * 1000
-                                interval = total_interval / (len(temp_data_points))
-                                
-                                # 为临时列表中的每个点分配新的时间戳
-                                for idx, point in enumerate(temp_data_points):
-                                    new_timestamp = first_timestamp + pd.Timedelta(milliseconds=int(interval * (idx + 1)))
-                                    timestamps.append(new_timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
-                                    t_values.append(point['t'])
-                                    x_values.append(point['x'])
-                                    y_values.append(point['y'])
-                                    z_values.append(point['z'])
-                                
-                                # 清空临时列表和计数器
-                                temp_data_points = []
-                                same_timestamp_count = 0
-                                last_different_timestamp = current_time
-                            else:
-                                # 正常添加数据点
-                                timestamps.append(current_time)
-                                t_values.append(t)
-                                x_values.append(x)
-                                y_values.append(y)
-                                z_values.append(z)
-                                last_different_timestamp = current_time
-    
-    # 处理最后剩余的临时数据点
-    if temp_data_points:
-        first_timestamp = pd.to_datetime(last_different_timestamp)
-        last_timestamp = pd.to_datetime(temp_data_points[-1]['timestamp'])
-        total_interval = (last_timestamp - first_timestamp).total_seconds() * 1000
-        interval = total_interval / (len(temp_data_points))
-        
-        for idx, point in enumerate(temp_data_points):
-            new_timestamp = first_timestamp + pd.Timedelta(milliseconds=int(interval * (idx + 1)))
-            timestamps.append(new_timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
-            t_values.append(point['t'])
-            x_values.append(point['x'])
-            y_values.append(point['y'])
-            z_values.append(point['z'])
-    
-    return x_values, y_values, z_values, t_values, timestamps
+        for i in range(len(parts) - 1):
+            if parts[i].startswith("RD"):
+                xyz_parts = parts[i + 1].split(",")
+                if len(xyz_parts) == 4:
+                    t, x, y, z = map(float, xyz_parts)
+                    t_values.append(t)
+                    x_values.append(x)
+                    y_values.append(y)
+                    z_values.append(z)
 
-# 计算模值 (Magnitude)
-def calculate_magnitude(x_values, y_values, z_values):
-    magnitudes = np.sqrt(np.array(x_values)**2 + np.array(y_values)**2 + np.array(z_values)**2)
-    return magnitudes
-
-# 均值滤波，每10个数据点做一次均值
-def moving_average_filter(data, window_size=10):
-    filtered_data = []
-    for i in range(len(data)):
-        # 获取当前窗口的起始和结束索引
-        start_index = max(0, i - window_size + 1)
-        window = data[start_index:i+1]
-        # 计算当前窗口的均值
-        filtered_data.append(np.mean(window))
-    return filtered_data
+    # 同一次读取的数据点共用接收时间，处理后的时间戳由 process_mag_data 按硬件时间映射
+    timestamps = [recv_ns] * len(t_values)
+    return x_values, y_values, z_values, t_values, timestamps
 
 # 可视化数据
 def visualize_data(x_values, y_values, z_values, t_values, magnitudes, filtered_magnitudes):
@@ -253,108 +160,151 @@ def process_mag_data(df):
     if len(df) < 2:
         return df, 0
 
-    # 创建新的时间戳列，复制原始时间戳
-    df['Processed_Timestamp'] = pd.to_datetime(df['Timestamp'])
-    
+    time_values = df['Time'].to_numpy(dtype=np.float64)
+    if 'Monotonic_ns' in df.columns and (np.diff(time_values) >= 0).all():
+        # 以传感器硬件时间 Time 为准，按最小传输延迟映射到主机单调时钟，无需再分配重复时间戳
+        mono = df['Monotonic_ns'].to_numpy(dtype=np.int64)
+        processed = map_device_time_ns(time_values, mono)
+        df['Processed_Monotonic_ns'] = processed
+        df['Processed_Timestamp'] = format_timestamps_ms(processed + anchor_delta_ns(to_ns(df['Timestamp']), mono))
+        return df, 0
+
+    # 旧数据没有单调时钟列，在int64纳秒数组上完成时间戳处理：
     # 第一步：处理小于2ms的时间差，使用上一个时间戳
-    i = 1
-    while i < len(df):
-        time_diff = (df.iloc[i]['Processed_Timestamp'] - df.iloc[i-1]['Processed_Timestamp']).total_seconds() * 1000
-        if time_diff < 2:
-            df.at[i, 'Processed_Timestamp'] = df.iloc[i-1]['Processed_Timestamp']
-        i += 1
-    
     # 第二步：在不同时间戳之间平均分配时间差
-    i = 0
-    while i < len(df):
-        # 找到当前时间戳组的起始位置
-        start_idx = i
-        current_timestamp = df.iloc[i]['Processed_Timestamp']
-        
-        # 找到下一个不同的时间戳
-        next_diff_idx = i + 1
-        while next_diff_idx < len(df) and df.iloc[next_diff_idx]['Processed_Timestamp'] == current_timestamp:
-            next_diff_idx += 1
-            
-        # 如果找到了下一个不同的时间戳
-        if next_diff_idx < len(df):
-            next_timestamp = df.iloc[next_diff_idx]['Processed_Timestamp']
-            # 计算时间差（毫秒）
-            time_diff = (next_timestamp - current_timestamp).total_seconds() * 1000
-            # 需要分配的间隔数
-            intervals = next_diff_idx - start_idx
-            # 计算每个间隔的时间差
-            interval_diff = time_diff / intervals if intervals > 0 else 0
-            
-            # 更新中间的时间戳
-            for j in range(start_idx + 1, next_diff_idx):
-                steps = j - start_idx
-                new_timestamp = current_timestamp + pd.Timedelta(milliseconds=int(interval_diff * steps))
-                df.at[j, 'Processed_Timestamp'] = new_timestamp
-            
-            i = next_diff_idx
-        else:
-            # 已经处理到最后一组时间戳
-            break
-    
+    processed = dedup_timestamps_ns(to_ns(df['Timestamp']))
+
     # 将处理后的时间戳转换回字符串格式
-    df['Processed_Timestamp'] = df['Processed_Timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+    df['Processed_Timestamp'] = format_timestamps_ms(processed)
     
     return df, 0
 
+# 处理一次串口读取到的数据
+def handle_serial_data(pending, data, recv_ns, window, writer, bank=None):
+    """
+    将新数据接在未完成的行之后，解析其中所有完整的行并写入
+    :param pending: 上次剩下的未以换行结束的数据
+    :param data: 本次读取的数据
+    :param recv_ns: 本次数据到达时的单调时钟值
+    :param window: 模值的增量均值滤波器(MovingAverage)
+    :param writer: 原始数据写入器
+    :param bank: 实时滤波器组，输出附加在每行之后
+    :return: 本次剩下的未以换行结束的数据
+    """
+    pending += data
+    end = pending.rfind(b'\n')
+    if end < 0:
+        return pending
+    x_new, y_new, z_new, t_new, ts_new = parse_received_data(pending[:end].decode(errors='ignore'), recv_ns)
+    for x, y, z, t, ts in zip(x_new, y_new, z_new, t_new, ts_new):
+        magnitude = float(np.sqrt(x**2 + y**2 + z**2))
+        row = (t, x, y, z, magnitude, window.update(magnitude), ts, ts)
+        writer.write(row + bank.update(magnitude) if bank is not None else row)
+    return pending[end + 1:]
+
 # 从串口读取数据
-def read_from_serial(ser, stop_event, data_lists, duration):
-    x_values, y_values, z_values, t_values, timestamps = data_lists
+def read_from_serial(ser, stop_event, writer, duration, clock=AcquisitionClock, bank=None):
     start_time = time.time()
+    # 模值的实时均值滤波，窗口为10个点
+    window = MovingAverage(10)
+    pending = b''   # 尚未以换行结束的数据
 
     while not stop_event.is_set():
         try:
             if not ser.is_open:
                 break
-            if ser.in_waiting > 0:
-                line = ser.readline().decode(errors='ignore').strip()
-                if line and not stop_event.is_set():
-                    x_new, y_new, z_new, t_new, ts_new = parse_received_data(line)
-                    if x_new and y_new and z_new and t_new and ts_new:
-                        x_values.extend(x_new)
-                        y_values.extend(y_new)
-                        z_values.extend(z_new)
-                        t_values.extend(t_new)
-                        timestamps.extend(ts_new)
+            # 阻塞等待数据到达(最长为串口超时时间)，再一次读出已到达的全部数据
+            data = ser.read(1)
+            if data:
+                recv_ns = clock.now()
+                waiting = ser.in_waiting
+                if waiting > 0:
+                    data += ser.read(waiting)
+                if not stop_event.is_set():
+                    pending = handle_serial_data(pending, data, recv_ns, window, writer, bank)
             # 修改时间判断逻辑，确保至少采集满指定时长
             if duration != 0 and time.time() - start_time >= duration + 0.15:  # 增加0.5秒的缓冲时间
                 stop_event.set()
         except:
             break
 
-def send_and_read_from_serial(port, baudrate, send_data1, send_data2, duration, output_csv_file):
+# 创建原始数据写入器
+def create_mag_writer(output_csv_file, clock, bank=None, capture=CAPTURE_FORMAT):
+    """
+    :param output_csv_file: 输出文件名，写入原始数据目录
+    :param clock: 本次会话的采集时钟，Timestamp 列在写入时由单调时钟值换算
+    :param bank: 实时滤波器组，其输出列附加在标题行最后
+    :param capture: 原始数据文件格式，"csv" 或 "binary"
+    :return: 原始数据文件路径与未启动的写入器
+    """
+    unprocessed_file = os.path.join(UNPROCESSED_DATA_DIR, os.path.basename(output_csv_file))
+    header = MAG_CSV_HEADER + (bank.columns if bank is not None else [])
+    if capture == "binary":
+        # Timestamp 列不落盘，读取时由文件头中的时钟锚点从 Monotonic_ns 换算
+        unprocessed_file = os.path.splitext(unprocessed_file)[0] + CAPTURE_SUFFIX
+        writer = ChunkedBinaryWriter(unprocessed_file, header,
+                                     dtypes={'Monotonic_ns': np.int64},
+                                     timestamp_columns={'Timestamp': 'Monotonic_ns'},
+                                     clock=clock, sensor="mag",
+                                     flush_rows=CSV_FLUSH_ROWS,
+                                     flush_interval_ms=CSV_FLUSH_INTERVAL_MS,
+                                     queue_size=CSV_QUEUE_SIZE)
+        return unprocessed_file, writer
+    writer = ChunkedCsvWriter(unprocessed_file, header,
+                              flush_rows=CSV_FLUSH_ROWS,
+                              flush_interval_ms=CSV_FLUSH_INTERVAL_MS,
+                              queue_size=CSV_QUEUE_SIZE,
+                              column_formatters={MAG_CSV_HEADER.index('Timestamp'):
+                                                 lambda mono: format_timestamps_ms(clock.to_local_ns(mono))})
+    return unprocessed_file, writer
+
+# 读取落盘的原始数据并生成处理后的文件
+def load_and_process(unprocessed_file, duration):
+    """
+    :return: 原始数据DataFrame，未采集到数据时返回None
+    """
+    df = load_capture(unprocessed_file)
+    if df.empty:
+        print("未采集到数据")
+        return None
+    save_processed_csv(df, unprocessed_file, duration)
+    return df
+
+def send_and_read_from_serial(port, baudrate, send_data1, send_data2, duration, output_csv_file, filters=MAG_FILTERS,
+                              capture=CAPTURE_FORMAT):
     ser = None
+    writer = None
+    barrier = None
     try:
-        ser = serial.Serial(port, baudrate, timeout=1)
+        ser = serial.Serial(port, baudrate, timeout=SERIAL_READ_TIMEOUT_S)
         time.sleep(1.8)
         ser.write(send_data1.encode('ascii'))
         time.sleep(0.5)
 
-        x_values = []
-        y_values = []
-        z_values = []
-        t_values = []
-        timestamps = []
         stop_event = threading.Event()
 
+        # 本次会话的采集时钟，接收时刻记录单调时钟值，写入时由锚点换算为本地时间
+        clock = AcquisitionClock()
+
+        # 原始数据由写入线程分块写入文件，采集过程中不在内存中累积
+        bank = FilterBank.fromSpec(filters) if filters else None
+        unprocessed_file, writer = create_mag_writer(output_csv_file, clock, bank, capture)
+        writer.start()
+
         time.sleep(0.1)
+
+        # 由调度进程启动时，等待与INS在同一时刻开始记录
+        barrier = BarrierClient.fromEnv("mag")
+        if barrier is not None:
+            barrier.waitStart()
         ser.write(send_data2.encode('ascii'))
-        
-        # 创建标记文件表示MAG已经准备就绪
-        with open("/dev/shm/mag_ready", "w") as f:
-            f.write("ready")
-            
+
         now_start = datetime.now()
         current_time_start = now_start.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         print("mag_aq started:", current_time_start)
 
         # 启动读取数据的线程
-        read_thread = threading.Thread(target=read_from_serial, args=(ser, stop_event, [x_values, y_values, z_values, t_values, timestamps], duration))
+        read_thread = threading.Thread(target=read_from_serial, args=(ser, stop_event, writer, duration, clock, bank))
         read_thread.start()
 
         # 在主线程中监听用户输入
@@ -370,6 +320,7 @@ def send_and_read_from_serial(port, baudrate, send_data1, send_data2, duration,
 
         # 等待读取线程结束
         read_thread.join()
+        writer.close()
         print("数据采集已停止。")
 
         now_finish = datetime.now()
@@ -377,14 +328,23 @@ def send_and_read_from_serial(port, baudrate, send_data1, send_data2, duration,
         print("mag_aq finished:", current_time_finish)
         print("结束记录数据")
 
-        # 计算模值和均值滤波
-        magnitudes = calculate_magnitude(x_values, y_values, z_values)
-        filtered_magnitudes = moving_average_filter(magnitudes, window_size=10)
-        
-        # 保存数据到 CSV 文件
-        save_to_csv(output_csv_file, t_values, x_values, y_values, z_values, magnitudes, filtered_magnitudes, timestamps, duration)
-        visualize_data(x_values, y_values, z_values, t_values, magnitudes, filtered_magnitudes)
+        print(f"原始数据已保存到: {unprocessed_file}")
+
+        # 采集结束即回报结果，调度进程不必等待后续的数据处理
+        if barrier is not None:
+            elapsed_time = (now_finish - now_start).total_seconds()
+            barrier.finish({"message": f"磁力计数据已保存到: {unprocessed_file}", "elapsed_s": elapsed_time,
+                            "records": writer.rows_written})
+            barrier = None
+
+        # 从落盘的原始数据生成处理后的文件
+        df = load_and_process(unprocessed_file, duration)
+        if df is None:
+            return
+        visualize_data(df['X'], df['Y'], df['Z'], df['Time'], df['Magnitude'], df['Filtered Magnitude'])
     finally:
+        if writer is not None:
+            writer.close()
         if ser is not None and ser.is_open:
             try:
                 ser.close()
@@ -393,7 +353,7 @@ def send_and_read_from_serial(port, baudrate, send_data1, send_data2, duration,
                 pass
 
 # 主函数
-def main(duration):
+def main(duration, filters=MAG_FILTERS, capture=CAPTURE_FORMAT):
     # 根据操作系统选择端口
     if os.name == 'nt':  # Windows 系统
         port = "COM6"  # 根据实际情况修改
@@ -413,10 +373,14 @@ def main(duration):
     output_csv_file = os.path.join(UNPROCESSED_DATA_DIR, f"mag_data_{current_time}.csv")
     
     # 启动数据采集
-    send_and_read_from_serial(port, baudrate, send_data_db, send_data_rc, duration, output_csv_file)
+    send_and_read_from_serial(port, baudrate, send_data_db, send_data_rc, duration, output_csv_file, filters, capture)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run program for a specified duration.")
     parser.add_argument("duration", type=int, help="Duration to run the program in seconds")
+    parser.add_argument("--filters", default=MAG_FILTERS,
+                        help='实时滤波器组配置，如 "median:5,ema:0.1,savgol:11:2,butter:2:5:100"')
+    parser.add_argument("--capture", choices=["csv", "binary"], default=CAPTURE_FORMAT,
+                        help="原始数据文件格式")
     args = parser.parse_args()
-    main(args.duration)
+    main(args.duration, args.filters, args.capture)
@@ -9,105 +9,34 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from datetime import datetime
 import threading
-import subprocess
 import manual_control
+from acquisition_engine import EngineRunner
 
 class DataCollectionThread(QThread):
     progress_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(bool)
     
-    def __init__(self, duration, save_path):
+    def __init__(self, duration, save_path, runner):
         super().__init__()
         self.duration = duration
         self.save_path = save_path
-        self.is_running = True
-        self.mag_process = None
-        self.ins_process = None
+        self.runner = runner        # INS与磁力计在同一进程的事件循环中采集
+        self.stop_event = threading.Event()
+        self.final_msg = None
         
     def run(self):
         try:
-            # 获取当前脚本目录
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # 为INS数据创建时间戳文件名
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            ins_filename = f"ins_data_{timestamp}.csv"
-            
-            # 构建命令参数
-            mag_cmd = ["python3", os.path.join(script_dir, "mag_aq.py"), 
-                      str(self.duration)]
-            
-            # INS使用默认串口
-            ins_cmd = ["python3", os.path.join(script_dir, "ins_aq.py"),
-                      str(self.duration)]
-            
-            # 使用subprocess运行两个脚本，并捕获输出
             self.progress_signal.emit("正在启动数据采集...")
-            
-            self.mag_process = subprocess.Popen(mag_cmd, 
-                                            stdout=subprocess.PIPE,
-                                            stderr=subprocess.PIPE,
-                                            text=True)
-            
-            self.ins_process = subprocess.Popen(ins_cmd,
-                                            stdout=subprocess.PIPE,
-                                            stderr=subprocess.PIPE,
-                                            text=True)
-            
-            self.progress_signal.emit("数据采集已启动")
-            
-            # 等待完成或手动停止
-            while self.is_running:
-                # 检查进程状态
-                mag_status = self.mag_process.poll()
-                ins_status = self.ins_process.poll()
-                
-                # 如果有错误输出，发送到进度信号
-                self.check_process_output(self.mag_process, "mag")
-                self.check_process_output(self.ins_process, "INS")
-                
-                # 如果两个进程都结束了
-                if mag_status is not None and ins_status is not None:
-                    if mag_status == 0 and ins_status == 0:
-                        self.progress_signal.emit("数据采集完成")
-                        self.finished_signal.emit(True)
-                    else:
-                        self.progress_signal.emit("数据采集异常结束")
-                        self.finished_signal.emit(False)
-                    break
-                
-                self.msleep(100)  # 每100ms检查一次状态
-            
-            # 如果是手动停止，给进程发送终止信号
-            if self.is_running:
-                self.stop()
-            
+            # 定时采集到时或手动停止后返回，数据处理在此线程中完成
+            self.final_msg = self.runner.run(self.duration, self.stop_event)
+            self.progress_signal.emit("数据采集完成")
+            self.finished_signal.emit(True)
         except Exception as e:
             self.progress_signal.emit(f"错误: {str(e)}")
             self.finished_signal.emit(False)
     
     def stop(self):
-        self.is_running = False
-        # 终止进程
-        if self.mag_process and self.mag_process.poll() is None:
-            self.mag_process.terminate()
-            self.mag_process.wait()
-        if self.ins_process and self.ins_process.poll() is None:
-            self.ins_process.terminate()
-            self.ins_process.wait()
-    
-    def check_process_output(self, process, name):
-        if process and process.poll() is None:
-            # 检查错误输出
-            if process.stderr:
-                err = process.stderr.readline()
-                if err:
-                    self.progress_signal.emit(f"{name}错误: {err.strip()}")
-            # 检查标准输出
-            if process.stdout:
-                out = process.stdout.readline()
-                if out:
-                    self.progress_signal.emit(f"{name}: {out.strip()}")
+        self.stop_event.set()
     
 class PlotUpdateThread(QThread):
     update_signal = pyqtSignal(pd.DataFrame)
@@ -342,6 +271,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.data_viewer)
         
         # 初始化
+        self.runner = EngineRunner()
         self.collection_thread = None
         self.manual_control = manual_control.ManualControl(self.collection_thread)
         
@@ -356,40 +286,39 @@ class MainWindow(QMainWindow):
             if duration < 0:
                 raise ValueError("采集时间必须大于或等于0")
             elif duration == 0:
-                self.collection_thread.stop()  # 手动结束采样
-                self.progress_signal.emit("手动结束采样")
-                if self.collection_thread.mag_process:
-                    self.collection_thread.mag_process.stdin.write(b'\n')
-                    self.collection_thread.mag_process.stdin.flush()
-                if self.collection_thread.ins_process:
-                    self.collection_thread.ins_process.stdin.write(b'\n')
-                    self.collection_thread.ins_process.stdin.flush()
+                self.manual_control.stop_collection()  # 手动结束采样，完成后由 collection_finished 更新界面
                 self.start_button.setEnabled(True)  # 重新启用开始按钮
                 self.stop_button.setEnabled(False)  # 禁用停止按钮
                 return
                 
-            save_path = self.save_path_edit.text()
-            
-            # 创建保存目录
-            os.makedirs(save_path, exist_ok=True)
-            
-            self.collection_thread = DataCollectionThread(duration, save_path)
-            self.collection_thread.progress_signal.connect(self.update_progress)
-            self.collection_thread.finished_signal.connect(self.collection_finished)
-            self.collection_thread.start()
-            
-            self.start_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
-            self.progress_bar.setRange(0, 0)  # 显示忙碌状态
+            self.start_collection_thread(duration)
             
         except ValueError as e:
             QMessageBox.warning(self, "错误", str(e))
+
+    def start_collection_thread(self, duration):
+        if self.collection_thread is not None and self.collection_thread.isRunning():
+            return
+        save_path = self.save_path_edit.text()
+        
+        # 创建保存目录
+        os.makedirs(save_path, exist_ok=True)
+        
+        self.collection_thread = DataCollectionThread(duration, save_path, self.runner)
+        self.collection_thread.progress_signal.connect(self.update_progress)
+        self.collection_thread.finished_signal.connect(self.collection_finished)
+        self.manual_control.collection_thread = self.collection_thread
+        self.collection_thread.start()
+        
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.progress_bar.setRange(0, 0)  # 显示忙碌状态
             
     def stop_collection(self):
         if self.collection_thread and self.collection_thread.isRunning():
-            self.collection_thread.stop()  # 使用新的stop方法
-            self.collection_thread.wait()  # 等待线程结束
-            self.collection_finished(True)  # 标记为正常完成
+            # 数据处理完成后由 finished_signal 调用 collection_finished
+            self.collection_thread.stop()
+            self.stop_button.setEnabled(False)
             
     def collection_finished(self, success):
         self.start_button.setEnabled(True)
@@ -449,16 +378,21 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "错误", f"导出失败: {str(e)}")
 
     def start_manual_collection(self):
-        duration = 0  # 手动采集时设置为0
-        self.manual_control.start_collection(duration)
-        self.start_button.setEnabled(False)  # 禁用开始按钮
-        self.stop_button.setEnabled(True)  # 启用停止按钮
+        duration = 0  # 手动采集时设置为0，直到点击停止
+        self.start_collection_thread(duration)
 
     def stop_manual_collection(self):
         self.manual_control.stop_collection()  # 停止手动采集
         self.start_button.setEnabled(True)  # 重新启用开始按钮
         self.stop_button.setEnabled(False)  # 禁用停止按钮
 
+    def closeEvent(self, event):
+        if self.collection_thread is not None and self.collection_thread.isRunning():
+            self.collection_thread.stop()
+            self.collection_thread.wait()
+        self.runner.close()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -1,21 +1,41 @@
+import asyncio
+import argparse
 import subprocess
 import threading
 import sys
 import os
+from datetime import datetime
 
-def run_programs_for_duration(duration):
+from lib.utils.start_barrier import StartBarrier
+
+# 调度日志：启动偏差与各采集进程的结果
+SESSION_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session.log")
+
+def log_session(message):
+    """将消息同时输出到控制台和调度日志"""
+    print(message)
+    with open(SESSION_LOG, 'a') as log_file:
+        log_file.write(f'{datetime.now()}: {message}\n')
+
+def run_programs_for_duration(duration, capture="csv"):
     # 要运行的两个程序的命令，传递duration作为参数
-    program1 = ["python3", "/home/elpco/Python_Project/Magnetic_Map_Acquisition_System/mag_ga/ins_aq.py", str(duration)]
-    program2 = ["python3", "/home/elpco/Python_Project/Magnetic_Map_Acquisition_System/mag_ga/mag_aq.py", str(duration)]
+    program1 = ["python3", "/home/elpco/Python_Project/Magnetic_Map_Acquisition_System/mag_ga/ins_aq.py", str(duration), "--capture", capture]
+    program2 = ["python3", "/home/elpco/Python_Project/Magnetic_Map_Acquisition_System/mag_ga/mag_aq.py", str(duration), "--capture", capture]
+
+    # 两个采集进程就绪后由启动屏障在同一时刻放行
+    barrier = StartBarrier(["ins", "mag"], log=log_session)
+    barrier.start()
 
     # 创建管道用于进程通信，只将标准错误重定向到/dev/null
     with open(os.devnull, 'w') as devnull:
         process1 = subprocess.Popen(program1, 
                                   stdin=subprocess.PIPE, 
-                                  stderr=devnull)
+                                  stderr=devnull,
+                                  env=barrier.env())
         process2 = subprocess.Popen(program2, 
                                   stdin=subprocess.PIPE, 
-                                  stderr=devnull)
+                                  stderr=devnull,
+                                  env=barrier.env())
 
         if duration == 0:
             # 等待用户按回车
@@ -39,19 +59,57 @@ def run_programs_for_duration(duration):
         process1.wait()
         process2.wait()
 
+        summaries = barrier.wait(timeout=5)
+        barrier.close()
+        for name, summary in summaries.items():
+            log_session(f"{name}: {summary['message']}")
+
         if duration > 0:
             print(f"两个程序都已完成，程序运行时间为 {duration} 秒。")
         else:
             print("数据采集已结束。")
 
+async def run_engine(duration, capture="csv"):
+    """在同一进程的事件循环中采集两个传感器"""
+    from acquisition_engine import AcquisitionEngine
+    engine = AcquisitionEngine(capture=capture)
+    if duration > 0:
+        final_msg = await engine.run(duration)
+    else:
+        await engine.start(duration)
+        print("按回车键停止数据采集...")
+        await asyncio.get_running_loop().run_in_executor(None, input)
+        final_msg = await engine.stop()
+    print(final_msg)
+    return engine
+
+def run_in_process(duration, capture="csv"):
+    import ins_aq
+    import mag_aq
+    engine = asyncio.run(run_engine(duration, capture))
+    df = engine.mag_data
+    if df is not None:
+        mag_aq.visualize_data(df['X'], df['Y'], df['Z'], df['Time'], df['Magnitude'], df['Filtered Magnitude'])
+    if len(ins_aq.samples):
+        ins_aq.visualize_data()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="同时采集INS和磁力计数据")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="两个传感器分别在子进程中采集，由启动屏障同时放行")
+    parser.add_argument("--capture", choices=["csv", "binary"], default="csv",
+                        help="原始数据文件格式，binary 为二进制采集文件，可由 export_capture.py 导出为CSV")
+    args = parser.parse_args()
     try:
         duration = input("请输入程序运行的时间（秒，输入0表示手动停止）：")
         duration = int(duration)
         if duration < 0:
             print("时间不能为负数")
             sys.exit(1)
-        run_programs_for_duration(duration)
+        if args.subprocess:
+            run_programs_for_duration(duration, args.capture)
+        else:
+            run_in_process(duration, args.capture)
     except ValueError:
         print("请输入一个有效的数字。")
         sys.exit(1)
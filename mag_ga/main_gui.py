@@ -3,17 +3,47 @@ from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                             QPushButton, QLabel, QLineEdit, QMessageBox, 
                             QProgressBar, QFrame)
 from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtCore import Qt, QTimer
-import subprocess
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 import os
+import threading
 from datetime import datetime
+from acquisition_engine import EngineRunner
+
+# 调度日志：启动偏差与各采集进程的结果
+SESSION_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session.log")
+
+def log_session(message):
+    """将消息同时输出到控制台和调度日志"""
+    print(message)
+    with open(SESSION_LOG, 'a') as log_file:
+        log_file.write(f'{datetime.now()}: {message}\n')
+
+class AcquisitionThread(QThread):
+    """在工作线程中运行一次采集，界面线程不等待串口打开与数据处理"""
+    finished_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, runner, duration):
+        super().__init__()
+        self.runner = runner
+        self.duration = duration
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            self.finished_signal.emit(self.runner.run(self.duration, self.stop_event))
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def stop(self):
+        self.stop_event.set()
 
 class DataAcquisitionApp(QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
-        self.process1 = None
-        self.process2 = None
+        self.runner = EngineRunner()     # INS与磁力计在同一进程的事件循环中采集
+        self.acquisition = None
         self.start_time = None
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_progress)
@@ -165,113 +195,42 @@ class DataAcquisitionApp(QWidget):
             QMessageBox.warning(self, '错误', '请输入有效的数字')
 
     def stop_acquisition(self):
-        if self.process1 or self.process2:
-            # 先发送停止信号
-            self.send_stop_signal()
-            
-            # 等待进程结束
-            if self.process1:
-                try:
-                    self.process1.wait(timeout=300)
-                except subprocess.TimeoutExpired:
-                    pass
-            if self.process2:
-                try:
-                    self.process2.wait(timeout=300)
-                except subprocess.TimeoutExpired:
-                    pass
-            
-            # 强制终止进程
-            self.cleanup_processes()
-            
-            # 更新状态
-            self.status_label.setText('状态：已停止')
-            
-            # 检查是否有来自ins_aq的最终消息
-            try:
-                with open("/dev/shm/ins_final_msg", "r") as f:
-                    final_msg = f.read()
-                    os.remove("/dev/shm/ins_final_msg")
-            except FileNotFoundError:
-                final_msg = '数据采集已停止'
-                
-            QMessageBox.information(self, '信息', final_msg)
-        
-        # 重置UI状态
+        if self.acquisition is not None and self.acquisition.isRunning():
+            # 数据处理完成后由 acquisition_finished 显示结果
+            self.acquisition.stop()
+            self.status_label.setText('状态：正在停止')
+            self.stop_button.setEnabled(False)
+
+    def run_programs(self, duration):
+        self.acquisition = AcquisitionThread(self.runner, duration)
+        self.acquisition.finished_signal.connect(self.acquisition_finished)
+        self.acquisition.error_signal.connect(self.acquisition_failed)
+        self.acquisition.start()
+
+    def acquisition_finished(self, final_msg):
+        stopped = self.acquisition.stop_event.is_set()
+        self.status_label.setText('状态：已停止' if stopped else '状态：已完成')
+        log_session(final_msg)
+        QMessageBox.information(self, '信息' if stopped else '完成', final_msg)
+        self.reset_ui()
+
+    def acquisition_failed(self, message):
+        self.status_label.setText('状态：采集失败')
+        log_session(f"采集失败: {message}")
+        QMessageBox.warning(self, '错误', message)
+        self.reset_ui()
+
+    def reset_ui(self):
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.duration_input.setEnabled(True)
 
-    def run_programs(self, duration):
-        program1 = ["python3", "mag_ga/ins_aq.py", str(duration)]
-        program2 = ["python3", "mag_ga/mag_aq.py", str(duration)]
-
-        with open(os.devnull, 'w') as devnull:
-            self.process1 = subprocess.Popen(program1, 
-                                           stdin=subprocess.PIPE, 
-                                           stderr=devnull)
-            self.process2 = subprocess.Popen(program2, 
-                                           stdin=subprocess.PIPE, 
-                                           stderr=devnull)
-
-        if duration == 0:
-            return  # 等待手动停止
-
-        # 如果设置了时间，等待程序完成
-        self.process1.wait()
-        self.process2.wait()
-        self.cleanup_processes()
-        
-        elapsed_time = (datetime.now() - self.start_time).total_seconds()
-        self.status_label.setText('状态：已完成')
-        
-        # 检查是否有来自ins_aq的最终消息
-        try:
-            with open("/dev/shm/ins_final_msg", "r") as f:
-                final_msg = f.read()
-                os.remove("/dev/shm/ins_final_msg")
-        except FileNotFoundError:
-            final_msg = f'数据采集完成\n运行时间：{elapsed_time:.1f}秒'
-            
-        QMessageBox.information(self, '完成', final_msg)
-
-    def send_stop_signal(self):
-        try:
-            if self.process1 and self.process1.poll() is None:
-                self.process1.stdin.write(b'\n')
-                self.process1.stdin.flush()
-        except:
-            pass
-
-        try:
-            if self.process2 and self.process2.poll() is None:
-                self.process2.stdin.write(b'\n')
-                self.process2.stdin.flush()
-        except:
-            pass
-
-    def cleanup_processes(self):
-        if self.process1:
-            try:
-                self.process1.terminate()
-                self.process1.wait(timeout=10)
-                if self.process1.poll() is None:
-                    self.process1.kill()
-            except:
-                pass
-            finally:
-                self.process1 = None
-                
-        if self.process2:
-            try:
-                self.process2.terminate()
-                self.process2.wait(timeout=10)
-                if self.process2.poll() is None:
-                    self.process2.kill()
-            except:
-                pass
-            finally:
-                self.process2 = None
+    def closeEvent(self, event):
+        if self.acquisition is not None and self.acquisition.isRunning():
+            self.acquisition.stop()
+            self.acquisition.wait()
+        self.runner.close()
+        super().closeEvent(event)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
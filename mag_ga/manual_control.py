@@ -14,11 +14,5 @@ class ManualControl:
     def stop_collection(self):
         if self.collection_thread is not None:
             self.collection_thread.stop()  # 手动结束采样
-            if self.collection_thread.mag_process:
-                self.collection_thread.mag_process.stdin.write(b'\n')
-                self.collection_thread.mag_process.stdin.flush()
-            if self.collection_thread.ins_process:
-                self.collection_thread.ins_process.stdin.write(b'\n')
-                self.collection_thread.ins_process.stdin.flush()
         else:
             print("没有正在进行的采样线程")
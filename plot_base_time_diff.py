@@ -1,8 +1,12 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# Load the modified time differences CSV file
-modified_time_diffs = pd.read_csv('test_data/modified_time_diffs_3.csv')
+import timestamp_matching
+
+# 直接配对计算时间差，与 calculate_modified_time_diffs.py 写出的 test_data/modified_time_diffs_3.csv 相同
+ins_data = pd.read_csv('test_data/ins_data_seconds.csv')
+mag_data = pd.read_csv('test_data/mag_data_seconds.csv')
+modified_time_diffs = timestamp_matching.modified_time_diffs(ins_data, mag_data)
 
 # Plot the Base_Time_Diff
 plt.figure(figsize=(10, 6))
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from time_alignment import to_ns
+
+"""
+数据质量指标：按窗口长度与步长(hop)划分的所有窗口一次算出方差、缺失数与信噪比(均值/标准差)
+默认与 np.var/np.mean 作用于数组相同，窗口含NaN时方差与信噪比为NaN；skipna=True 时NaN不参与统计，与作用于 pd.Series 相同
+各窗口的和、平方和与非NaN个数由累加和相减得到，与窗口长度和重叠无关；窗口按块处理，临时内存与块大小有关，
+结果为每个窗口一行的质量表
+"""
+
+# 每块计算的窗口数，临时数组的长度约为 CHUNK_WINDOWS × 步长
+CHUNK_WINDOWS = 4096
+
+# 估计中位数时最多使用的样本数
+REFERENCE_SAMPLES = 100_000
+
+def times_ns(times):
+    """时间列转为int64纳秒，已是时间类型时不再经过 pd.to_datetime 解析"""
+    if getattr(times, 'dtype', None) is None or times.dtype.kind != 'M':
+        times = pd.to_datetime(times)
+    return to_ns(times)
+
+
+def window_starts(count, window, hop):
+    """长度为 count 的序列中所有完整窗口的起点"""
+    return np.arange(0, count - window + 1, hop)
+
+
+def block_prefix_sums(values, block):
+    """
+    按长度 block 分块、每块从0开始的累加和，形状为 (块数 + 1, block + 1)，末尾补一个0块使任意 [起点, 起点 + block] 都落在两块内
+    块 k 中位置 r 之前的和为 [k, r]
+    """
+    count = -(-len(values) // block) + 1
+    padded = np.zeros(count * block)
+    padded[:len(values)] = values
+    sums = np.zeros((count, block + 1))
+    np.cumsum(padded.reshape(count, block), axis=1, out=sums[:, 1:])
+    return sums
+
+
+def window_sums(values, starts, window):
+    """长度为 window 的窗口之和：窗口只跨两块，只受这两块的累加误差影响"""
+    block, offset = np.divmod(starts, window)
+    block_end, offset_end = np.divmod(starts + window, window)
+    sums = block_prefix_sums(values, window)
+    return sums[block, window] - sums[block, offset] + sums[block_end, offset_end]
+
+
+def window_metrics(values, window, hop=None, starts=None, skipna=False, chunk_windows=CHUNK_WINDOWS):
+    """
+    每个窗口的 variance(总体方差)、missing_data(NaN个数)与 signal_noise_ratio(均值/总体标准差，标准差为0时为0)
+    hop 默认为窗口长度的一半；starts 为窗口起点，缺省为 window_starts(len(values), window, hop)
+    skipna 为 False 时含NaN的窗口方差与信噪比为NaN，为 True 时只统计非NaN的值
+    窗口的和与平方和由按窗口长度分块的累加和相减得到，数值先减去中位数；非NaN值全部相同的窗口方差直接取0
+    返回 {指标: 每个窗口一个值的数组}
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if starts is None:
+        starts = window_starts(len(values), window, hop or max(window // 2, 1))
+    starts = np.asarray(starts, dtype=np.intp)
+    if window < 1:
+        # 空窗口与 np.var/np.mean 作用于空数组相同，结果为NaN
+        return {'variance': np.full(len(starts), np.nan), 'missing_data': np.zeros(len(starts), dtype=np.int64),
+                'signal_noise_ratio': np.full(len(starts), np.nan)}
+    sample = values[::max(len(values) // REFERENCE_SAMPLES, 1)]
+    sample = sample[~np.isnan(sample)]
+    reference = float(np.median(sample)) if len(sample) else 0.0
+
+    missing = np.empty(len(starts), dtype=np.int64)
+    mean = np.empty(len(starts))
+    variance = np.empty(len(starts))
+    for lo in range(0, len(starts), chunk_windows):
+        chunk = slice(lo, lo + chunk_windows)
+        # 块内的数据段从分块边界开始，窗口位置改为相对数据段
+        a = starts[chunk].min() // window * window
+        local = starts[chunk] - a
+        segment = values[a:starts[chunk].max() + window]
+        valid = ~np.isnan(segment)
+        # 缺失数由NaN个数的累加和相减得到
+        nan_count = np.concatenate(([0], np.cumsum(~valid)))
+        missing[chunk] = nan_count[local + window] - nan_count[local]
+        count = window - missing[chunk]
+
+        # 非NaN值中相邻两个不同的次数，窗口内为0时各值相同
+        finite = segment[valid]
+        changes = np.concatenate(([0], np.cumsum(finite[1:] != finite[:-1])))
+        end = max(len(changes) - 1, 0)
+        first = local - nan_count[local]            # 窗口内第一个非NaN值在 finite 中的位置
+        last = np.maximum(local + window - nan_count[local + window] - 1, first)
+        constant = changes[np.minimum(last, end)] == changes[np.minimum(first, end)]
+
+        centered = np.where(valid, segment - reference, 0.0)
+        window_sum = window_sums(centered, local, window)
+        window_squares = window_sums(np.square(centered, out=centered), local, window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean[chunk] = reference + window_sum / count
+            variance[chunk] = np.where(constant, 0.0, np.maximum(window_squares - window_sum ** 2 / count, 0) / count)
+
+    # 没有非NaN值的窗口为NaN；不跳过NaN时含NaN的窗口为NaN
+    empty = (missing == window) | ((not skipna) & (missing > 0))
+    mean[empty] = np.nan
+    variance[empty] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(variance)
+        snr = np.where(std != 0, mean / std, 0)
+    return {'variance': variance, 'missing_data': missing, 'signal_noise_ratio': snr}
+
+
+def quality_table(columns, window, hop=None, times=None, starts=None, skipna=False):
+    """
+    每个窗口一行的质量表：Window_Index、窗口行号范围 Start/Stop(不含)，给出 times 时另有窗口首末行的 Start_Time/End_Time，
+    以及每列的 <列名>_variance、<列名>_missing、<列名>_snr，NaN的处理见 window_metrics
+    columns 为 {列名: 数组} 或 DataFrame，各列等长；可按 Window_Index 或时间范围与同步结果关联
+    """
+    names = list(columns.keys())
+    count = len(columns[names[0]]) if names else 0
+    if starts is None:
+        starts = window_starts(count, window, hop or max(window // 2, 1))
+    starts = np.asarray(starts, dtype=np.intp)
+    table = {'Window_Index': np.arange(len(starts)), 'Start': starts, 'Stop': starts + window}
+    if times is not None:
+        ns = times_ns(times)
+        table['Start_Time'] = pd.to_datetime(ns[starts])
+        table['End_Time'] = pd.to_datetime(ns[starts + window - 1])
+    for name in names:
+        metrics = window_metrics(np.asarray(columns[name], dtype=np.float64), window, starts=starts, skipna=skipna)
+        table[f'{name}_variance'] = metrics['variance']
+        table[f'{name}_missing'] = metrics['missing_data']
+        table[f'{name}_snr'] = metrics['signal_noise_ratio']
+    return pd.DataFrame(table)
+
+
+def interval_drift(times, window=50, threshold=3.0):
+    """
+    采样间隔异常点：相邻时间戳的间隔(秒)与其前 window 个间隔(含自身)的均值相差超过 threshold 倍标准差(ddof=1)的位置
+    与 Series.rolling(window).mean()/std() 相同，首个间隔为NaN，前 window 个位置的均值、标准差为NaN
+    滚动和由整数纳秒间隔的累加和相减得到；平方和先减去间隔中位数再累加，避免相减时的精度损失
+    返回 (异常点位置, 滚动均值, 滚动标准差)
+    """
+    ns = times_ns(times)
+    intervals = np.full(len(ns), np.nan)
+    rolling_mean = np.full(len(ns), np.nan)
+    rolling_std = np.full(len(ns), np.nan)
+    if len(ns) > 1:
+        diffs = np.diff(ns)
+        intervals[1:] = diffs / 1e9
+    if len(ns) > window:
+        reference = int(np.median(diffs))
+        centered = diffs - reference
+        sums = np.concatenate(([0], np.cumsum(centered)))
+        squares = np.concatenate(([0.0], np.cumsum(centered.astype(np.float64) ** 2)))
+        # 第 i 个间隔(i >= window)对应 diffs[i - window:i]
+        window_sum = sums[window:] - sums[:-window]
+        window_squares = squares[window:] - squares[:-window]
+        rolling_mean[window:] = (window_sum + window * reference) / window / 1e9
+        variance = np.maximum(window_squares - window_sum.astype(np.float64) ** 2 / window, 0) / (window - 1)
+        rolling_std[window:] = np.sqrt(variance) / 1e9
+    with np.errstate(invalid='ignore'):
+        drift_points = np.where(np.abs(intervals - rolling_mean) > threshold * rolling_std)[0]
+    return drift_points, rolling_mean, rolling_std
@@ -0,0 +1,158 @@
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 可选依赖，未安装时 load_session 直接读取CSV
+    pa = pq = None
+
+"""
+会话归档：将处理后的磁力计数据与INS数据的CSV转换为Parquet，与CSV放在同一目录、同名
+时间列解析为时间戳后存储，按时间段(默认1分钟)分为多个行组，每个行组带有时间列的最小/最大值统计，
+读取时只解码需要的列，并按时间范围跳过不相交的行组
+
+用法: python session_archive.py mag_data/processed ins_data test_data [--freq 1min]
+"""
+
+# 按顺序查找的时间列：处理后数据为 Timestamp，合并数据为 timestamp，原始INS数据为 Record Time
+TIME_COLUMNS = ("Timestamp", "timestamp", "Record Time")
+
+# 每个行组覆盖的时间段
+ROW_GROUP_FREQ = "1min"
+
+# Parquet文件元数据中记录时间列名的键
+TIME_COLUMN_KEY = b"session_archive.time_column"
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("Parquet归档需要 pyarrow，请先安装: pip install pyarrow")
+
+
+def find_time_column(columns):
+    """返回第一个存在的时间列名，没有时返回None"""
+    for name in TIME_COLUMNS:
+        if name in columns:
+            return name
+    return None
+
+
+def archive_path(csv_path):
+    """CSV对应的Parquet文件路径"""
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def archive_session(csv_path, output_path=None, freq=ROW_GROUP_FREQ):
+    """将一个会话CSV转换为按时间分行组的Parquet文件，返回输出路径"""
+    _require_pyarrow()
+    output_path = Path(output_path) if output_path else archive_path(csv_path)
+    # 重名列(如旧的处理后数据有两个Timestamp)由 read_csv 重命名为 Timestamp.1，满足Parquet列名唯一的要求
+    df = pd.read_csv(csv_path)
+    time_col = find_time_column(df.columns)
+    if time_col is None:
+        raise ValueError(f"{csv_path} 中没有时间列: {', '.join(TIME_COLUMNS)}")
+    df[time_col] = pd.to_datetime(df[time_col], errors='coerce')
+    # 行组按时间划分，先按时间稳定排序，无法解析的时间排在最后
+    if not df[time_col].is_monotonic_increasing:
+        df = df.sort_values(time_col, kind='stable', na_position='last', ignore_index=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           TIME_COLUMN_KEY: time_col.encode('utf-8')})
+    # 每个时间段的起始行；时间为空的行排在最后，单独成为一个行组
+    buckets = df[time_col].dt.floor(freq).to_numpy().view(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(df)]
+
+    with pq.ParquetWriter(output_path, table.schema) as writer:
+        if len(df) == 0:
+            writer.write_table(table)
+        for start, end in zip(starts, ends):
+            writer.write_table(table.slice(start, end - start))
+    return output_path
+
+
+def _time_column(path):
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(TIME_COLUMN_KEY, b"").decode('utf-8') or None
+
+
+def _select_range(df, time_col, start, end):
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df[time_col] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[time_col] < pd.Timestamp(end)
+    return df[mask]
+
+
+def load_session(path, columns=None, start=None, end=None, prefer_archive=True):
+    """
+    读取会话数据，时间列以时间戳类型返回
+    path 为CSV时，若同名Parquet存在且不旧于CSV则读取Parquet；没有归档或未安装pyarrow时读取CSV
+    columns 为需要的列(None为全部)；start/end 为时间范围 [start, end)，按文件中的时间列筛选
+    """
+    path = Path(path)
+    if path.suffix != ".parquet" and prefer_archive and pq is not None:
+        archived = archive_path(path)
+        if archived.exists() and (not path.exists() or archived.stat().st_mtime >= path.stat().st_mtime):
+            path = archived
+
+    ranged = start is not None or end is not None
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        time_col = _time_column(path)
+        filters = []
+        if start is not None:
+            filters.append((time_col, '>=', pd.Timestamp(start)))
+        if end is not None:
+            filters.append((time_col, '<', pd.Timestamp(end)))
+        read_columns = None
+        if columns is not None:
+            read_columns = list(columns) + ([time_col] if ranged and time_col not in columns else [])
+        df = pq.read_table(path, columns=read_columns, filters=filters or None).to_pandas()
+        return df if columns is None else df[list(columns)]
+
+    header = pd.read_csv(path, nrows=0).columns
+    time_col = find_time_column(header)
+    usecols = None
+    if columns is not None:
+        usecols = list(columns) + ([time_col] if ranged and time_col not in columns else [])
+    df = pd.read_csv(path, usecols=usecols)
+    if time_col in df.columns:
+        df[time_col] = pd.to_datetime(df[time_col], errors='coerce')
+    if ranged:
+        df = _select_range(df, time_col, start, end).reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
+
+
+def find_sessions(paths):
+    """展开目录中的CSV文件"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(str(p) for p in Path(path).glob("*.csv"))
+        else:
+            files.append(path)
+    return files
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="将会话CSV归档为Parquet")
+    parser.add_argument("paths", nargs='+', help="CSV文件或目录")
+    parser.add_argument("--freq", default=ROW_GROUP_FREQ, help="每个行组覆盖的时间段，如 1min、10s")
+    args = parser.parse_args()
+    for csv_path in find_sessions(args.paths):
+        try:
+            output = archive_session(csv_path, freq=args.freq)
+        except ValueError as e:
+            print(f"跳过 {csv_path}: {e}")
+            continue
+        meta = pq.ParquetFile(output).metadata
+        print(f"{csv_path} -> {output}: {meta.num_rows} 行, {meta.num_row_groups} 个行组, "
+              f"{os.path.getsize(csv_path) / 1e6:.2f}MB -> {os.path.getsize(output) / 1e6:.2f}MB")
@@ -1,11 +1,14 @@
 import pandas as pd
 
-# Read the CSV file
-csv_path = 'test_data/modified_time_diffs_3.csv'
-df = pd.read_csv(csv_path)
+from timestamp_matching import modified_time_diffs
+
+# 直接配对计算，不再依赖 calculate_modified_time_diffs.py 先写出的 test_data/modified_time_diffs_3.csv
+ins_data = pd.read_csv('test_data/ins_data_seconds.csv')
+mag_data = pd.read_csv('test_data/mag_data_seconds.csv')
+df = modified_time_diffs(ins_data, mag_data)
 
 # Get the last column and calculate the sum
-last_column = df.iloc[:, -1]
+last_column = df['Base_Time_Diff']
 total_sum = last_column.sum()
 
 print(f"Sum of values in the last column: {total_sum}")
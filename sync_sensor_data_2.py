@@ -4,10 +4,32 @@ from scipy import interpolate
 from datetime import datetime
 from scipy.signal import savgol_filter
 
+from quality_metrics import interval_drift, quality_table, window_metrics
+
 class SensorDataSynchronizer:
-    def __init__(self, window_size=100, max_time_diff_ms=3):
+    # (output column, interpolated source, source column) copied row by row into the result
+    OUTPUT_COLUMNS = [
+        ('Mag_X', 'mag', 'X'), ('Mag_Y', 'mag', 'Y'), ('Mag_Z', 'mag', 'Z'),
+        ('Mag_Magnitude', 'mag', 'Magnitude'),
+        ('INS_Accel_X', 'ins', 'Acceleration X (g)'), ('INS_Accel_Y', 'ins', 'Acceleration Y (g)'),
+        ('INS_Accel_Z', 'ins', 'Acceleration Z (g)'),
+        ('INS_Gyro_X', 'ins', 'Angular_velocity_X (dps)'), ('INS_Gyro_Y', 'ins', 'Angular_velocity_Y (dps)'),
+        ('INS_Gyro_Z', 'ins', 'Angular_velocity_Z (dps)'),
+        ('INS_Temperature', 'ins', 'Temperature (°C)'),
+        ('INS_Longitude', 'ins', 'Longitude'), ('INS_Latitude', 'ins', 'Latitude'),
+    ]
+    RESULT_COLUMNS = [
+        'Timestamp', 'Time_Point', 'Mag_X', 'Mag_Y', 'Mag_Z', 'Mag_Magnitude', 'Mag_Filtered_Magnitude',
+        'INS_Accel_X', 'INS_Accel_Y', 'INS_Accel_Z', 'INS_Gyro_X', 'INS_Gyro_Y', 'INS_Gyro_Z',
+        'INS_Temperature', 'INS_Longitude', 'INS_Latitude', 'Mag_Quality_Score', 'INS_Quality_Score', 'Window_Index'
+    ]
+
+    def __init__(self, window_size=100, max_time_diff_ms=3, hop_size=None):
         self.window_size = window_size
         self.max_time_diff_ms = max_time_diff_ms
+        # Windows start every hop_size time points, half a window by default
+        self.hop_size = hop_size or self.window_size // 2
+        self.window_quality = None
         
     def load_data(self, mag_file, ins_file):
 
@@ -20,14 +42,9 @@ class SensorDataSynchronizer:
             df['seconds'] = (df['Timestamp'] - df['Timestamp'].min()).dt.total_seconds()
     
     def detect_time_drift(self, data, window_size=50):
-        
-        timestamps = pd.to_datetime(data['Timestamp'])
-        time_diffs = timestamps.diff().dt.total_seconds()
-        rolling_mean = time_diffs.rolling(window=window_size).mean()
-        rolling_std = time_diffs.rolling(window=window_size).std()
-        drift_points = np.where(np.abs(time_diffs - rolling_mean) > 3 * rolling_std)[0]
-        
-        return drift_points, rolling_mean, rolling_std
+        """Sampling intervals more than 3 rolling standard deviations off the rolling mean, see quality_metrics.interval_drift"""
+        drift_points, rolling_mean, rolling_std = interval_drift(data['Timestamp'], window_size)
+        return drift_points, pd.Series(rolling_mean, index=data.index), pd.Series(rolling_std, index=data.index)
     
     def interpolate_sensor_data(self, data, time_points):
         """Interpolate sensor data to specified time points"""
@@ -50,58 +67,54 @@ class SensorDataSynchronizer:
     
     def calculate_quality_metrics(self, window_data):
         """Calculate data quality metrics for a window of data"""
-        metrics = {
-            'variance': np.var(window_data),
-            'missing_data': np.sum(np.isnan(window_data)),
-            'signal_noise_ratio': np.mean(window_data) / np.std(window_data) if np.std(window_data) != 0 else 0
-        }
-        return metrics
+        # np.var/np.mean skip NaN for a Series (they call its own methods) and propagate it for arrays
+        metrics = window_metrics(window_data, len(window_data), starts=[0],
+                                 skipna=isinstance(window_data, pd.Series))
+        return {name: values[0] for name, values in metrics.items()}
     
     def sync_with_sliding_window(self):
         """Synchronize data using sliding window approach"""
-        synchronized_data = []
         start_time = max(self.mag_data['seconds'].min(), self.ins_data['seconds'].min())
         end_time = min(self.mag_data['seconds'].max(), self.ins_data['seconds'].max())
         
         time_points = np.arange(start_time, end_time, 0.01)
         mag_interp = self.interpolate_sensor_data(self.mag_data, time_points)
         ins_interp = self.interpolate_sensor_data(self.ins_data, time_points)
-        mag_drift, mag_roll_mean, mag_roll_std = self.detect_time_drift(self.mag_data)
-        ins_drift, ins_roll_mean, ins_roll_std = self.detect_time_drift(self.ins_data)
-        for i in range(0, len(time_points) - self.window_size, self.window_size // 2):
-            window_slice = slice(i, i + self.window_size)
-            mag_window = mag_interp.iloc[window_slice]
-            ins_window = ins_interp.iloc[window_slice]
-            mag_quality = self.calculate_quality_metrics(mag_window['Magnitude'])
-            ins_quality = self.calculate_quality_metrics(ins_window['Acceleration X (g)'])
-            for j in range(len(mag_window)):
-                combined_data = {
-                    'Timestamp': pd.Timestamp(self.mag_data['Timestamp'].min()) + 
-                                pd.Timedelta(seconds=time_points[i + j]),
-                    'Time_Point': time_points[i + j],
-                    'Mag_X': mag_window['X'].iloc[j],
-                    'Mag_Y': mag_window['Y'].iloc[j],
-                    'Mag_Z': mag_window['Z'].iloc[j],
-                    'Mag_Magnitude': mag_window['Magnitude'].iloc[j],
-                    'Mag_Filtered_Magnitude': savgol_filter(mag_window['Magnitude'], 
-                                                          window_length=min(11, len(mag_window)), 
-                                                          polyorder=3)[j],
-                    'INS_Accel_X': ins_window['Acceleration X (g)'].iloc[j],
-                    'INS_Accel_Y': ins_window['Acceleration Y (g)'].iloc[j],
-                    'INS_Accel_Z': ins_window['Acceleration Z (g)'].iloc[j],
-                    'INS_Gyro_X': ins_window['Angular_velocity_X (dps)'].iloc[j],
-                    'INS_Gyro_Y': ins_window['Angular_velocity_Y (dps)'].iloc[j],
-                    'INS_Gyro_Z': ins_window['Angular_velocity_Z (dps)'].iloc[j],
-                    'INS_Temperature': ins_window['Temperature (°C)'].iloc[j],
-                    'INS_Longitude': ins_window['Longitude'].iloc[j],
-                    'INS_Latitude': ins_window['Latitude'].iloc[j],
-                    'Mag_Quality_Score': mag_quality['signal_noise_ratio'],
-                    'INS_Quality_Score': ins_quality['signal_noise_ratio'],
-                    'Window_Index': i // (self.window_size // 2)
-                }
-                synchronized_data.append(combined_data)
-        
-        return pd.DataFrame(synchronized_data)
+
+        # Every window contributes all of its rows, so with the default hop each time point
+        # appears in up to two windows. rows holds the time point of each output row
+        starts = np.arange(0, len(time_points) - self.window_size, self.hop_size)
+        positions = starts[:, None] + np.arange(self.window_size)
+        rows = positions.ravel()
+        # pd.Timedelta(seconds=t) truncates t * 1e9 to whole nanoseconds
+        timestamps = self.mag_data['Timestamp'].min() + pd.to_timedelta((time_points * 1e9).astype(np.int64))
+
+        # One row per window, joins the result on Window_Index. NaN skipped as when each window was a Series
+        self.window_quality = quality_table({'Mag_Magnitude': mag_interp['Magnitude'],
+                                             'INS_Accel_X': ins_interp['Acceleration X (g)']},
+                                            self.window_size, times=timestamps, starts=starts, skipna=True)
+        if len(starts) == 0:
+            # Overlap shorter than one window: no windows, empty result with the usual columns
+            return pd.DataFrame(columns=self.RESULT_COLUMNS)
+        # Filter every window once, same as filtering the window's Magnitude series on its own
+        filtered = savgol_filter(mag_interp['Magnitude'].to_numpy()[positions],
+                                 window_length=min(11, self.window_size), polyorder=3, axis=1)
+
+        synchronized_data = {
+            'Timestamp': timestamps[rows],
+            'Time_Point': time_points[rows],
+        }
+        for name, source, col in self.OUTPUT_COLUMNS:
+            values = (mag_interp if source == 'mag' else ins_interp)[col].to_numpy()
+            synchronized_data[name] = values[rows]
+        synchronized_data['Mag_Filtered_Magnitude'] = filtered.ravel()
+        synchronized_data['Mag_Quality_Score'] = np.repeat(self.window_quality['Mag_Magnitude_snr'].to_numpy(),
+                                                           self.window_size)
+        synchronized_data['INS_Quality_Score'] = np.repeat(self.window_quality['INS_Accel_X_snr'].to_numpy(),
+                                                           self.window_size)
+        synchronized_data['Window_Index'] = np.repeat(self.window_quality['Window_Index'].to_numpy(),
+                                                      self.window_size)
+        return pd.DataFrame(synchronized_data, columns=self.RESULT_COLUMNS)
 
 def main():
     synchronizer = SensorDataSynchronizer(window_size=100, max_time_diff_ms=3)
@@ -112,6 +125,11 @@ def main():
     synced_data.to_csv(output_file, index=False)
     
     print(f"synchronized data saved to {output_file}")
+
+    # Per-window quality table, joins synced_data on Window_Index
+    quality_file = 'test_data/synchronized_quality.csv'
+    synchronizer.window_quality.to_csv(quality_file, index=False)
+    print(f"window quality saved to {quality_file}")
     print(f"Total synchronized points: {len(synced_data)}")
     print("\nData quality statistics:")
     print(f"Magnetic data quality (mean): {synced_data['Mag_Quality_Score'].mean():.2f}")
@@ -1,9 +1,12 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from scipy.signal import savgol_filter, medfilt
+from scipy.signal import savgol_filter
 from sklearn.metrics import r2_score
-from scipy.interpolate import CubicSpline
+from angular_model import angular_model
+from csv_export import write_precision_csv
+from session_archive import find_time_column, load_session
+from time_alignment import align_frame, inverse_distance_average, to_ns
 
 def apply_savgol_filter(series, window_length=11, polyorder=3):
     if window_length % 2 == 0:
@@ -12,84 +15,48 @@ def apply_savgol_filter(series, window_length=11, polyorder=3):
     filtered = savgol_filter(series.values, window_length, polyorder)
     return pd.Series(filtered, index=series.index)
 
-def interpolate_angular_velocity(data, target_index):
-    """对角速度数据进行插值处理，使用三次样条保持平滑性"""
+def interpolate_angular_velocity(data, target_index, cache_dir=None):
+    """对角速度数据进行插值处理，使用三次样条保持平滑性；同一数据的拟合结果被缓存，换用其他网格时只需重新求值"""
     angular_cols = [col for col in data.columns if 'angular_velocity' in col.lower()]
     if not angular_cols:
         return data
-    
-    angular_data = data[angular_cols].copy()
-    
-    for col in angular_cols:
-        mean_val = angular_data[col].mean()
-        std_val = angular_data[col].std()
-        mask = (angular_data[col] - mean_val).abs() <= 3 * std_val
-        clean_data = angular_data[col][mask]
-        
-        if len(clean_data) < 2:
-            angular_data[col] = angular_data[col].interpolate(method='linear')
-            continue
-        
-        try:
-            valid_data = clean_data.dropna()
-            if len(valid_data) >= 4:
-                t_valid = np.arange(len(valid_data))
-                spline = CubicSpline(t_valid, valid_data.values, bc_type='natural')
-                t_all = np.linspace(0, len(valid_data)-1, len(angular_data))
-                interpolated = spline(t_all)
-                interpolated = medfilt(interpolated, kernel_size=3)
-                angular_data[col] = interpolated
-            else:
-                angular_data[col] = angular_data[col].interpolate(method='linear')
-        except:
-            angular_data[col] = angular_data[col].interpolate(method='linear')
-    
-    resampled = angular_data.reindex(target_index)
-    resampled = resampled.interpolate(method='linear')
-    
-    return resampled
+    return angular_model(data[angular_cols], cache_dir).evaluate(target_index)
 
-def dynamic_window_interpolation(data, window_size=5):
-    """使用动态窗口进行数据插值，对角速度采用特殊处理"""
+def dynamic_window_interpolation(data, window_size=5, freq='10ms', cache_dir=None):
+    """
+    使用动态窗口将数据插值到间隔为 freq 的网格，对角速度采用特殊处理
+    window_size 为插值窗口的半宽(网格间隔数)；cache_dir 为角速度拟合系数的缓存目录
+    """
     if not data.index.is_monotonic_increasing:
         data = data.sort_index()
     
     start_time = data.index.min()
     end_time = data.index.max()
-    target_index = pd.date_range(start=start_time, end=end_time, freq='10ms')
+    target_index = pd.date_range(start=start_time, end=end_time, freq=freq)
     
     angular_cols = [col for col in data.columns if 'angular_velocity' in col.lower()]
     other_cols = [col for col in data.columns if col not in angular_cols]
     
     if angular_cols:
-        angular_data = interpolate_angular_velocity(data[angular_cols], target_index)
+        angular_data = interpolate_angular_velocity(data[angular_cols], target_index, cache_dir)
     else:
         angular_data = pd.DataFrame(index=target_index)
     
     other_data = pd.DataFrame(index=target_index)
-    if other_cols:
-        for col in other_cols:
-            series = data[col]
-            if pd.api.types.is_numeric_dtype(series):
-                resampled = series.reindex(target_index)
-                
-                for i in range(len(resampled)):
-                    if pd.isna(resampled.iloc[i]):
-                        current_time = resampled.index[i]
-                        window_data = series[
-                            (series.index >= current_time - pd.Timedelta(milliseconds=10*window_size)) &
-                            (series.index <= current_time + pd.Timedelta(milliseconds=10*window_size))
-                        ]
-                        
-                        if not window_data.empty:
-                            time_diff = abs((window_data.index - current_time).total_seconds())
-                            weights = 1 / (time_diff + 1e-6)
-                            resampled.iloc[i] = np.average(window_data, weights=weights)
-                        else:
-                            resampled.iloc[i] = np.nan
-                
-                resampled = resampled.interpolate(method='linear')
-                other_data[col] = resampled
+    numeric_cols = [col for col in other_cols if pd.api.types.is_numeric_dtype(data[col])]
+    if numeric_cols:
+        # 网格点上有同一时刻的数据时直接取值，其余网格点取前后 window_size 个网格间隔内数据的反距离加权均值，所有列一起计算
+        resampled = data[numeric_cols].reindex(target_index).to_numpy(dtype=np.float64, copy=True)
+        missing = np.isnan(resampled)
+        rows = missing.any(axis=1)
+        if rows.any():
+            filled = inverse_distance_average(to_ns(target_index)[rows], to_ns(data.index),
+                                              data[numeric_cols].to_numpy(dtype=np.float64),
+                                              window_size * pd.Timedelta(freq).value)
+            block = resampled[rows]
+            block[missing[rows]] = filled[missing[rows]]
+            resampled[rows] = block
+        other_data = pd.DataFrame(resampled, index=target_index, columns=numeric_cols).interpolate(method='linear')
     
     result = pd.concat([angular_data, other_data], axis=1)
     
@@ -99,37 +66,46 @@ def dynamic_window_interpolation(data, window_size=5):
     
     return result[data.columns]
 
-def format_with_precision(value, precision=8, pad_zeros=False):
-    """确保数值保持指定的小数位数"""
-    try:
-        if pd.isna(value):
-            return ''
-        rounded = round(float(value), precision)
-        format_str = '{:0.%df}' % precision if pad_zeros else '{:.%df}' % precision
-        return format_str.format(rounded)
-    except:
-        return ''
-
 def validate_columns(df, required_cols):
     missing = [col for col in required_cols if col not in df.columns]
     if missing:
         raise ValueError(f"缺少必需的列: {missing}")
 
-def remove_trailing_nulls(df):
-    last_valid_idx = -1
-    for idx in range(len(df) - 1, -1, -1):
-        if not df.iloc[idx].isna().all():
-            last_valid_idx = idx
-            break
-    return df.iloc[:last_valid_idx + 1] if last_valid_idx >= 0 else df.iloc[0:0]
+def remove_trailing_nulls(df, block_rows=1024):
+    """去掉末尾全为空的行：从末尾按块向前查找最后一个非空行，块大小逐次加倍"""
+    stop = len(df)
+    while stop > 0:
+        start = max(stop - block_rows, 0)
+        valid = np.flatnonzero(df.iloc[start:stop].notna().to_numpy().any(axis=1))
+        if len(valid):
+            return df.iloc[:start + valid[-1] + 1]
+        stop = start
+        block_rows *= 2
+    return df.iloc[0:0]
 
-def synchronize_and_merge(ins_path, mag_path, output_path):
-    ins_df = pd.read_csv(ins_path)
-    mag_df = pd.read_csv(mag_path)
+def synchronize_and_merge(ins_path, mag_path, output_path, start=None, end=None, method='nearest', tolerance=None,
+                          freq='10ms', cache_dir=None):
+    """
+    INS重采样到间隔为 freq(默认10ms)的网格后，将磁力计数据按 method(nearest/previous/linear) 对齐到同一网格，只输出两者的重叠时段
+    tolerance 为磁力计数据与网格点的最大时间差(如 '20ms')，超出时磁力计列为空
+    cache_dir 为角速度拟合系数的缓存目录，同一数据以不同 freq 重新同步时不必重新拟合
+    INS数据可为原始记录文件(时间列为 Record Time)；返回写出的合并数据
+    """
+    # 有Parquet归档时读取归档，start/end 限定读取的时间范围
+    ins_df = load_session(ins_path, start=start, end=end)
+    mag_df = load_session(mag_path, start=start, end=end)
+    for df in [ins_df, mag_df]:
+        # 原始INS数据的时间列为 Record Time，统一为 timestamp
+        time_col = find_time_column(df.columns)
+        if time_col is None:
+            raise ValueError("缺少时间列: Timestamp/Record Time")
+        df.rename(columns={time_col: 'timestamp'}, inplace=True)
     ins_df.columns = ins_df.columns.str.lower()
     mag_df.columns = mag_df.columns.str.lower()
     
     for df in [ins_df, mag_df]:
+        # 单调时钟列仅用于对时，不参与插值输出
+        df.drop(columns=['monotonic_ns', 'corrected_monotonic_ns'], errors='ignore', inplace=True)
         df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
         df.set_index('timestamp', inplace=True)
         df.sort_index(inplace=True)
@@ -139,8 +115,8 @@ def synchronize_and_merge(ins_path, mag_path, output_path):
     validate_columns(ins_df, ['acceleration x (g)', 'acceleration y (g)', 'acceleration z (g)'])
     validate_columns(mag_df, ['x', 'y', 'z'])
     
-    start_time = max(ins_df.index.min().ceil('10ms'), mag_df.index.min().ceil('10ms'))
-    end_time = min(ins_df.index.max().floor('10ms'), mag_df.index.max().floor('10ms'))
+    start_time = max(ins_df.index.min().ceil(freq), mag_df.index.min().ceil(freq))
+    end_time = min(ins_df.index.max().floor(freq), mag_df.index.max().floor(freq))
     overlap_duration = (end_time - start_time).total_seconds()
     if overlap_duration < 1.0:
         raise ValueError("传感器时间同步异常：有效重叠时段不足1秒")
@@ -148,8 +124,9 @@ def synchronize_and_merge(ins_path, mag_path, output_path):
     ins_numeric = ins_df.select_dtypes(include=[np.number])
     mag_numeric = mag_df.select_dtypes(include=[np.number])
     
-    ins_resampled = dynamic_window_interpolation(ins_numeric)
-    mag_resampled = mag_numeric.reindex(ins_resampled.index, method='nearest')
+    ins_resampled = dynamic_window_interpolation(ins_numeric, freq=freq, cache_dir=cache_dir)
+    ins_resampled = ins_resampled.loc[start_time:end_time]
+    mag_resampled = align_frame(ins_resampled.index, mag_numeric, method=method, tolerance=tolerance)
     
     merged = pd.concat([ins_resampled, mag_resampled], axis=1)
     merged = merged.loc[:, ~merged.columns.str.contains('base_time', case=False)]
@@ -161,25 +138,10 @@ def synchronize_and_merge(ins_path, mag_path, output_path):
     merged = remove_trailing_nulls(merged)
     merged.replace([np.inf, -np.inf], np.nan, inplace=True)
     
-    formatted_data = merged.reset_index()
-    formatted_data.index = formatted_data['index'].apply(
-        lambda x: x.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-    )
-    
-    for col in formatted_data.columns:
-        if col == 'index':
-            continue
-        col_lower = col.lower()
-        if col_lower in ['longitude', 'latitude']:
-            formatted_data[col] = formatted_data[col].apply(lambda x: format_with_precision(x, 8, pad_zeros=True))
-        elif col_lower in ['x', 'y', 'z', 'magnitude', 'filtered magnitude']:
-            formatted_data[col] = formatted_data[col].apply(lambda x: format_with_precision(x, 6))
-        elif col_lower != 'timestamp':
-            formatted_data[col] = formatted_data[col].apply(lambda x: format_with_precision(x, 4))
-    
-    formatted_data = formatted_data.rename(columns={'index': 'timestamp'})
-    formatted_data.to_csv(output_path, index=False)
+    # 经纬度8位、磁力计6位、其余4位小数，见 csv_export.PRECISION_SPEC
+    write_precision_csv(merged, output_path, index_label='timestamp')
     print(f"数据处理完成，已保存到 {output_path}")
+    return merged
 
 if __name__ == '__main__':
     ins_path = 'test_data/ins_data.csv'
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+"""
+时间对齐：在int64纳秒时间戳上用 np.searchsorted 将一个传感器的数据对齐到目标时间点
+支持最近邻(nearest)、前值(previous)与线性插值(linear)，可限定最大时间差(tolerance)，超出时为NaN
+源时间戳须升序(允许重复)，每个目标点的查找为O(log n)，整体开销与数据量近似线性
+"""
+
+NS_PER_MS = 1_000_000
+
+ALIGN_METHODS = ("nearest", "previous", "linear")
+
+
+def to_ns(times):
+    """DatetimeIndex/Series/datetime64数组转为int64纳秒数组"""
+    return np.asarray(times, dtype='datetime64[ns]').view(np.int64)
+
+
+def align_indexer(target, source, method="nearest", tolerance_ns=None):
+    """
+    每个目标时间点在源时间戳中对应的位置
+    nearest 与 DataFrame.reindex(method='nearest') 一致：与前后两点等距时取后一点；previous 取不晚于目标点的最后一点
+    返回 (位置数组, 有效掩码)，没有对应点或时间差超过 tolerance_ns 的目标点掩码为False
+    """
+    target = np.asarray(target, dtype=np.int64)
+    source = np.asarray(source, dtype=np.int64)
+    n = len(source)
+    if n == 0:
+        return np.zeros(len(target), dtype=np.intp), np.zeros(len(target), dtype=bool)
+    if method == "previous":
+        index = np.searchsorted(source, target, side='right') - 1     # 不晚于目标点的最后一点
+        valid = index >= 0
+        index = np.maximum(index, 0)
+        if tolerance_ns is not None:
+            valid &= target - source[index] <= tolerance_ns
+        return index, valid
+
+    # 不早于目标点的第一点及其前一点，只需一次查找：前一点一定早于目标点
+    after = np.searchsorted(source, target, side='left')
+    after_index = np.minimum(after, n - 1)
+    before_index = np.maximum(after - 1, 0)
+    d_after = source[after_index] - target
+    d_before = target - source[before_index]
+    use_before = (after == n) | ((after > 0) & (d_before < d_after))
+    index = np.where(use_before, before_index, after_index)
+    valid = np.ones(len(target), dtype=bool)
+    if tolerance_ns is not None:
+        valid = np.where(use_before, d_before, d_after) <= tolerance_ns
+    return index, valid
+
+
+def align_values(target, source, values, method="nearest", tolerance_ns=None):
+    """
+    将源数据对齐到目标时间点
+    values 为与 source 等长的一维或二维(行对应时间)数组；linear 对每列在有效值之间按时间线性插值，
+    目标点在首末有效值之外时为NaN，tolerance_ns 限定目标点与最近一个源时间戳的距离
+    返回float64数组，行数与 target 相同
+    """
+    if method not in ALIGN_METHODS:
+        raise ValueError(f"未知的对齐方式: {method}，可选: {', '.join(ALIGN_METHODS)}")
+    target = np.asarray(target, dtype=np.int64)
+    source = np.asarray(source, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.ndim == 1
+    if flat:
+        values = values[:, None]
+
+    if method == "linear":
+        # 按列插值，结果按列连续存放；以首个目标点为原点，避免纳秒时间戳转为浮点数时损失精度
+        out = np.full((values.shape[1], len(target)), np.nan)
+        origin = target[0] if len(target) else 0
+        t = (target - origin).astype(np.float64)
+        s = (source - origin).astype(np.float64)
+        for j, column in enumerate(values.T):
+            ok = ~np.isnan(column)
+            if ok.all():
+                out[j] = np.interp(t, s, column, left=np.nan, right=np.nan)
+            elif ok.any():
+                out[j] = np.interp(t, s[ok], column[ok], left=np.nan, right=np.nan)
+        out = out.T
+        if tolerance_ns is not None:
+            _, near = align_indexer(target, source, "nearest", tolerance_ns)
+            out[~near] = np.nan
+    else:
+        index, valid = align_indexer(target, source, method, tolerance_ns)
+        # 按列取值：DataFrame的数值块按列连续存放，转置后逐列取值比按行取值快
+        out = np.take(values.T, index, axis=1).T
+        if not valid.all():
+            out[~valid] = np.nan
+    return out[:, 0] if flat else out
+
+
+def align_frame(target_index, source, method="nearest", tolerance=None):
+    """
+    将以时间为索引的DataFrame对齐到 target_index，返回以 target_index 为索引的DataFrame
+    tolerance 为 pd.Timedelta 或可被其解析的值(如 '20ms')，None为不限
+    """
+    if not source.index.is_monotonic_increasing:
+        source = source.sort_index(kind='stable')
+    tolerance_ns = None if tolerance is None else pd.Timedelta(tolerance).value
+    numeric = source.select_dtypes(include=[np.number])
+    values = align_values(to_ns(target_index), to_ns(source.index), numeric.to_numpy(dtype=np.float64),
+                          method, tolerance_ns)
+    return pd.DataFrame(values, index=target_index, columns=numeric.columns, copy=False)
+
+
+def inverse_distance_average(target, source, values, half_window_ns, chunk_rows=65536):
+    """
+    每个目标时间点取 [t - half_window_ns, t + half_window_ns] 内源数据的反距离加权均值，权重为 1 / (|时间差秒| + 1e-6)
+    与 np.average 相同，窗口内有NaN时结果为NaN；窗口内没有数据时为NaN
+    用 searchsorted 找到每个目标点的窗口，再按窗口内最大点数展开为二维权重，所有列一起计算，
+    按 chunk_rows 个目标点分块以限制内存
+    返回float64数组，形状为 (目标点数, 列数)
+    """
+    target = np.asarray(target, dtype=np.int64)
+    source = np.asarray(source, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    out = np.full((len(target), values.shape[1]), np.nan)
+    lo_all = np.searchsorted(source, target - half_window_ns, side='left')
+    hi_all = np.searchsorted(source, target + half_window_ns, side='right')
+    for start in range(0, len(target), chunk_rows):
+        stop = min(start + chunk_rows, len(target))
+        lo, hi = lo_all[start:stop], hi_all[start:stop]
+        count = hi - lo
+        width = int(count.max()) if len(count) else 0
+        if width == 0:
+            continue
+        # 第k列为窗口内的第k个源数据点，超出窗口的位置权重为0
+        index = lo[:, None] + np.arange(width)
+        inside = index < hi[:, None]
+        index = np.where(inside, index, lo[:, None])
+        index = np.minimum(index, len(source) - 1)
+        seconds = np.abs(source[index] - target[start:stop, None]) / 1e9
+        weights = np.where(inside, 1.0 / (seconds + 1e-6), 0.0)
+        band = values[index]
+        band[~inside] = 0.0
+        total = weights.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop] = np.einsum('ij,ijk->ik', weights, band) / total[:, None]
+        out[start:stop][count == 0] = np.nan
+    return out
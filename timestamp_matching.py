@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from time_alignment import NS_PER_MS, to_ns
+
+"""
+时间戳配对：找出INS与磁力计数据中时间戳相差小于给定容差的所有数据对
+两组时间戳各排序一次，每个INS时间戳用 np.searchsorted 找到容差窗口内的磁力计数据，整体开销约为 O((N+M)·log M + 配对数)
+配对按INS行号、再按磁力计行号排列，与逐行双重循环的顺序相同
+"""
+
+# 原有分析脚本使用的配对容差：时间戳相差小于3ms
+DEFAULT_TOLERANCE_NS = 3 * NS_PER_MS
+
+
+def match_within(times_a, times_b, tolerance_ns=DEFAULT_TOLERANCE_NS):
+    """
+    |times_a[i] - times_b[j]| < tolerance_ns 的所有 (i, j)
+    times_a/times_b 为int64纳秒时间戳，无需有序
+    返回 (index_a, index_b) 两个等长的位置数组
+    """
+    times_a = np.asarray(times_a, dtype=np.int64)
+    times_b = np.asarray(times_b, dtype=np.int64)
+    order_b = np.argsort(times_b, kind='stable')
+    sorted_b = times_b[order_b]
+    # 严格小于容差：窗口为 (t - tol, t + tol)
+    lo = np.searchsorted(sorted_b, times_a - tolerance_ns, side='right')
+    hi = np.searchsorted(sorted_b, times_a + tolerance_ns, side='left')
+    count = np.maximum(hi - lo, 0)
+    index_a = np.repeat(np.arange(len(times_a)), count)
+    # 每个窗口内的第k个点：窗口起点加上在本窗口内的序号
+    starts = np.cumsum(count) - count
+    index_b = order_b[np.repeat(lo, count) + np.arange(count.sum()) - np.repeat(starts, count)]
+    if not np.all(order_b[:-1] < order_b[1:]):
+        # times_b 无序时，窗口内按时间排列，改为按原行号排列
+        reorder = np.lexsort((index_b, index_a))
+        index_a, index_b = index_a[reorder], index_b[reorder]
+    return index_a, index_b
+
+
+def match_frames(ins, mag, tolerance_ns=DEFAULT_TOLERANCE_NS, time_col='Timestamp'):
+    """按两个DataFrame的时间列(字符串或时间戳)配对，返回 (INS行号, 磁力计行号)"""
+    return match_within(to_ns(pd.to_datetime(ins[time_col])), to_ns(pd.to_datetime(mag[time_col])), tolerance_ns)
+
+
+def base_time_diffs(ins, mag, tolerance_ns=DEFAULT_TOLERANCE_NS, time_col='Timestamp', base_col='Base_Time'):
+    """
+    时间戳配对后两者 Base_Time 的差(INS - 磁力计)
+    Base_Time 为秒数(extract_seconds.py 的输出)时直接相减，为时间字符串时解析后按秒相减
+    返回 (INS行号, 磁力计行号, 差值秒数数组)
+    """
+    index_ins, index_mag = match_frames(ins, mag, tolerance_ns, time_col)
+    base_ins, base_mag = ins[base_col].to_numpy(), mag[base_col].to_numpy()
+    if not (pd.api.types.is_numeric_dtype(ins[base_col]) and pd.api.types.is_numeric_dtype(mag[base_col])):
+        base_ins, base_mag = epoch_seconds(ins[base_col]), epoch_seconds(mag[base_col])
+    return index_ins, index_mag, base_ins[index_ins] - base_mag[index_mag]
+
+
+def epoch_seconds(times):
+    """时间列转为Unix秒数，与逐个 Timestamp.timestamp() 相同(先取整到微秒，避免纳秒整数转浮点数的误差)"""
+    return to_ns(pd.to_datetime(times)) // 1000 / 1e6
+
+
+def seconds_of_minute(times):
+    """时间列中的秒数(含小数)，与 strftime('%S.%f') 后转为浮点数相同"""
+    ns = to_ns(pd.to_datetime(times))
+    return (ns % (60 * 10 ** 9)) // 1000 / 1e6
+
+
+def modified_time_diffs(ins, mag, tolerance_ns=DEFAULT_TOLERANCE_NS):
+    """
+    calculate_modified_time_diffs.py 的结果表：Base_Time 为秒数的INS与磁力计数据配对后，
+    列为 INS_Base_Time、MAG_Base_Time、INS_Timestamp、MAG_Timestamp(分钟内的秒数)与 Base_Time_Diff(保留3位小数)
+    """
+    index_ins, index_mag, diff = base_time_diffs(ins, mag, tolerance_ns)
+    return pd.DataFrame({
+        'INS_Base_Time': ins['Base_Time'].to_numpy()[index_ins],
+        'MAG_Base_Time': mag['Base_Time'].to_numpy()[index_mag],
+        'INS_Timestamp': seconds_of_minute(ins['Timestamp'])[index_ins],
+        'MAG_Timestamp': seconds_of_minute(mag['Timestamp'])[index_mag],
+        'Base_Time_Diff': np.round(diff, 3),
+    })